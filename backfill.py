@@ -0,0 +1,236 @@
+'''
+Multi-season historical backfill of the league-wide skater reports
+
+Work is split into units of one page of one report of one season. Units run concurrently
+on a bounded pool, each page is written to its own file as soon as it arrives and every
+completed unit is appended to a checkpoint, so an interrupted run resumes without
+refetching anything it already has.
+
+Layout of out_dir:
+    checkpoint.jsonl                       one line per completed unit
+    {season}/{report}/{start:06d}.jsonl    player records of one page, one per line
+
+usage: python backfill.py --first 20032004 --last 20232024 --out backfill/
+'''
+import argparse
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# stats REST skater reports backfilled by default
+REPORTS = ['summary', 'bios', 'faceoffpercentages', 'faceoffwins', 'realtime', 'timeonice']
+
+
+def seasons_between(first, last):
+    '''
+    :param first: first seasonId, e.g. 20032004
+    :param last: last seasonId, inclusive
+    :return: list of every seasonId from first to last
+    '''
+    first_year, last_year = int(str(first)[:4]), int(str(last)[:4])
+    return [int(f"{year}{year + 1}") for year in range(first_year, last_year + 1)]
+
+
+class Backfill:
+    def __init__(self, wrapper, seasons, out_dir, reports=None, max_workers=8, page_size=100, request_budget=None):
+        '''
+        :param wrapper: NHLAPIWrapper the pages are fetched with
+        :param seasons: iterable of seasonIds to backfill
+        :param out_dir: directory the pages and the checkpoint are written to
+        :param reports: stats REST report names, defaults to REPORTS
+        :param max_workers: maximum number of pages fetched at the same time, across all seasons and reports
+        :param page_size: players per page, also the unit of work, lowered to the rows of a season's first page
+                          if the server caps it
+        :param request_budget: maximum number of requests a single run makes, None for no limit
+        '''
+        self.wrapper = wrapper
+        self.seasons = list(seasons)
+        self.out_dir = out_dir
+        self.reports = list(reports or REPORTS)
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.request_budget = request_budget
+        self.checkpoint_path = os.path.join(out_dir, 'checkpoint.jsonl')
+
+        self._lock = threading.Lock()
+        self._done = {}
+        self._totals = {}
+        self._strides = {}
+
+    def _load_checkpoint(self):
+        '''
+        Reads the units completed by earlier runs
+
+        Units are recorded under the page size they were fetched with, a run with another
+        page size starts those seasons and reports over.
+        '''
+        self._done = {}
+        self._totals = {}
+        self._strides = {}
+        if not os.path.exists(self.checkpoint_path):
+            return
+        with open(self.checkpoint_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    unit = json.loads(line)
+                except ValueError:
+                    # A line cut short by an interrupted run, that unit is simply redone
+                    continue
+                if unit.get('limit') != self.page_size:
+                    continue
+                key = (unit['season'], unit['report'])
+                self._done.setdefault(key, set()).add(unit['start'])
+                self._totals[key] = unit['total']
+                if unit['start'] == 0:
+                    self._strides[key] = unit.get('rows') or self.page_size
+
+    def _record(self, season, report, start, rows, total):
+        with self._lock:
+            with open(self.checkpoint_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'season': season, 'report': report, 'start': start, 'limit': self.page_size,
+                                    'rows': rows, 'total': total}) + '\n')
+            self._done.setdefault((season, report), set()).add(start)
+            self._totals[(season, report)] = total
+            if start == 0:
+                self._strides[(season, report)] = rows or self.page_size
+
+    def stride(self, season, report):
+        '''
+        :return: players per page of a season's report, the rows of its first page if the server capped page_size
+        '''
+        return self._strides.get((season, report), self.page_size)
+
+    def page_path(self, season, report, start):
+        return os.path.join(self.out_dir, str(season), report, f"{start:06d}.jsonl")
+
+    def _fetch_unit(self, season, report, start):
+        '''
+        Fetches one page, writes it to its own file and checkpoints it
+
+        :return: total number of players of the season's report
+        '''
+        # playerId gives a stable order, so pages never overlap or skip players
+        data = self.wrapper.fetch_page(report, 'playerId', start=start, limit=self.page_size, season=season)
+        stats = data['data']
+        total = data.get('total', start + len(stats))
+
+        path = self.page_path(season, report, start)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for player in stats:
+                f.write(json.dumps(player) + '\n')
+        os.replace(tmp_path, path)
+
+        self._record(season, report, start, len(stats), total)
+        return total
+
+    def pending(self):
+        '''
+        :return: units known to be missing, the first page of every season and report whose first page is missing
+        '''
+        units = []
+        for season in self.seasons:
+            for report in self.reports:
+                key = (season, report)
+                done = self._done.get(key, set())
+                # The first page sets how far apart the others start
+                if key not in self._strides:
+                    units.append((season, report, 0))
+                    continue
+                units += [(season, report, start)
+                          for start in range(0, self._totals[key], self.stride(season, report))
+                          if start not in done]
+        return units
+
+    def run(self):
+        '''
+        Fetches every unit not in the checkpoint yet
+
+        A failed unit is not checkpointed and is retried by the next run.
+
+        :return: dict with the number of units completed, failed and left over because of the request budget
+        '''
+        os.makedirs(self.out_dir, exist_ok=True)
+        self._load_checkpoint()
+
+        queue = self.pending()
+        completed = 0
+        failed = []
+        requests_made = 0
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        running = {}
+        try:
+            while queue or running:
+                # Keep the pool full while the request budget lasts
+                while queue and len(running) < self.max_workers and \
+                        (self.request_budget is None or requests_made < self.request_budget):
+                    unit = queue.pop(0)
+                    running[executor.submit(self._fetch_unit, *unit)] = unit
+                    requests_made += 1
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    season, report, start = running.pop(future)
+                    try:
+                        total = future.result()
+                    except Exception as e:
+                        failed.append({'season': season, 'report': report, 'start': start, 'error': str(e)})
+                        continue
+                    completed += 1
+
+                    # The first page tells how many more pages the season's report has, and how many
+                    # players the server actually puts on a page
+                    if start == 0:
+                        stride = self.stride(season, report)
+                        queue += [(season, report, page_start) for page_start in range(stride, total, stride)
+                                  if page_start not in self._done.get((season, report), set())]
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        return {'completed': completed, 'failed': failed, 'remaining': len(queue), 'requests': requests_made}
+
+    def iter_season(self, season, report):
+        '''
+        Yields the backfilled player records of a season's report, page by page from disk
+        '''
+        directory = os.path.join(self.out_dir, str(season), report)
+        if not os.path.isdir(directory):
+            return
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith('.jsonl'):
+                continue
+            with open(os.path.join(directory, name), encoding='utf-8') as f:
+                for line in f:
+                    yield json.loads(line)
+
+
+def main():
+    from nhl_api import NHLAPIWrapper
+
+    parser = argparse.ArgumentParser(description='Backfill the league-wide skater reports of many seasons')
+    parser.add_argument('--first', type=int, required=True, help='first seasonId, e.g. 20032004')
+    parser.add_argument('--last', type=int, required=True, help='last seasonId, inclusive')
+    parser.add_argument('--out', required=True, help='output directory, also holds the checkpoint')
+    parser.add_argument('--reports', nargs='*', default=REPORTS)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--budget', type=int, default=None, help='maximum number of requests for this run')
+    args = parser.parse_args()
+
+    with NHLAPIWrapper(pool_size=args.workers, id_cache_path=None) as wrapper:
+        backfill = Backfill(wrapper, seasons_between(args.first, args.last), args.out, reports=args.reports,
+                            max_workers=args.workers, request_budget=args.budget)
+        result = backfill.run()
+
+    print(f"{result['completed']} pages fetched, {len(result['failed'])} failed, "
+          f"{result['remaining']} left for the next run")
+    for failure in result['failed']:
+        print(f"  {failure['season']} {failure['report']} start={failure['start']}: {failure['error']}")
+
+
+if __name__ == '__main__':
+    main()
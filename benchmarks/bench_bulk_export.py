@@ -0,0 +1,69 @@
+'''
+Export time of many players' full reports: one xlsx per player, as skater_report_csv
+does, against bulk_export in one process and across worker processes
+
+usage: python benchmarks/bench_bulk_export.py [--players 200] [--processes 4] [--latency 0.02]
+'''
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from fake_server import FakeNHLServer
+from synthetic import CURRENT_SEASON, FIRST_PLAYER_ID
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import bulk_export
+import nhl_api
+
+
+def per_player_xlsx(wrapper, skaterIDs, directory):
+    for skaterID in skaterIDs:
+        report = wrapper.skater_full_report(skaterID)
+        table = bulk_export.skater_table({skaterID: report}, [skaterID])
+        bulk_export.write_table(table, os.path.join(directory, f"{skaterID}.xlsx"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=200)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--skip-xlsx', action='store_true', help='leave out the slow one xlsx per player baseline')
+    args = parser.parse_args()
+
+    skaterIDs = [FIRST_PLAYER_ID + i for i in range(args.players)]
+    directory = tempfile.mkdtemp()
+    with FakeNHLServer(players=args.players, latency=args.latency) as server:
+        def wrapper():
+            return nhl_api.NHLAPIWrapper(base_url=server.base_url, stats_url=server.stats_url,
+                                         id_cache_path=None, season=CURRENT_SEASON)
+
+        runs = []
+        if not args.skip_xlsx:
+            runs.append(('xlsx per player', lambda w: per_player_xlsx(w, skaterIDs, directory)))
+        for format, compression in [('parquet', None), ('parquet', 'zstd'), ('feather', None), ('csv', 'gzip')]:
+            for processes in (1, args.processes):
+                path = os.path.join(directory, f"skaters-{processes}.{format}")
+                runs.append((f"{format} {compression or 'default'}, {processes} proc",
+                             lambda w, path=path, format=format, compression=compression, processes=processes:
+                             bulk_export.export_skater_reports(w, skaterIDs, path, format=format,
+                                                               compression=compression, processes=processes)))
+
+        print(f"{args.players} players, latency {args.latency}s")
+        for name, run in runs:
+            with wrapper() as w:
+                server.reset_counters()
+                started = time.perf_counter()
+                result = run(w)
+                seconds = time.perf_counter() - started
+            if isinstance(result, list):
+                raise RuntimeError(f"{name} failed with {result}")
+            size = os.path.getsize(result['path']) / 2 ** 10 if result else 0
+            print(f"{name:<32}{seconds:>8.2f}s{server.requests:>8} requests" + (f"{size:>10.0f} KiB" if result else ''))
+
+
+if __name__ == '__main__':
+    main()
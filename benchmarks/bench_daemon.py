@@ -0,0 +1,88 @@
+'''
+Upstream load and latency of several services sharing a StatsDaemon versus each using its own wrapper
+
+Every service runs on its own thread and makes the same calls: --rounds times full_report and
+the full reports of the same --skaters players. Run directly, each service has its own
+NHLAPIWrapper. Through the daemon, each has a StatsClient and the daemon starts cold, so the
+first round of every service races for the same upstream fetches.
+
+usage: python benchmarks/bench_daemon.py [--services 8] [--rounds 3] [--skaters 20] [--latency 0.05]
+'''
+import argparse
+import os
+import sys
+import threading
+import time
+
+from fake_server import FakeNHLServer
+from synthetic import CURRENT_SEASON, FIRST_PLAYER_ID
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import nhl_api
+
+
+def run_services(make_wrapper, services, rounds, skaterIDs):
+    '''
+    :return: (seconds until every service finished, seconds of each call)
+    '''
+    latencies = []
+    lock = threading.Lock()
+
+    def service():
+        with make_wrapper() as wrapper:
+            for _ in range(rounds):
+                for call, args in ((wrapper.full_report, ()), (wrapper.skaters_full_report, (skaterIDs,))):
+                    started = time.perf_counter()
+                    result = call(*args)
+                    assert isinstance(result, dict), result
+                    with lock:
+                        latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=service) for _ in range(services)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--services', type=int, default=8)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--skaters', type=int, default=20)
+    parser.add_argument('--players', type=int, default=800)
+    parser.add_argument('--latency', type=float, default=0.05)
+    args = parser.parse_args()
+
+    skaterIDs = list(range(FIRST_PLAYER_ID, FIRST_PLAYER_ID + args.skaters))
+    print(f"{args.services} services x {args.rounds} rounds of full_report + {args.skaters} skater reports, "
+          f"latency {args.latency}s")
+    print(f"{'mode':<10}{'upstream':>10}{'seconds':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    with FakeNHLServer(players=args.players, latency=args.latency) as server:
+        options = {'base_url': server.base_url, 'stats_url': server.stats_url, 'id_cache_path': None}
+
+        server.reset_counters()
+        seconds, latencies = run_services(lambda: nhl_api.NHLAPIWrapper(season=CURRENT_SEASON, **options),
+                                          args.services, args.rounds, skaterIDs)
+        print(f"{'direct':<10}{server.requests:>10}{seconds:>10.2f}"
+              f"{latencies[len(latencies) // 2] * 1000:>10.1f}{latencies[int(len(latencies) * 0.95)] * 1000:>10.1f}")
+
+        server.reset_counters()
+        daemon = nhl_api.StatsDaemon(nhl_api.NHLAPIWrapper(season=CURRENT_SEASON, **options), port=0,
+                                     refresh_interval=3600)
+        with daemon:
+            daemon.start(warm=False)
+            seconds, latencies = run_services(lambda: nhl_api.StatsClient(daemon.url, **options),
+                                              args.services, args.rounds, skaterIDs)
+            stats = daemon.stats()
+        print(f"{'daemon':<10}{server.requests:>10}{seconds:>10.2f}"
+              f"{latencies[len(latencies) // 2] * 1000:>10.1f}{latencies[int(len(latencies) * 0.95)] * 1000:>10.1f}")
+        print(f"daemon: {stats['fetches']} upstream fetches, {stats['coalesced']} requests coalesced, "
+              f"{stats['hits']} cache hits")
+
+
+if __name__ == '__main__':
+    main()
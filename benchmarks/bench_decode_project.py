@@ -0,0 +1,79 @@
+'''
+Decode + projection time per page of every league report and of the per-skater bio
+
+Compares the original per-record pop chains after the json module decode with the
+ReportSchema projection, decoded with the json module and with orjson.
+
+usage: python benchmarks/bench_decode_project.py [--page-size 100] [--repeat 200]
+'''
+import argparse
+import json
+import os
+import sys
+import timeit
+
+from synthetic import make_rows
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import nhl_api
+
+# keys the league report methods popped before ReportSchema
+POPPED = {name: schema.drop for name, (report, sort, schema) in nhl_api.LEAGUE_REPORTS.items()}
+
+
+def popped_player_dict(stats, popped):
+    player_dict = {}
+    for player in stats:
+        playerID = int(player.pop('playerId'))
+        for key in popped:
+            player.pop(key, None)
+        player_dict[playerID] = player
+    return player_dict
+
+
+def popped_bio_dict(stats):
+    for key in ["currentTeamAbbrev", "shootsCatches", "positionCode", "skaterFullName", "currentTeamName",
+                "lastName"]:
+        stats.pop(key)
+    for old, new in [("gamesPlayed", "career games played"), ("assists", "career assists"),
+                     ("points", "career points"), ("goals", "career goals"),
+                     ("firstSeasonForGameType", "first season"), ("birthCountryCode", "birth country"),
+                     ("birthCity", "birth city"), ("birthStateProvinceCode", "birth state/province"),
+                     ("nationalityCode", "nationality"), ("isInHallOfFameYn", "Hall of Fame")]:
+        stats[new] = stats.pop(old)
+    return {key: stats[key] for key in nhl_api.SKATER_BIO_COLUMNS if key in stats}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    if nhl_api.schema.orjson is None:
+        print('orjson is not installed, the orjson column falls back to the json module')
+
+    def per_page(function):
+        return timeit.timeit(function, number=args.repeat) / args.repeat * 1e6
+
+    print(f"microseconds per page of {args.page_size} players")
+    print(f"{'report':<22}{'json + pop':>14}{'json + schema':>16}{'orjson + schema':>18}")
+    for name, (report, sort, schema) in nhl_api.LEAGUE_REPORTS.items():
+        body = json.dumps({'data': make_rows(report, args.page_size)}).encode('utf-8')
+        original = per_page(lambda: popped_player_dict(json.loads(body)['data'], POPPED[name]))
+        plain = per_page(lambda: nhl_api.NHLAPIWrapper._player_dict(
+            nhl_api.decode_json(body, fast=False)['data'], schema))
+        fast = per_page(lambda: nhl_api.NHLAPIWrapper._player_dict(
+            nhl_api.decode_json(body)['data'], schema))
+        print(f"{name:<22}{original:>14.0f}{plain:>16.0f}{fast:>18.0f}")
+
+    body = json.dumps({'data': make_rows('bios', 1)}).encode('utf-8')
+    original = per_page(lambda: popped_bio_dict(json.loads(body)['data'][0]))
+    plain = per_page(lambda: nhl_api.NHLAPIWrapper._bio_dict(nhl_api.decode_json(body, fast=False)['data'][0]))
+    fast = per_page(lambda: nhl_api.NHLAPIWrapper._bio_dict(nhl_api.decode_json(body)['data'][0]))
+    print(f"{'skater_bio (1 row)':<22}{original:>14.1f}{plain:>16.1f}{fast:>18.1f}")
+
+
+if __name__ == '__main__':
+    main()
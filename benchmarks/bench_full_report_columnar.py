@@ -0,0 +1,80 @@
+'''
+Compares build time and peak memory of full_report's dict and columnar outputs
+
+The six reports are built from synthetic page payloads, so only the merge is measured.
+
+usage: python benchmarks/bench_full_report_columnar.py [--players N] [--repeat N]
+'''
+import argparse
+import copy
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+from synthetic import make_rows
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import nhl_api
+NHLAPIWrapper = nhl_api.NHLAPIWrapper
+
+
+def build_dict(pages):
+    reports = [NHLAPIWrapper._player_dict(stats, nhl_api.LEAGUE_REPORTS[name][2])
+               for name, stats in zip(nhl_api.FULL_REPORT_ORDER, pages)]
+    return NHLAPIWrapper._merge_full_report(*reports)
+
+
+def build_dataframe(pages):
+    return NHLAPIWrapper._full_report_frame(pages)
+
+
+def build_arrow(pages):
+    import pyarrow as pa
+    return pa.Table.from_pandas(NHLAPIWrapper._full_report_frame(pages), preserve_index=False)
+
+
+def measure(build, pages, repeat):
+    '''
+    :return: (best seconds, peak traced bytes, result) of building the report from fresh copies of pages
+    '''
+    best = float('inf')
+    for _ in range(repeat):
+        fresh = copy.deepcopy(pages)
+        gc.collect()
+        start = time.perf_counter()
+        build(fresh)
+        best = min(best, time.perf_counter() - start)
+
+    fresh = copy.deepcopy(pages)
+    gc.collect()
+    tracemalloc.start()
+    result = build(fresh)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=900)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    pages = [make_rows(nhl_api.LEAGUE_REPORTS[name][0], args.players) for name in nhl_api.FULL_REPORT_ORDER]
+
+    print(f"{args.players} players")
+    print(f"{'output':<12}{'best ms':>10}{'peak MiB':>10}")
+    for name, build in (('dict', build_dict), ('dataframe', build_dataframe), ('arrow', build_arrow)):
+        try:
+            seconds, peak, _ = measure(build, pages, args.repeat)
+        except ImportError as e:
+            print(f"{name:<12}skipped: {e}")
+            continue
+        print(f"{name:<12}{seconds * 1000:>10.1f}{peak / 2 ** 20:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+'''
+Game documents ingested per second by GameIngest at increasing concurrency
+
+Every configuration ingests into a fresh store under the same request budget: the season's
+schedule, then boxscores and play-by-play until the budget runs out. A second, unlimited run
+on the last store finishes the season, and a third shows that a complete season makes no
+requests.
+
+usage: python benchmarks/bench_game_ingest.py [--latency 0.05] [--budget 400] [--workers 1 4 16 32]
+'''
+import argparse
+import os
+import sys
+import tempfile
+
+from fake_server import FakeNHLServer
+from synthetic import CURRENT_SEASON
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import game_ingest
+import nhl_api
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--budget', type=int, default=400)
+    parser.add_argument('--workers', type=int, nargs='*', default=[1, 4, 16, 32])
+    parser.add_argument('--rate', type=float, default=None, help='requests per second of the wrapper')
+    args = parser.parse_args()
+
+    print(f"latency {args.latency}s, {args.budget} requests per run")
+    print(f"{'run':<22}{'requests':>10}{'stored':>8}{'seconds':>9}{'docs/s':>9}{'MB':>8}{'stored MB':>11}")
+    with FakeNHLServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as directory:
+        def run(name, store, workers, budget):
+            with nhl_api.NHLAPIWrapper(base_url=server.base_url, stats_url=server.stats_url, id_cache_path=None,
+                                       pool_size=workers, rate_limit=args.rate) as wrapper:
+                result = game_ingest.GameIngest(wrapper, store, max_workers=workers, request_budget=budget) \
+                    .run(CURRENT_SEASON)
+            rate = result['stored'] / result['seconds'] if result['seconds'] else 0
+            print(f"{name:<22}{result['requests']:>10}{result['stored']:>8}{result['seconds']:>9.2f}{rate:>9.0f}"
+                  f"{result['bytes'] / 1e6:>8.1f}{result['stored_bytes'] / 1e6:>11.1f}")
+
+        for workers in args.workers:
+            with game_ingest.GameStore(os.path.join(directory, f"{workers}.sqlite")) as store:
+                run(f"{workers} workers", store, workers, args.budget)
+
+        with game_ingest.GameStore(os.path.join(directory, f"{args.workers[-1]}.sqlite")) as store:
+            run('resume to the end', store, args.workers[-1], None)
+            run('rerun', store, args.workers[-1], None)
+            stats = store.stats()
+        print(f"{stats['games']} games, {stats['documents']} documents, {stats['bytes'] / 1e6:.1f} MB as JSON, "
+              f"{os.path.getsize(os.path.join(directory, f'{args.workers[-1]}.sqlite')) / 1e6:.1f} MB on disk")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+'''
+Startup cost of the wrapper: import, construction and first DataFrame, each in a fresh interpreter
+
+Every stage runs in its own subprocess so nothing is already imported, and reports the
+median wall time and which heavy dependencies got loaded. --compare loads a single-file
+version of the wrapper by path as well, e.g. the one before the nhl_api package:
+
+    git show 85c1564:NHL-Wrapper.py > /tmp/old_wrapper.py
+    python benchmarks/bench_import.py --compare /tmp/old_wrapper.py
+
+usage: python benchmarks/bench_import.py [--repeat 5] [--compare FILE]
+'''
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY = ['pandas', 'requests', 'aiohttp', 'dateutil', 'pyarrow', 'openpyxl']
+
+# code timed after the wrapper module is loaded as nhl_api, none of it makes a request
+STAGES = {
+    'import': '',
+    'construct': 'nhl_api.NHLAPIWrapper(id_cache_path=None, season=20232024)',
+    'first DataFrame': 'nhl_api.NHLAPIWrapper(id_cache_path=None, season=20232024)\n'
+                       'nhl_api.NHLAPIWrapper._full_report_frame([[{"playerId": 1}]] * len(nhl_api.FULL_REPORT_ORDER))',
+}
+
+SCRIPT = '''
+import json, sys, time
+started = time.perf_counter()
+{load}
+{stage}
+seconds = time.perf_counter() - started
+print(json.dumps({{'seconds': seconds, 'loaded': [name for name in {heavy!r} if name in sys.modules]}}))
+'''
+
+PACKAGE = 'sys.path.insert(0, {root!r})\nimport nhl_api'
+
+FILE = '''import importlib.util
+spec = importlib.util.spec_from_file_location('nhl_api', {path!r})
+nhl_api = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(nhl_api)'''
+
+
+def measure(load, stage, repeat):
+    '''
+    :return: (median seconds, heavy modules loaded) of load followed by stage in a fresh interpreter
+    '''
+    script = SCRIPT.format(load=load, stage=stage, heavy=HEAVY)
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                                cwd=ROOT).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return statistics.median(run['seconds'] for run in runs), runs[-1]['loaded']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--compare', default=None, help='single-file wrapper module to measure as well')
+    args = parser.parse_args()
+
+    versions = {'nhl_api': PACKAGE.format(root=ROOT)}
+    if args.compare:
+        versions[os.path.basename(args.compare)] = FILE.format(path=os.path.abspath(args.compare))
+
+    print(f"{'version':<20}{'stage':<18}{'ms':>8}  loaded")
+    for version, load in versions.items():
+        for stage, code in STAGES.items():
+            seconds, loaded = measure(load, code, args.repeat)
+            print(f"{version:<20}{stage:<18}{seconds * 1000:>8.0f}  {', '.join(loaded) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
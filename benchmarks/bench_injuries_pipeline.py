@@ -0,0 +1,109 @@
+'''
+Rows/sec of the injury ETL on a large synthetic export, loaded into SQLite
+
+Compares the original injuries-wrapper.py steps (whole file in memory, per-row name
+normalization, full table replace) with InjuryPipeline on a first load and on a rerun
+after a small fraction of the export changed.
+
+usage: python benchmarks/bench_injuries_pipeline.py [--rows 1000000] [--changed 0.01]
+'''
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import unicodedata
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+from synthetic import FIRST_NAMES, LAST_NAMES, TEAMS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from injuries_pipeline import InjuryPipeline
+
+INJURIES = ['Upper body', 'Lower body', 'Concussion', 'Knee', 'Shoulder', 'Illness', 'Hand', 'Groin']
+
+
+def write_export(path, rows, seed=0, changed=0.0):
+    '''
+    Writes a synthetic export with the columns of the injury database
+
+    :param changed: fraction of rows whose games missed differ from the export of the same seed
+    '''
+    rng = random.Random(seed)
+    change_rng = random.Random(seed + 1)
+    current_year = pd.Timestamp.today().year
+    with open(path, 'w', encoding='utf-16', newline='') as f:
+        f.write('\t'.join(['Player', 'Season', 'Team', 'Injury Type', 'Chip', 'Cap Hit', 'Games Missed',
+                           'Games Missed.1']) + '\n')
+        for _ in range(rows):
+            first = rng.choice(FIRST_NAMES)
+            last = rng.choice(LAST_NAMES)
+            year = rng.randint(current_year - 15, current_year - 1)
+            season = f"{year}-{str(year + 1)[2:]}" + (' (playoffs)' if rng.random() < 0.1 else '')
+            games = rng.randint(1, 40)
+            if change_rng.random() < changed:
+                games += 1
+            f.write(f"{last}, {first}\t{season}\t{rng.choice(TEAMS)}\t{rng.choice(INJURIES)}\t"
+                    f"${rng.randint(0, 9_000_000)}\t${rng.randint(750_000, 12_000_000)}\t{games}\t{games}\n")
+
+
+def original(path, engine):
+    '''
+    The steps of the original injuries-wrapper.py
+    '''
+    df = pd.read_csv(path, delimiter='\t', encoding='utf-16')
+    df = df.drop('Chip', axis=1)
+    df = df.drop('Cap Hit', axis=1)
+    df = df[~df['Season'].str.contains(r'\(playoffs\+?\)')]
+    df['Season'] = df['Season'].str.extract(r'(\d{4})')
+    df['Season'] = pd.to_datetime(df['Season'], format='%Y')
+    five_years_ago = pd.to_datetime('today').year - 5
+    df = df[df['Season'].dt.year >= five_years_ago]
+    df['Season'] = df['Season'].astype(str)
+    df['Season'] = df['Season'].str[:4]
+    df['Player'] = df['Player'].apply(
+        lambda name: unicodedata.normalize('NFKD', name).encode('ASCII', 'ignore').decode('utf-8'))
+    df[['Last Name', 'First Name']] = df['Player'].str.split(', ', n=1, expand=True)
+    df['Player'] = df['First Name'] + ' ' + df['Last Name']
+    player_avg_df = df.groupby(['Player', 'Season'])['Games Missed'].sum().reset_index()
+    player_avg_df.to_sql('injuries', con=engine, if_exists='replace', index=False)
+    return player_avg_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--changed', type=float, default=0.01, help='fraction of rows changed before the rerun')
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'injuries.csv')
+    write_export(path, args.rows)
+    print(f"{args.rows} rows, {os.path.getsize(path) / 2 ** 20:.1f} MiB export")
+
+    started = time.perf_counter()
+    expected = original(path, create_engine(f"sqlite:///{os.path.join(directory, 'original.sqlite')}"))
+    seconds = time.perf_counter() - started
+    print(f"{'original':<24}{seconds:>8.2f}s{args.rows / seconds:>14,.0f} rows/s")
+
+    pipeline = InjuryPipeline(f"sqlite:///{os.path.join(directory, 'pipeline.sqlite')}", chunksize=args.chunksize)
+    result = pipeline.run(path)
+    print(f"{'pipeline, first load':<24}{result['seconds']:>8.2f}s{result['rows_per_second']:>14,.0f} rows/s"
+          f"{result['upserted']:>10} upserted")
+    if len(result['frame']) != len(expected) or \
+            result['frame']['Games Missed'].sum() != expected['Games Missed'].sum():
+        raise RuntimeError('pipeline and original disagree')
+
+    write_export(path, args.rows, changed=args.changed)
+    result = pipeline.run(path)
+    print(f"{'pipeline, rerun':<24}{result['seconds']:>8.2f}s{result['rows_per_second']:>14,.0f} rows/s"
+          f"{result['upserted']:>10} upserted")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+'''
+Time to join a multi-season injury history onto the per-season skater summary
+
+Builds synthetic injuries for the fake server's players over every season they played,
+named "Last, First" with accents like the injury export, then times build_injury_dataset
+split into name resolution, report fetch and join.
+
+Synthetic names repeat every 480 players, players sharing a name are left unresolved.
+
+usage: python benchmarks/bench_injury_dataset.py [--players 480] [--injuries 200000]
+'''
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+from fake_server import FakeNHLServer
+from synthetic import CURRENT_SEASON, debut_season, player_name
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import injuries_pipeline
+import nhl_api
+
+
+def make_injuries(players, rows, seed=0):
+    '''
+    :return: DataFrame shaped like InjuryPipeline.transform output, before name normalization
+    '''
+    rng = random.Random(seed)
+    last_year = int(str(CURRENT_SEASON)[:4])
+    names, seasons, games = [], [], []
+    for _ in range(rows):
+        index = rng.randrange(players)
+        first, last = player_name(index).split(' ', 1)
+        names.append(f"{last}, {first}")
+        seasons.append(str(rng.randint(int(str(debut_season(index))[:4]), last_year)))
+        games.append(rng.randint(1, 20))
+    frame = pd.DataFrame({'Player': names, 'Season': seasons, 'Games Missed': games})
+    frame['Player'] = injuries_pipeline.normalize_players(frame['Player'])
+    return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=480)
+    parser.add_argument('--injuries', type=int, default=200_000)
+    parser.add_argument('--latency', type=float, default=0.02)
+    args = parser.parse_args()
+
+    injuries = make_injuries(args.players, args.injuries)
+    with FakeNHLServer(players=args.players, latency=args.latency) as server:
+        with nhl_api.NHLAPIWrapper(base_url=server.base_url, stats_url=server.stats_url, id_cache_path=None,
+                                   season=CURRENT_SEASON) as wrapper:
+            started = time.perf_counter()
+            wrapper.name_index
+            index_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            resolved = injuries_pipeline.attach_player_ids(injuries, wrapper.name_index)
+            resolve_seconds = time.perf_counter() - started
+
+            server.reset_counters()
+            started = time.perf_counter()
+            dataset = injuries_pipeline.build_injury_dataset(wrapper, injuries)
+            build_seconds = time.perf_counter() - started
+
+    seasons = dataset['seasonId'].nunique()
+    print(f"{len(injuries)} injury rows, {args.players} players, {seasons} seasons")
+    print(f"name index build       {index_seconds:>8.3f}s")
+    print(f"name resolution        {resolve_seconds:>8.3f}s  "
+          f"{resolved['playerId'].notna().mean():.0%} of rows resolved")
+    print(f"build_injury_dataset   {build_seconds:>8.3f}s  {server.requests} requests, {len(dataset)} player seasons, "
+          f"{int((dataset['Games Missed'] > 0).sum())} with games missed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+'''
+Counts the requests each league report makes with fixed and adaptive pagination
+
+Runs against the local fake server unless --stats-url is given, --base-url and --season
+then point the wrapper at the API and the season it would otherwise look up from
+api-web.nhle.com.
+
+usage: python benchmarks/bench_pagination.py [--players 900] [--max-limit 100]
+       python benchmarks/bench_pagination.py --stats-url URL [--base-url URL] [--season 20232024]
+'''
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+from fake_server import FakeNHLServer
+from synthetic import CURRENT_SEASON
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import nhl_api
+
+
+class CountingTransport(nhl_api.HTTPTransport):
+    '''
+    HTTPTransport that counts the requests made through it
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requests = 0
+
+    def get(self, url, **kwargs):
+        self.requests += 1
+        return super().get(url, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--stats-url', default=None, help='stats REST API to run against instead of the fake server')
+    parser.add_argument('--base-url', default='https://api-web.nhle.com/')
+    parser.add_argument('--season', type=int, default=None, help='seasonId, looked up from --base-url if not given')
+    parser.add_argument('--players', type=int, default=900, help='players of the fake server')
+    parser.add_argument('--max-limit', type=int, default=100, help='page size cap of the fake server')
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        if args.stats_url is None:
+            server = stack.enter_context(FakeNHLServer(players=args.players, max_limit=args.max_limit))
+            stats_url, base_url, season = server.stats_url, server.base_url, args.season or CURRENT_SEASON
+        else:
+            stats_url, base_url, season = args.stats_url, args.base_url, args.season
+
+        print(f"{'report':<20}{'mode':<10}{'requests':>10}{'players':>10}{'seconds':>10}")
+        for name in nhl_api.LEAGUE_REPORTS:
+            for mode in ('fixed', 'adaptive'):
+                transport = CountingTransport()
+                wrapper = nhl_api.NHLAPIWrapper(base_url=base_url, stats_url=stats_url, transport=transport,
+                                                pagination=mode, id_cache_path=None, season=season)
+                start = time.perf_counter()
+                report = getattr(wrapper, name)()
+                elapsed = time.perf_counter() - start
+                players = len(report) if isinstance(report, dict) else f"err {report[0]}"
+                print(f"{name:<20}{mode:<10}{transport.requests:>10}{players:>10}{elapsed:>10.2f}")
+                wrapper.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+'''
+Dashboard queries over full_report answered by scanning the dicts versus a LeagueIndex
+
+Queries: top 20 by points per game among centres with 40+ games, a player's hits per 60
+percentile, and the players over thresholds of three stats. Also times building the index
+and applying a refresh in which --changed of the players have new stats.
+
+usage: python benchmarks/bench_ranking.py [--players 900] [--repeat 200] [--changed 0.05]
+'''
+import argparse
+import os
+import random
+import sys
+import time
+import timeit
+
+from synthetic import make_rows
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import nhl_api
+
+
+def synthetic_report(players):
+    '''
+    :return: full_report() shaped dict merged from the synthetic league reports
+    '''
+    reports = []
+    for name in nhl_api.FULL_REPORT_ORDER:
+        report, sort, schema = nhl_api.LEAGUE_REPORTS[name]
+        reports.append(nhl_api.NHLAPIWrapper._player_dict(make_rows(report, players), schema))
+    return nhl_api.NHLAPIWrapper._merge_full_report(*reports)
+
+
+def scan_top(report, n=20):
+    rows = [(playerID, stats['pointsPerGame']) for playerID, stats in report.items()
+            if stats['positionCode'] == 'C' and stats['gamesPlayed'] >= 40 and stats['pointsPerGame'] is not None]
+    rows.sort(key=lambda row: (-row[1], row[0]))
+    return rows[:n]
+
+
+def scan_percentile(report, playerID):
+    value = report[playerID]['hitsPer60']
+    values = [stats['hitsPer60'] for stats in report.values() if stats['hitsPer60'] is not None]
+    return sum(1 for other in values if other <= value) * 100.0 / len(values)
+
+
+def scan_filter(report):
+    return [playerID for playerID, stats in report.items()
+            if stats['goals'] >= 300 and stats['hits'] >= 500 and stats['timeOnIcePerGame'] >= 0.5]
+
+
+WHERE = {'positionCode': 'C', 'gamesPlayed': (40, None)}
+FILTER = {'goals': (300, None), 'hits': (500, None), 'timeOnIcePerGame': (0.5, None)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=900)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--changed', type=float, default=0.05)
+    args = parser.parse_args()
+
+    report = synthetic_report(args.players)
+    playerID = next(iter(report))
+
+    # Loads NumPy before anything is timed
+    LeagueIndex = nhl_api.LeagueIndex
+    started = time.perf_counter()
+    index = LeagueIndex(report)
+    build = time.perf_counter() - started
+
+    assert index.top('pointsPerGame', 20, WHERE) == scan_top(report)
+    assert index.percentile(playerID, 'hitsPer60') == scan_percentile(report, playerID)
+    assert sorted(index.filter(FILTER).tolist()) == sorted(scan_filter(report))
+
+    def per_query(function):
+        return timeit.timeit(function, number=args.repeat) / args.repeat * 1e6
+
+    print(f"{len(index)} players, {len(index.stats)} numeric stats, index built in {build * 1000:.1f} ms")
+    print(f"{'query':<28}{'scan us':>10}{'index us':>10}")
+    for name, scan, indexed in (
+            ('top 20 P/GP, C, 40+ GP', lambda: scan_top(report), lambda: index.top('pointsPerGame', 20, WHERE)),
+            ('hits/60 percentile', lambda: scan_percentile(report, playerID),
+             lambda: index.percentile(playerID, 'hitsPer60')),
+            ('3-stat range filter', lambda: scan_filter(report), lambda: index.filter(FILTER))):
+        print(f"{name:<28}{per_query(scan):>10.1f}{per_query(indexed):>10.1f}")
+
+    rng = random.Random(0)
+    changed = rng.sample(list(report), int(len(report) * args.changed))
+    refreshed = {playerID: dict(stats) for playerID, stats in report.items()}
+    for playerID in changed:
+        for stat in ('points', 'pointsPerGame', 'hits', 'hitsPer60'):
+            refreshed[playerID][stat] = rng.randint(0, 1500) if stat in ('points', 'hits') else rng.random()
+
+    started = time.perf_counter()
+    index.update({playerID: refreshed[playerID] for playerID in changed})
+    update = time.perf_counter() - started
+    started = time.perf_counter()
+    index.refresh(refreshed)
+    refresh = time.perf_counter() - started
+    started = time.perf_counter()
+    LeagueIndex(refreshed)
+    rebuild = time.perf_counter() - started
+    assert index.top('pointsPerGame', 20, WHERE) == scan_top(refreshed)
+    print(f"{len(changed)} players changed: update {update * 1000:.2f} ms, refresh with the whole report "
+          f"{refresh * 1000:.1f} ms, rebuild {rebuild * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+'''
+Cold-start load time and memory of worker processes reading league data from JSON versus a snapshot file
+
+The full_report and the seasons of every player are fetched once from the fake server and
+written both as JSON and as a snapshot file. Then --workers fresh processes start at once
+and load them, either parsing the JSON or opening the snapshot and reading every column,
+optionally building a LeagueIndex on top. Once every worker has loaded, each one reports
+its memory from /proc: RSS, the part of it that is private (anonymous) and its PSS, in
+which pages shared with the other workers are split between them.
+
+usage: python benchmarks/bench_snapshot_load.py [--players 900] [--workers 1 4 8]
+'''
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from fake_server import FakeNHLServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import nhl_api
+
+MODES = ['json', 'snapshot', 'json + index', 'snapshot + index']
+
+
+def memory():
+    '''
+    :return: dict of VmRSS, RssAnon and RssFile from /proc/self/status and Pss from /proc/self/smaps_rollup, in kB
+    '''
+    values = {}
+    for name in ('/proc/self/status', '/proc/self/smaps_rollup'):
+        with open(name) as f:
+            for line in f:
+                field, _, value = line.partition(':')
+                if field in ('VmRSS', 'RssAnon', 'RssFile', 'Pss'):
+                    values[field] = int(value.split()[0])
+    return values
+
+
+def worker(mode, directory):
+    '''
+    Loads the data of mode, reports the seconds it took, then waits for a line on stdin before measuring memory
+    '''
+    # Loads NumPy before anything is timed
+    SnapshotFile, LeagueIndex = nhl_api.SnapshotFile, nhl_api.LeagueIndex
+    started = time.perf_counter()
+    if mode.startswith('json'):
+        with open(os.path.join(directory, 'league.json')) as f:
+            data = json.load(f)
+        if mode.endswith('index'):
+            index = LeagueIndex(data['full_report'])
+    else:
+        snapshot = SnapshotFile(os.path.join(directory, 'league.snap'))
+        # Reads every page of every column
+        for table in snapshot.tables:
+            for name in snapshot.columns(table):
+                snapshot.column(name, table).sum()
+        if mode.endswith('index'):
+            index = snapshot.league_index()
+    seconds = time.perf_counter() - started
+    print(json.dumps({'seconds': seconds}), flush=True)
+    sys.stdin.readline()
+    print(json.dumps(memory()), flush=True)
+
+
+def run(mode, directory, workers):
+    '''
+    :return: list of dicts of the seconds and memory of each worker
+    '''
+    processes = [subprocess.Popen([sys.executable, __file__, '--worker', mode, directory], stdin=subprocess.PIPE,
+                                  stdout=subprocess.PIPE, text=True) for _ in range(workers)]
+    results = [json.loads(process.stdout.readline()) for process in processes]
+    # Every worker has loaded, so the pages they share are all mapped while they measure
+    for process in processes:
+        process.stdin.write('\n')
+        process.stdin.flush()
+    for result, process in zip(results, processes):
+        result.update(json.loads(process.stdout.readline()))
+        process.wait()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=900)
+    parser.add_argument('--workers', type=int, nargs='*', default=[1, 4, 8])
+    parser.add_argument('--worker', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(*args.worker)
+        return
+
+    with FakeNHLServer(players=args.players, latency=0) as server:
+        with nhl_api.NHLAPIWrapper(base_url=server.base_url, stats_url=server.stats_url,
+                                   id_cache_path=None) as wrapper:
+            report = wrapper.full_report()
+            seasons = wrapper.skaters_full_report(report)
+
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, 'league.json'), 'w') as f:
+            json.dump({'full_report': report, 'seasons': seasons}, f)
+        written = nhl_api.write_snapshot(os.path.join(directory, 'league.snap'), report, seasons)
+        print(f"{written['full_report']} players, {written['seasons']} seasons: "
+              f"{os.path.getsize(os.path.join(directory, 'league.json')) / 1e6:.1f} MB as JSON, "
+              f"{written['bytes'] / 1e6:.1f} MB as a snapshot")
+
+        # The first open of each file reads it from disk, every timed run finds it in the page cache
+        run('json', directory, 1)
+        run('snapshot', directory, 1)
+        print(f"{'mode':<18}{'workers':>8}{'load ms':>9}{'RSS MB':>8}{'anon MB':>9}{'file MB':>9}{'PSS MB':>8}")
+        for workers in args.workers:
+            for mode in MODES:
+                results = run(mode, directory, workers)
+                print(f"{mode:<18}{workers:>8}{statistics.median(r['seconds'] for r in results) * 1000:>9.1f}"
+                      + ''.join(f"{statistics.mean(r[field] for r in results) / 1024:>{width}.1f}"
+                                for field, width in (('VmRSS', 8), ('RssAnon', 9), ('RssFile', 9), ('Pss', 8))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+'''
+Sustained throughput of full_report against a throttling, flaky fake server
+
+The fake server answers 429 with Retry-After above --server-rate requests per second and
+fails --error-rate of the requests with 503. Each configuration calls full_report in a loop
+for --duration seconds and reports successful requests per second and completed reports.
+
+usage: python benchmarks/bench_throttling.py [--server-rate 100] [--error-rate 0.05] [--duration 10]
+'''
+import argparse
+import os
+import sys
+import time
+
+from fake_server import FakeNHLServer
+from synthetic import CURRENT_SEASON
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import nhl_api
+
+
+def configs(server_rate):
+    return {
+        'no retries': {'max_retries': 0, 'circuit_breaker': False},
+        'retries': {'max_retries': 5, 'backoff': 0.1},
+        'retries + limiter': {'max_retries': 5, 'backoff': 0.1, 'rate_limit': server_rate * 0.95},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--server-rate', type=float, default=100.0)
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument('--latency', type=float, default=0.01)
+    parser.add_argument('--duration', type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"server allows {args.server_rate} req/s, fails {args.error_rate:.0%} with 503, "
+          f"latency {args.latency}s")
+    print(f"{'config':<20}{'ok req/s':>10}{'429s':>8}{'503s':>8}{'reports ok':>12}{'failed':>8}")
+    for name, config in configs(args.server_rate).items():
+        with FakeNHLServer(latency=args.latency, error_rate=args.error_rate, error_status=503,
+                           rate_limit=args.server_rate) as server:
+            wrapper = nhl_api.NHLAPIWrapper(base_url=server.base_url, stats_url=server.stats_url,
+                                            id_cache_path=None, season=CURRENT_SEASON, **config)
+            completed = failed = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < args.duration:
+                report = wrapper.full_report()
+                if isinstance(report, dict):
+                    completed += 1
+                else:
+                    failed += 1
+            elapsed = time.perf_counter() - start
+            wrapper.close()
+
+            ok = server.statuses.get(200, 0)
+            print(f"{name:<20}{ok / elapsed:>10.1f}{server.statuses.get(429, 0):>8}"
+                  f"{server.statuses.get(503, 0):>8}{completed:>12}{failed:>8}")
+
+
+if __name__ == '__main__':
+    main()
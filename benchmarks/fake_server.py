@@ -0,0 +1,412 @@
+'''
+Local stand-in for the NHL stats API
+
+Serves /stats/rest/en/skater/{summary,bios,faceoffpercentages,faceoffwins,realtime,timeonice}
+and /v1/season from recorded fixtures, or from synthetic players when no fixtures are given,
+and the synthetic schedule, boxscores and play-by-play of CURRENT_SEASON under /v1/schedule
+and /v1/gamecenter.
+Supports the cayenneExp filters, sort, start and limit the wrapper uses, and can inject
+latency, jitter and errors so the wrapper's performance can be measured reproducibly.
+
+usage:
+    python benchmarks/fake_server.py --port 8080 --latency 0.05 --jitter 0.02 --error-rate 0.01
+    python benchmarks/fake_server.py --record benchmarks/fixtures --season 20232024
+'''
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from synthetic import (FIELDS, CURRENT_SEASON, FIRST_PLAYER_ID, debut_season, make_row, season_games,
+                       make_schedule_week, make_boxscore, make_play_by_play)
+
+REPORTS = list(FIELDS)
+
+CLAUSE = re.compile(r'^\s*(\w+)\s*(>=|<=|=|>|<|\sin\s)\s*(.+?)\s*$')
+
+
+def parse_cayenne(expression):
+    '''
+    Parses the subset of cayenneExp used by the wrapper: clauses joined by 'and', each
+    comparing a field with =, >, <, >=, <= or 'in (a,b,c)'
+
+    :return: list of (field, operator, values) with values as a list of ints
+    '''
+    clauses = []
+    if not expression:
+        return clauses
+    for clause in re.split(r'\s+and\s+', expression):
+        match = CLAUSE.match(clause)
+        if match is None:
+            raise ValueError(f"unsupported cayenneExp clause {clause!r}")
+        field, operator, value = match.groups()
+        operator = operator.strip()
+        if operator == 'in':
+            values = [int(v) for v in value.strip('()').split(',') if v.strip()]
+        else:
+            values = [int(value.strip('"\''))]
+        clauses.append((field, operator, values))
+    return clauses
+
+
+def matches(row, clauses):
+    for field, operator, values in clauses:
+        value = row.get(field)
+        if value is None:
+            # Like bios rows and seasonId, the rows were already selected on a field they do not carry
+            continue
+        if operator == '=' and value != values[0]:
+            return False
+        if operator == 'in' and value not in values:
+            return False
+        if operator == '>' and not value > values[0]:
+            return False
+        if operator == '<' and not value < values[0]:
+            return False
+        if operator == '>=' and not value >= values[0]:
+            return False
+        if operator == '<=' and not value <= values[0]:
+            return False
+    return True
+
+
+class SyntheticData:
+    '''
+    Rows generated on demand for synthetic players, see synthetic.py
+    '''
+
+    def __init__(self, players=900):
+        self.players = players
+        self._season_rows = {}
+
+    def seasons(self):
+        first = min(debut_season(i) for i in range(min(self.players, 12)))
+        first_year, last_year = int(str(first)[:4]), int(str(CURRENT_SEASON)[:4])
+        return [int(f"{year}{year + 1}") for year in range(first_year, last_year + 1)]
+
+    def rows(self, report, clauses):
+        seasons = [values for field, operator, values in clauses if field == 'seasonId' and operator in ('=', 'in')]
+        players = [values for field, operator, values in clauses if field == 'playerId' and operator in ('=', 'in')]
+
+        if players:
+            # Only the careers of the players asked for
+            candidates = []
+            for playerId in players[0]:
+                index = playerId - FIRST_PLAYER_ID
+                if 0 <= index < self.players:
+                    first_year = int(str(debut_season(index))[:4])
+                    for year in range(first_year, int(str(CURRENT_SEASON)[:4]) + 1):
+                        candidates.append(make_row(report, index, int(f"{year}{year + 1}")))
+        elif seasons:
+            candidates = []
+            for season in seasons[0]:
+                candidates += self._league_rows(report, season)
+        else:
+            candidates = []
+            for season in self.seasons():
+                candidates += self._league_rows(report, season)
+        return [row for row in candidates if matches(row, clauses)]
+
+    def _league_rows(self, report, season):
+        key = (report, season)
+        if key not in self._season_rows:
+            self._season_rows[key] = [make_row(report, i, season) for i in range(self.players)
+                                      if debut_season(i) <= season]
+        return self._season_rows[key]
+
+
+class FixtureData:
+    '''
+    Rows recorded from the real API with --record, one {report}.json per report and season.json
+    '''
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._rows = {}
+        for report in REPORTS:
+            path = os.path.join(directory, f"{report}.json")
+            if os.path.exists(path):
+                with open(path, encoding='utf-8') as f:
+                    self._rows[report] = json.load(f)['data']
+        with open(os.path.join(directory, 'season.json'), encoding='utf-8') as f:
+            self._seasons = json.load(f)
+
+    def seasons(self):
+        return self._seasons
+
+    def rows(self, report, clauses):
+        return [row for row in self._rows.get(report, []) if matches(row, clauses)]
+
+
+def sort_rows(rows, sort):
+    '''
+    Sorts rows by a field name or a JSON list of {"property", "direction"}
+
+    Like the real API, ties are not broken by anything else: they keep the order the rows are stored in.
+    '''
+    if sort.startswith('['):
+        keys = [(item['property'], item.get('direction', 'ASC').upper() == 'DESC') for item in json.loads(sort)]
+    else:
+        keys = [(sort, False)]
+    rows = list(rows)
+    for field, descending in reversed(keys):
+        rows.sort(key=lambda row: (row.get(field) is None, row.get(field) or 0), reverse=descending)
+    return rows
+
+
+class FakeNHLServer:
+    '''
+    Threaded fake NHL API server
+
+    Every request first sleeps latency +- jitter seconds, then fails with error_status with
+    probability error_rate. With rate_limit set, requests above that rate are answered with
+    429 and a Retry-After header. requests and bytes_sent count what has been served.
+    '''
+
+    def __init__(self, fixtures=None, players=900, latency=0.0, jitter=0.0, error_rate=0.0, error_status=500,
+                 max_limit=100, host='127.0.0.1', port=0, seed=0, rate_limit=None):
+        '''
+        :param fixtures: directory of recorded fixtures, synthetic players are served when None
+        :param players: number of synthetic players
+        :param latency: seconds added to every response
+        :param jitter: maximum seconds randomly added to or removed from latency
+        :param error_rate: probability of answering a request with error_status
+        :param error_status: status code of injected errors
+        :param max_limit: largest page size served, like the real API larger limits are capped
+        :param port: port to listen on, 0 picks a free one
+        :param seed: seed of the latency and error randomness
+        :param rate_limit: requests per second served before throttling with 429, None for no limit
+        '''
+        self.data = FixtureData(fixtures) if fixtures else SyntheticData(players)
+        self.game_ids = {game['id'] for game in season_games()}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.max_limit = max_limit
+        self.rate_limit = rate_limit
+        self.requests = 0
+        self.throttled = 0
+        self.bytes_sent = 0
+        self.paths = {}
+        self.statuses = {}
+        self._tokens = float(rate_limit or 0)
+        self._tokens_updated = time.monotonic()
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def stats_url(self):
+        return self.base_url + 'stats/rest'
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests = 0
+            self.throttled = 0
+            self.bytes_sent = 0
+            self.paths = {}
+            self.statuses = {}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def _delay_and_error(self):
+        with self._lock:
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter) if self.jitter else self.latency
+            fail = self.error_rate and self._random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        return fail
+
+    def _throttle(self):
+        '''
+        :return: seconds the client should wait if this request is over rate_limit, otherwise 0
+        '''
+        if not self.rate_limit:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(float(self.rate_limit), self._tokens + (now - self._tokens_updated) * self.rate_limit)
+            self._tokens_updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            self.throttled += 1
+            return (1 - self._tokens) / self.rate_limit
+
+    def respond(self, path, query):
+        '''
+        :return: (status, payload) for a request
+        '''
+        if path.rstrip('/').endswith('/v1/season'):
+            return 200, self.data.seasons()
+
+        match = re.search(r'/v1/schedule/(\d{4}-\d{2}-\d{2})$', path)
+        if match is not None:
+            return 200, make_schedule_week(datetime.date.fromisoformat(match.group(1)))
+        match = re.search(r'/v1/gamecenter/(\d+)/(boxscore|play-by-play)$', path)
+        if match is not None:
+            if int(match.group(1)) not in self.game_ids:
+                return 404, {'message': f"no such game {match.group(1)}"}
+            make = make_boxscore if match.group(2) == 'boxscore' else make_play_by_play
+            return 200, make(int(match.group(1)))
+
+        match = re.search(r'/stats/rest/en/skater/(\w+)$', path)
+        if match is None or match.group(1) not in REPORTS:
+            return 404, {'message': f"no such report {path}"}
+
+        try:
+            clauses = parse_cayenne(query.get('cayenneExp', [''])[0])
+        except ValueError as e:
+            return 400, {'message': str(e)}
+
+        rows = self.data.rows(match.group(1), clauses)
+        rows = sort_rows(rows, query.get('sort', ['playerId'])[0])
+
+        start = int(query.get('start', ['0'])[0])
+        limit = int(query.get('limit', ['50'])[0])
+        if limit < 0 or limit > self.max_limit:
+            limit = self.max_limit
+        return 200, {'data': rows[start:start + limit], 'total': len(rows)}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                fail = server._delay_and_error()
+                retry_after = server._throttle()
+                if retry_after:
+                    status, payload = 429, {'message': 'too many requests'}
+                elif fail:
+                    status, payload = server.error_status, {'message': 'injected error'}
+                else:
+                    status, payload = server.respond(parsed.path, parse_qs(parsed.query))
+
+                body = json.dumps(payload).encode()
+                etag = '"' + hashlib.md5(body).hexdigest() + '"'
+                not_modified = status == 200 and self.headers.get('If-None-Match') == etag
+
+                with server._lock:
+                    server.requests += 1
+                    server.bytes_sent += 0 if not_modified else len(body)
+                    server.paths[parsed.path] = server.paths.get(parsed.path, 0) + 1
+                    code = 304 if not_modified else status
+                    server.statuses[code] = server.statuses.get(code, 0) + 1
+
+                if not_modified:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                if status == 200:
+                    self.send_header('ETag', etag)
+                if retry_after:
+                    self.send_header('Retry-After', f"{retry_after:.3f}")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def record(directory, season, stats_url='https://api.nhle.com/stats/rest', base_url='https://api-web.nhle.com/'):
+    '''
+    Records fixtures from the real API: every report of a season and the season list
+    '''
+    import requests
+
+    os.makedirs(directory, exist_ok=True)
+    with requests.Session() as session:
+        seasons = session.get(base_url + 'v1/season', timeout=30).json()
+        with open(os.path.join(directory, 'season.json'), 'w', encoding='utf-8') as f:
+            json.dump(seasons, f)
+
+        for report in REPORTS:
+            rows = []
+            while True:
+                response = session.get(f"{stats_url}/en/skater/{report}?limit=100&start={len(rows)}"
+                                       f"&sort=playerId&cayenneExp=seasonId={season}", timeout=30)
+                response.raise_for_status()
+                page = response.json()
+                # bios rows do not carry the season they were selected by
+                rows += [{'seasonId': season, **row} for row in page['data']]
+                if not page['data'] or len(rows) >= page['total']:
+                    break
+            with open(os.path.join(directory, f"{report}.json"), 'w', encoding='utf-8') as f:
+                json.dump({'data': rows}, f)
+            print(f"recorded {len(rows)} rows of {report}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the NHL stats API')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--fixtures', default=None, help='directory of recorded fixtures')
+    parser.add_argument('--players', type=int, default=900, help='number of synthetic players')
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=500)
+    parser.add_argument('--max-limit', type=int, default=100)
+    parser.add_argument('--rate-limit', type=float, default=None, help='requests per second before answering 429')
+    parser.add_argument('--record', default=None, help='record fixtures from the real API into this directory')
+    parser.add_argument('--season', type=int, default=CURRENT_SEASON, help='season to record')
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.season)
+        return
+
+    server = FakeNHLServer(fixtures=args.fixtures, players=args.players, latency=args.latency, jitter=args.jitter,
+                           error_rate=args.error_rate, error_status=args.error_status, max_limit=args.max_limit,
+                           port=args.port, rate_limit=args.rate_limit)
+    print(f"serving on {server.base_url}, stats_url={server.stats_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+'''
+Benchmark suite for NHLAPIWrapper against the local fake server
+
+Reports wall time, requests made and peak Python memory of full_report, skater_full_report,
+skaters_full_report and create_ID_dict, with the wrapper's defaults and with the original
+one-request-at-a-time behaviour for comparison.
+
+usage: python benchmarks/run_benchmarks.py [--latency 0.05] [--jitter 0.01] [--repeat 3] [--json out.json]
+'''
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from fake_server import FakeNHLServer
+from synthetic import CURRENT_SEASON, FIRST_PLAYER_ID
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import nhl_api
+
+# wrapper settings compared by the suite
+CONFIGS = {
+    'sequential': {'pagination': 'fixed', 'page_workers': 1, 'report_workers': 1},
+    'default': {},
+}
+
+ROSTER = [FIRST_PLAYER_ID + i for i in range(23)]
+
+SCENARIOS = {
+    'create_ID_dict': lambda wrapper: wrapper.create_ID_dict(),
+    'full_report': lambda wrapper: wrapper.full_report(),
+    'skater_full_report': lambda wrapper: wrapper.skater_full_report(ROSTER[0]),
+    'roster x skater_full_report': lambda wrapper: [wrapper.skater_full_report(skaterID) for skaterID in ROSTER],
+    'skaters_full_report(roster)': lambda wrapper: wrapper.skaters_full_report(ROSTER),
+}
+
+
+def make_wrapper(server, config):
+    return nhl_api.NHLAPIWrapper(base_url=server.base_url, stats_url=server.stats_url, id_cache_path=None,
+                                 season=CURRENT_SEASON, **config)
+
+
+def run_scenario(server, config, scenario, repeat):
+    '''
+    :return: dict of median seconds, requests per run and peak traced MiB
+    '''
+    times = []
+    requests = None
+    for _ in range(repeat):
+        wrapper = make_wrapper(server, config)
+        server.reset_counters()
+        gc.collect()
+        start = time.perf_counter()
+        result = scenario(wrapper)
+        times.append(time.perf_counter() - start)
+        requests = server.requests
+        wrapper.close()
+        if isinstance(result, list) and result and isinstance(result[0], int):
+            raise RuntimeError(f"scenario failed with {result}")
+
+    wrapper = make_wrapper(server, config)
+    gc.collect()
+    tracemalloc.start()
+    scenario(wrapper)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    wrapper.close()
+
+    return {'seconds': statistics.median(times), 'requests': requests, 'peak_mib': peak / 2 ** 20}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds the fake server adds to every response')
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--players', type=int, default=900)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--scenario', nargs='*', default=list(SCENARIOS))
+    parser.add_argument('--json', default=None, help='also write the results to this file')
+    args = parser.parse_args()
+
+    results = []
+    with FakeNHLServer(players=args.players, latency=args.latency, jitter=args.jitter) as server:
+        print(f"fake server at {server.base_url}, latency {args.latency}s +- {args.jitter}s, {args.players} players")
+        print(f"{'scenario':<30}{'config':<12}{'seconds':>10}{'requests':>10}{'peak MiB':>10}")
+        for name in args.scenario:
+            for config_name, config in CONFIGS.items():
+                result = run_scenario(server, config, SCENARIOS[name], args.repeat)
+                results.append({'scenario': name, 'config': config_name, **result})
+                print(f"{name:<30}{config_name:<12}{result['seconds']:>10.3f}{result['requests']:>10}"
+                      f"{result['peak_mib']:>10.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
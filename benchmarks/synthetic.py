@@ -0,0 +1,204 @@
+'''
+Deterministic synthetic stats REST payloads for benchmarking without api.nhle.com
+
+Rows carry the same fields as the real skater reports, with made up values. Schedules,
+boxscores and play-by-play are shaped like the api-web game documents.
+'''
+import datetime
+import random
+import zlib
+
+# fields returned by each stats REST skater report
+FIELDS = {
+    'summary': ['assists', 'evGoals', 'evPoints', 'faceoffWinPct', 'gameWinningGoals', 'gamesPlayed', 'goals',
+                'lastName', 'otGoals', 'penaltyMinutes', 'playerId', 'plusMinus', 'points', 'pointsPerGame',
+                'positionCode', 'ppGoals', 'ppPoints', 'seasonId', 'shGoals', 'shPoints', 'shootingPct',
+                'shootsCatches', 'shots', 'skaterFullName', 'teamAbbrevs', 'timeOnIcePerGame'],
+    'bios': ['assists', 'birthCity', 'birthCountryCode', 'birthDate', 'birthStateProvinceCode', 'currentTeamAbbrev',
+             'currentTeamName', 'draftOverall', 'draftRound', 'draftYear', 'firstSeasonForGameType', 'gamesPlayed',
+             'goals', 'height', 'isInHallOfFameYn', 'lastName', 'nationalityCode', 'playerId', 'points',
+             'positionCode', 'shootsCatches', 'skaterFullName', 'weight'],
+    'faceoffpercentages': ['defensiveZoneFaceoffPct', 'defensiveZoneFaceoffs', 'evFaceoffPct', 'evFaceoffs',
+                           'faceoffWinPct', 'gamesPlayed', 'lastName', 'neutralZoneFaceoffPct', 'neutralZoneFaceoffs',
+                           'offensiveZoneFaceoffPct', 'offensiveZoneFaceoffs', 'playerId', 'positionCode',
+                           'ppFaceoffPct', 'ppFaceoffs', 'seasonId', 'shFaceoffPct', 'shFaceoffs', 'shootsCatches',
+                           'skaterFullName', 'teamAbbrevs', 'timeOnIcePerGame', 'totalFaceoffs'],
+    'faceoffwins': ['defensiveZoneFaceoffLosses', 'defensiveZoneFaceoffWins', 'defensiveZoneFaceoffs', 'evFaceoffs',
+                    'evFaceoffsLost', 'evFaceoffsWon', 'faceoffWinPct', 'gamesPlayed', 'lastName',
+                    'neutralZoneFaceoffLosses', 'neutralZoneFaceoffWins', 'neutralZoneFaceoffs',
+                    'offensiveZoneFaceoffLosses', 'offensiveZoneFaceoffWins', 'offensiveZoneFaceoffs', 'playerId',
+                    'positionCode', 'ppFaceoffs', 'ppFaceoffsLost', 'ppFaceoffsWon', 'seasonId', 'shFaceoffs',
+                    'shFaceoffsLost', 'shFaceoffsWon', 'skaterFullName', 'teamAbbrevs', 'totalFaceoffLosses',
+                    'totalFaceoffWins', 'totalFaceoffs'],
+    'realtime': ['blockedShots', 'blockedShotsPer60', 'emptyNetAssists', 'emptyNetGoals', 'emptyNetPoints',
+                 'firstGoals', 'gamesPlayed', 'giveaways', 'giveawaysPer60', 'hits', 'hitsPer60', 'lastName',
+                 'missedShotCrossbar', 'missedShotGoalpost', 'missedShotOverNet', 'missedShotWideOfNet',
+                 'missedShots', 'otGoals', 'playerId', 'positionCode', 'seasonId', 'shootsCatches', 'skaterFullName',
+                 'takeaways', 'takeawaysPer60', 'teamAbbrevs', 'timeOnIcePerGame'],
+    'timeonice': ['evTimeOnIce', 'evTimeOnIcePerGame', 'gamesPlayed', 'lastName', 'otTimeOnIce',
+                  'otTimeOnIcePerOtGame', 'playerId', 'positionCode', 'ppTimeOnIce', 'ppTimeOnIcePerGame', 'seasonId',
+                  'shTimeOnIce', 'shTimeOnIcePerGame', 'shifts', 'shiftsPerGame', 'shootsCatches', 'skaterFullName',
+                  'teamAbbrevs', 'timeOnIce', 'timeOnIcePerGame', 'timeOnIcePerShift'],
+}
+
+FIRST_NAMES = ['Connor', 'Nathan', 'Auston', 'Leon', 'Nikita', 'David', 'Sidney', 'Alex', 'Cale', 'Quinn',
+               'Jack', 'Elias', 'Mikko', 'Kirill', 'Artemi', 'Brady', 'Matthew', 'Jason', 'Aleksander', 'Jesper']
+LAST_NAMES = ['McDavid', 'MacKinnon', 'Matthews', 'Draisaitl', 'Kucherov', 'Pastrnak', 'Crosby', 'Ovechkin',
+              'Makar', 'Hughes', 'Eichel', 'Pettersson', 'Rantanen', 'Kaprizov', 'Panarin', 'Tkachuk', 'Barzal',
+              'Robertson', 'Barkov', 'Bratt', 'Stützle', 'Lafrenière', 'Šimek', 'Nylander']
+TEAMS = ['ANA', 'BOS', 'BUF', 'CAR', 'CBJ', 'CGY', 'CHI', 'COL', 'DAL', 'DET', 'EDM', 'FLA', 'LAK', 'MIN',
+         'MTL', 'NJD', 'NSH', 'NYI', 'NYR', 'OTT', 'PHI', 'PIT', 'SEA', 'SJS', 'STL', 'TBL', 'TOR', 'VAN',
+         'VGK', 'WPG', 'WSH']
+FIRST_PLAYER_ID = 8470000
+CURRENT_SEASON = 20232024
+
+
+def player_name(index):
+    return f"{FIRST_NAMES[index % len(FIRST_NAMES)]} {LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)]}"
+
+
+def make_row(report, player_index, season=CURRENT_SEASON):
+    '''
+    One synthetic row of a skater report for a player in a season
+    '''
+    rng = random.Random(zlib.crc32(f"{report}:{player_index}:{season}".encode()))
+    name = player_name(player_index)
+    row = {}
+    for field in FIELDS[report]:
+        if field == 'playerId':
+            row[field] = FIRST_PLAYER_ID + player_index
+        elif field == 'seasonId':
+            row[field] = season
+        elif field == 'skaterFullName':
+            row[field] = name
+        elif field == 'lastName':
+            row[field] = name.split(' ', 1)[1]
+        elif field in ('teamAbbrevs', 'currentTeamAbbrev'):
+            row[field] = TEAMS[(player_index + season) % len(TEAMS)]
+        elif field == 'currentTeamName':
+            row[field] = f"Team {TEAMS[(player_index + season) % len(TEAMS)]}"
+        elif field == 'positionCode':
+            row[field] = 'CLRD'[player_index % 4]
+        elif field == 'shootsCatches':
+            row[field] = 'LR'[player_index % 2]
+        elif field in ('birthCity', 'birthCountryCode', 'birthStateProvinceCode', 'nationalityCode'):
+            row[field] = 'CAN' if player_index % 3 else 'USA'
+        elif field == 'birthDate':
+            row[field] = f"{1985 + player_index % 20}-{1 + player_index % 12:02d}-{1 + player_index % 28:02d}"
+        elif field == 'isInHallOfFameYn':
+            row[field] = 'N'
+        elif field.endswith(('Pct', 'PerGame', 'Per60', 'PerShift', 'PerOtGame')):
+            row[field] = round(rng.random(), 4)
+        else:
+            row[field] = rng.randint(0, 1500)
+    return row
+
+
+def debut_season(player_index):
+    '''
+    First season of a synthetic player, careers span up to 12 seasons ending in CURRENT_SEASON
+    '''
+    year = int(str(CURRENT_SEASON)[:4]) - player_index % 12
+    return int(f"{year}{year + 1}")
+
+
+def make_rows(report, players, season=CURRENT_SEASON):
+    '''
+    One row per player active in season of a league-wide report
+    '''
+    return [make_row(report, i, season) for i in range(players) if debut_season(i) <= season]
+
+
+def make_career(report, player_index):
+    '''
+    One row per season a player has played of a per-skater report
+    '''
+    first_year, last_year = int(str(debut_season(player_index))[:4]), int(str(CURRENT_SEASON)[:4])
+    return [make_row(report, player_index, int(f"{year}{year + 1}")) for year in range(first_year, last_year + 1)]
+
+
+def season_dates(season=CURRENT_SEASON):
+    '''
+    :return: (preseason start, regular season start, regular season end, playoff end) of a synthetic season
+    '''
+    year = int(str(season)[:4])
+    return (datetime.date(year, 9, 23), datetime.date(year, 10, 10), datetime.date(year + 1, 4, 18),
+            datetime.date(year + 1, 6, 24))
+
+
+def season_games(season=CURRENT_SEASON, regular=1312, playoffs=84):
+    '''
+    Synthetic schedule: regular season games spread evenly over the regular season, then the playoffs
+
+    :return: list of schedule game dicts shaped like the ones of api-web /v1/schedule
+    '''
+    year = int(str(season)[:4])
+    preseason, start, end, playoff_end = season_dates(season)
+    games = []
+    for game_type, count, first, last in ((2, regular, start, end),
+                                          (3, playoffs, end + datetime.timedelta(days=2), playoff_end)):
+        days = (last - first).days + 1
+        for number in range(1, count + 1):
+            date = first + datetime.timedelta(days=(number - 1) * days // count)
+            home = TEAMS[(number * 7 + game_type) % len(TEAMS)]
+            away = TEAMS[(number * 7 + game_type + 1 + number % 5) % len(TEAMS)]
+            games.append({'id': int(f"{year}{game_type:02d}{number:04d}"), 'season': season, 'gameType': game_type,
+                          'gameDate': date.isoformat(), 'gameState': 'OFF',
+                          'awayTeam': {'abbrev': away}, 'homeTeam': {'abbrev': home}})
+    return games
+
+
+def make_schedule_week(date, season=CURRENT_SEASON):
+    '''
+    :param date: first day of the week, a datetime.date
+    :return: payload of /v1/schedule/{date}
+    '''
+    preseason, start, end, playoff_end = season_dates(season)
+    days = {}
+    for game in season_games(season):
+        day = datetime.date.fromisoformat(game['gameDate'])
+        if date <= day < date + datetime.timedelta(days=7):
+            days.setdefault(game['gameDate'], []).append(game)
+    week = [{'date': (date + datetime.timedelta(days=i)).isoformat(),
+             'games': days.get((date + datetime.timedelta(days=i)).isoformat(), [])} for i in range(7)]
+    return {'nextStartDate': (date + datetime.timedelta(days=7)).isoformat(),
+            'previousStartDate': (date - datetime.timedelta(days=7)).isoformat(), 'gameWeek': week,
+            'preSeasonStartDate': preseason.isoformat(), 'regularSeasonStartDate': start.isoformat(),
+            'regularSeasonEndDate': end.isoformat(), 'playoffEndDate': playoff_end.isoformat()}
+
+
+def make_boxscore(gameId):
+    '''
+    :return: payload of /v1/gamecenter/{gameId}/boxscore with 20 skaters and 2 goalies per team
+    '''
+    rng = random.Random(gameId)
+    teams = {}
+    for side in ('awayTeam', 'homeTeam'):
+        players = [{'playerId': FIRST_PLAYER_ID + rng.randrange(900), 'sweaterNumber': rng.randint(1, 98),
+                    'name': {'default': player_name(rng.randrange(900))}, 'goals': rng.randint(0, 2),
+                    'assists': rng.randint(0, 2), 'hits': rng.randint(0, 6), 'shots': rng.randint(0, 7),
+                    'pim': rng.choice([0, 0, 0, 2, 4]), 'toi': f"{rng.randint(5, 25):02d}:{rng.randint(0, 59):02d}"}
+                   for _ in range(22)]
+        teams[side] = {'forwards': players[:12], 'defense': players[12:20], 'goalies': players[20:]}
+    return {'id': gameId, 'season': int(str(gameId)[:4]) * 10001 + 1, 'gameType': int(str(gameId)[4:6]),
+            'gameState': 'OFF', 'awayTeam': {'score': rng.randint(0, 6)}, 'homeTeam': {'score': rng.randint(0, 6)},
+            'playerByGameStats': teams}
+
+
+def make_play_by_play(gameId, plays=320):
+    '''
+    :return: payload of /v1/gamecenter/{gameId}/play-by-play with plays events
+    '''
+    rng = random.Random(-gameId)
+    kinds = ['faceoff', 'hit', 'shot-on-goal', 'missed-shot', 'blocked-shot', 'giveaway', 'takeaway', 'stoppage',
+             'penalty', 'goal']
+    events = []
+    for eventId in range(plays):
+        period = 1 + eventId * 3 // plays
+        events.append({'eventId': eventId, 'periodDescriptor': {'number': period, 'periodType': 'REG'},
+                       'timeInPeriod': f"{rng.randint(0, 19):02d}:{rng.randint(0, 59):02d}",
+                       'typeDescKey': rng.choice(kinds), 'sortOrder': eventId,
+                       'details': {'xCoord': rng.randint(-99, 99), 'yCoord': rng.randint(-42, 42),
+                                   'zoneCode': rng.choice('ODN'), 'eventOwnerTeamId': rng.randint(1, 55),
+                                   'playerId': FIRST_PLAYER_ID + rng.randrange(900)}})
+    return {'id': gameId, 'season': int(str(gameId)[:4]) * 10001 + 1, 'gameState': 'OFF', 'plays': events}
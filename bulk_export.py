@@ -0,0 +1,212 @@
+'''
+Bulk export of the league and per-skater reports to Parquet, Feather or CSV
+
+full_report is written straight from its Arrow output. Many players' skater_full_report
+are fetched in chunks of players, each chunk with the batched skaters_full_report, and the
+chunks are spread across worker processes that each hold their own NHLAPIWrapper, so
+decoding, merging and Arrow conversion run in parallel. CSV is written in record batches
+rather than built as one string. Excel stays available as the slow path.
+
+usage: python bulk_export.py skaters.parquet --skaters 8478402 8477934 --processes 4
+       python bulk_export.py league.feather --compression zstd
+'''
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from nhl_api import NHLAPIWrapper
+
+FORMATS = ('parquet', 'feather', 'csv', 'xlsx')
+
+# compression used when none is given, CSV and Excel are written uncompressed
+DEFAULT_COMPRESSION = {'parquet': 'snappy', 'feather': 'lz4'}
+
+# NHLAPIWrapper settings handed to the worker processes
+WORKER_OPTIONS = ['base_url', 'stats_url', 'season', 'pagination', 'max_retries', 'max_throttled_retries', 'backoff',
+                  'max_backoff', 'report_workers', 'fast_json']
+
+_worker_wrapper = None
+
+
+def format_of(path, format=None):
+    '''
+    :return: format given, or guessed from the extension of path, e.g. 'parquet' for league.parquet
+    '''
+    if format is None:
+        name = path[:-3] if path.endswith('.gz') else path
+        format = os.path.splitext(name)[1].lstrip('.').lower()
+        format = {'pq': 'parquet', 'arrow': 'feather', 'ipc': 'feather', 'xls': 'xlsx'}.get(format, format)
+    if format not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}, not {format!r}")
+    return format
+
+
+def write_table(table, path, format=None, compression=None, batch_size=10_000):
+    '''
+    Writes a pyarrow Table
+
+    :param table: pyarrow Table to write
+    :param path: output file
+    :param format: 'parquet', 'feather', 'csv' or 'xlsx', guessed from the extension of path if None
+    :param compression: codec of the format, e.g. 'zstd' for Parquet and Feather or 'gzip' for CSV,
+                        defaults to DEFAULT_COMPRESSION, or gzip for a .csv.gz path
+    :param batch_size: rows per record batch written to a CSV file
+    :return: path
+    '''
+    format = format_of(path, format)
+    if compression is None and format == 'csv' and path.endswith('.gz'):
+        compression = 'gzip'
+    compression = compression or DEFAULT_COMPRESSION.get(format)
+
+    if format == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, path, compression=compression)
+    elif format == 'feather':
+        import pyarrow.feather as feather
+        feather.write_feather(table, path, compression=compression)
+    elif format == 'csv':
+        import pyarrow as pa
+        import pyarrow.csv as csv
+        sink = pa.CompressedOutputStream(path, compression) if compression else pa.OSFile(path, 'wb')
+        with sink, csv.CSVWriter(sink, table.schema) as writer:
+            for batch in table.to_batches(max_chunksize=batch_size):
+                writer.write_batch(batch)
+    else:
+        try:
+            import openpyxl
+        except ImportError:
+            raise ImportError("format='xlsx' requires openpyxl, install it with 'pip install openpyxl'")
+        table.to_pandas().to_excel(path, index=False)
+    return path
+
+
+def skater_table(reports, skaterIDs):
+    '''
+    :param reports: dict of playerID : full report separated by season, as returned by skaters_full_report
+    :param skaterIDs: players in the order their rows are written
+    :return: pyarrow Table with one row per player and season
+    '''
+    import pyarrow as pa
+
+    rows = [season for skaterID in skaterIDs for season in reports.get(skaterID, [])]
+    # from_pylist takes its columns from the first row, seasons before a stat was tracked lack it
+    columns = dict.fromkeys(name for row in rows for name in row)
+    return pa.Table.from_pydict({name: [row.get(name) for row in rows] for name in columns})
+
+
+def export_full_report(wrapper, path, format=None, compression=None):
+    '''
+    Writes the merged league report, one row per player
+
+    :param wrapper: NHLAPIWrapper the report is fetched with
+    :param path: output file, see write_table for format and compression
+    :return: dict with the path and number of rows written, or [status_code, text] if any report failed
+    '''
+    table = wrapper.full_report(output='arrow')
+    if isinstance(table, list):
+        return table
+    write_table(table, path, format=format, compression=compression)
+    return {'path': path, 'rows': table.num_rows}
+
+
+def _init_worker(options, rate_limit):
+    global _worker_wrapper
+    _worker_wrapper = NHLAPIWrapper(id_cache_path=None, rate_limit=rate_limit, **options)
+
+
+def _export_chunk(skaterIDs, batch_size):
+    '''
+    Runs in a worker process
+
+    :return: pyarrow Table of the chunk's players, or [status_code, text] if any request failed
+    '''
+    reports = _worker_wrapper.skaters_full_report(skaterIDs, batch_size=batch_size)
+    if isinstance(reports, list):
+        return reports
+    return skater_table(reports, skaterIDs)
+
+
+def export_skater_reports(wrapper, skaterIDs, path, format=None, compression=None, processes=None,
+                          chunk_size=100, batch_size=50):
+    '''
+    Writes the full report of many skaters, one row per player and season, in the order of skaterIDs
+
+    :param wrapper: NHLAPIWrapper the reports are fetched with, worker processes get one with the same settings
+    :param skaterIDs: iterable of unique identifiers of skaters
+    :param path: output file, see write_table for format and compression
+    :param processes: number of worker processes, defaults to one per chunk up to the number of CPUs,
+                      1 fetches everything in this process
+    :param chunk_size: players per unit of work handed to a process
+    :param batch_size: player IDs per request, see skaters_full_report
+    :return: dict with the path and number of rows written, or [status_code, text] if any request failed
+    '''
+    import pyarrow as pa
+
+    skaterIDs = list(dict.fromkeys(int(skaterID) for skaterID in skaterIDs))
+    chunks = [skaterIDs[i:i + chunk_size] for i in range(0, len(skaterIDs), chunk_size)]
+    processes = min(processes or os.cpu_count() or 1, len(chunks) or 1)
+
+    if processes <= 1:
+        tables = []
+        for chunk in chunks:
+            reports = wrapper.skaters_full_report(chunk, batch_size=batch_size)
+            if isinstance(reports, list):
+                return reports
+            tables.append(skater_table(reports, chunk))
+    else:
+        options = {name: getattr(wrapper, name) for name in WORKER_OPTIONS}
+        options['max_page_size'] = wrapper.page_size
+        # The rate limit is split between the processes, a TokenBucket cannot be shared across them
+        rate_limit = wrapper.rate_limiter.rate / processes if wrapper.rate_limiter is not None else None
+
+        tables = [None] * len(chunks)
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(options, rate_limit)) as executor:
+            futures = {executor.submit(_export_chunk, chunk, batch_size): i for i, chunk in enumerate(chunks)}
+            for future in as_completed(futures):
+                table = future.result()
+                if isinstance(table, list):
+                    for pending in futures:
+                        pending.cancel()
+                    return table
+                tables[futures[future]] = table
+
+    tables = [table for table in tables if table.num_rows]
+    table = pa.concat_tables(tables, promote_options='permissive') if tables else pa.table({})
+    write_table(table, path, format=format, compression=compression)
+    return {'path': path, 'rows': table.num_rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the league report or many skater reports')
+    parser.add_argument('path', help='output file, its extension picks the format unless --format is given')
+    parser.add_argument('--format', choices=FORMATS, default=None)
+    parser.add_argument('--compression', default=None, help='e.g. zstd, lz4, snappy or gzip')
+    parser.add_argument('--skaters', type=int, nargs='*', default=None,
+                        help='playerIds to export the full reports of, the league report if not given')
+    parser.add_argument('--all-skaters', action='store_true', help='export the full report of every current skater')
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args()
+
+    with NHLAPIWrapper(id_cache_path=None) as wrapper:
+        skaterIDs = args.skaters
+        if args.all_skaters:
+            league = wrapper.full_report()
+            if isinstance(league, list):
+                print(f"export failed with {league[0]}: {league[1][:200]}")
+                return
+            skaterIDs = list(league)
+        if skaterIDs:
+            result = export_skater_reports(wrapper, skaterIDs, args.path, format=args.format,
+                                           compression=args.compression, processes=args.processes)
+        else:
+            result = export_full_report(wrapper, args.path, format=args.format, compression=args.compression)
+
+    if isinstance(result, list):
+        print(f"export failed with {result[0]}: {result[1][:200]}")
+    else:
+        print(f"{result['rows']} rows written to {result['path']}")
+
+
+if __name__ == '__main__':
+    main()
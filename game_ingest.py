@@ -0,0 +1,363 @@
+'''
+Game-level ingestion of boxscores and play-by-play from api-web.nhle.com
+
+A season's schedule is enumerated week by week, all weeks at once. The documents of every
+finished game not stored yet are then fetched concurrently on a bounded pool, under the
+wrapper's rate limit and an optional per-run request budget. Each document is stored as
+its zlib-compressed response body in one SQLite file, written in batches as results
+arrive. A document is only stored once its game is final, so an interrupted run, or a run
+during the season, resumes with exactly the games still missing.
+
+Tables of the store:
+    games(game_id, season, game_type, game_date, state, away, home)   the schedule
+    documents(game_id, kind, body, size, fetched_at)                  compressed game documents
+    seasons(season, complete, fetched_at, end_date)                   schedules known to be final
+
+usage: python game_ingest.py --season 20232024 --db games.sqlite --workers 16 --rate 20
+'''
+import argparse
+import datetime
+import os
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from nhl_api import NHLAPIError, decode_json
+
+# game documents ingested by default
+DOCUMENTS = ['boxscore', 'play-by-play']
+
+# regular season and playoffs, 1 is the preseason
+GAME_TYPES = (2, 3)
+
+# gameState of a game whose documents no longer change
+FINAL_STATES = frozenset(['OFF', 'FINAL'])
+
+
+def season_bounds(schedule, season):
+    '''
+    :param schedule: a /v1/schedule payload of a date in the season
+    :param season: seasonId, e.g. 20232024
+    :return: (first day, last day) of the season, September 1st to June 30th if the payload does not say
+    '''
+    year = int(str(season)[:4])
+    first = schedule.get('preSeasonStartDate') or schedule.get('regularSeasonStartDate') or f"{year}-09-01"
+    last = schedule.get('playoffEndDate') or schedule.get('regularSeasonEndDate') or f"{year + 1}-06-30"
+    return datetime.date.fromisoformat(first[:10]), datetime.date.fromisoformat(last[:10])
+
+
+def season_end(schedule, season):
+    '''
+    :param schedule: a /v1/schedule payload of a date in the season
+    :param season: seasonId, e.g. 20232024
+    :return: last day of the playoffs, June 30th if the payload does not say
+    '''
+    end = schedule.get('playoffEndDate') or f"{int(str(season)[:4]) + 1}-06-30"
+    return datetime.date.fromisoformat(end[:10])
+
+
+class GameStore:
+    '''
+    SQLite file of a schedule and the compressed game documents
+    '''
+
+    def __init__(self, path, level=6):
+        '''
+        :param path: SQLite file
+        :param level: zlib compression level of the stored documents
+        '''
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.level = level
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS games (
+                                  game_id INTEGER PRIMARY KEY,
+                                  season INTEGER NOT NULL,
+                                  game_type INTEGER NOT NULL,
+                                  game_date TEXT,
+                                  state TEXT,
+                                  away TEXT,
+                                  home TEXT)''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS games_season ON games (season, game_type)')
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS documents (
+                                  game_id INTEGER NOT NULL,
+                                  kind TEXT NOT NULL,
+                                  body BLOB NOT NULL,
+                                  size INTEGER NOT NULL,
+                                  fetched_at REAL NOT NULL,
+                                  PRIMARY KEY (game_id, kind))''')
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS seasons (
+                                  season INTEGER PRIMARY KEY,
+                                  complete INTEGER NOT NULL,
+                                  fetched_at REAL NOT NULL,
+                                  end_date TEXT)''')
+        # Stores written before the end date was kept refetch their schedule once
+        if 'end_date' not in [row[1] for row in self._conn.execute('PRAGMA table_info(seasons)')]:
+            self._conn.execute('ALTER TABLE seasons ADD COLUMN end_date TEXT')
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def compress(self, content):
+        return zlib.compress(content, self.level)
+
+    def put_schedule(self, season, games, end_date=None):
+        '''
+        Stores a season's schedule, replacing the state of games already stored
+
+        Every game listed being final is not enough: after the regular season no playoff game
+        is scheduled yet. The schedule is only complete once the season's end date has passed.
+
+        :param games: schedule game dicts as in a /v1/schedule gameWeek
+        :param end_date: last day of the season's playoffs, a datetime.date, None if unknown
+        :return: True if the season is over and every game of the schedule is final
+        '''
+        rows = [(game['id'], game.get('season', season), game.get('gameType'), game.get('gameDate'),
+                 game.get('gameState'), game.get('awayTeam', {}).get('abbrev'), game.get('homeTeam', {}).get('abbrev'))
+                for game in games]
+        complete = end_date is not None and end_date < datetime.date.today() and bool(rows) and \
+            all(row[4] in FINAL_STATES for row in rows)
+        with self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            self._conn.execute('INSERT OR REPLACE INTO seasons VALUES (?, ?, ?, ?)',
+                               (season, int(complete), time.time(), end_date.isoformat() if end_date else None))
+        return complete
+
+    def schedule_complete(self, season):
+        '''
+        :return: True if the season was over when its stored schedule was fetched and every game was final,
+                 it will not change anymore
+        '''
+        row = self._conn.execute('SELECT complete, end_date FROM seasons WHERE season = ?', (season,)).fetchone()
+        return bool(row and row[0] and row[1] and datetime.date.fromisoformat(row[1]) < datetime.date.today())
+
+    def games(self, season, game_types=GAME_TYPES):
+        '''
+        :return: list of (game_id, state) of the stored schedule, in game_id order
+        '''
+        marks = ','.join('?' * len(game_types))
+        return self._conn.execute(f'SELECT game_id, state FROM games WHERE season = ? AND game_type IN ({marks}) '
+                                  'ORDER BY game_id', (season, *game_types)).fetchall()
+
+    def missing(self, season, kinds=DOCUMENTS, game_types=GAME_TYPES):
+        '''
+        :return: list of (game_id, kind) of final games of the season whose document is not stored yet
+        '''
+        stored = set(self._conn.execute(
+            'SELECT d.game_id, d.kind FROM documents d JOIN games g ON g.game_id = d.game_id WHERE g.season = ?',
+            (season,)))
+        return [(game_id, kind) for game_id, state in self.games(season, game_types) if state in FINAL_STATES
+                for kind in kinds if (game_id, kind) not in stored]
+
+    def put_documents(self, documents):
+        '''
+        :param documents: iterable of (game_id, kind, compressed body, uncompressed size)
+        '''
+        now = time.time()
+        with self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?)',
+                                   [(game_id, kind, body, size, now) for game_id, kind, body, size in documents])
+
+    def document(self, game_id, kind):
+        '''
+        :return: decoded game document, None if it is not stored
+        '''
+        row = self._conn.execute('SELECT body FROM documents WHERE game_id = ? AND kind = ?',
+                                 (game_id, kind)).fetchone()
+        return decode_json(zlib.decompress(row[0])) if row else None
+
+    def iter_documents(self, season, kind):
+        '''
+        Yields (game_id, decoded document) of a season's stored documents, in game_id order
+        '''
+        cursor = self._conn.execute('SELECT d.game_id, d.body FROM documents d JOIN games g ON g.game_id = d.game_id '
+                                    'WHERE g.season = ? AND d.kind = ? ORDER BY d.game_id', (season, kind))
+        for game_id, body in cursor:
+            yield game_id, decode_json(zlib.decompress(body))
+
+    def stats(self):
+        '''
+        :return: dict of games and documents stored, and the uncompressed and stored bytes of the documents
+        '''
+        games = self._conn.execute('SELECT COUNT(*) FROM games').fetchone()[0]
+        documents, size, stored = self._conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(body)), 0) FROM documents').fetchone()
+        return {'games': games, 'documents': documents, 'bytes': size, 'stored_bytes': stored}
+
+
+class GameIngest:
+    def __init__(self, wrapper, store, documents=None, game_types=GAME_TYPES, max_workers=16, request_budget=None,
+                 batch_size=50):
+        '''
+        :param wrapper: NHLAPIWrapper the schedule and documents are fetched with, its rate_limit is the
+                        sustained request rate of the ingestion
+        :param store: GameStore the schedule and documents are written to
+        :param documents: game documents to store, defaults to DOCUMENTS
+        :param game_types: gameTypes ingested, defaults to the regular season and playoffs
+        :param max_workers: maximum number of requests in flight
+        :param request_budget: maximum number of requests a single run makes, None for no limit
+        :param batch_size: documents written to the store per transaction
+        '''
+        self.wrapper = wrapper
+        self.store = store
+        self.documents = list(documents or DOCUMENTS)
+        self.game_types = tuple(game_types)
+        self.max_workers = max_workers
+        self.request_budget = request_budget
+        self.batch_size = batch_size
+
+    def _schedule_json(self, date):
+        return self.wrapper.get_json(self.wrapper.base_url + f"v1/schedule/{date}")
+
+    def fetch_schedule(self, season):
+        '''
+        Fetches every week of the season at once and stores the season's games
+
+        The first request, the week of October 1st, tells the first and last day of the season.
+
+        :return: (games of the season's schedule, requests made)
+        :raises NHLAPIError: if a week could not be fetched
+        '''
+        probe = self._schedule_json(f"{str(season)[:4]}-10-01")
+        first, last = season_bounds(probe, season)
+
+        weeks = []
+        day = first
+        while day <= last:
+            weeks.append(day.isoformat())
+            day += datetime.timedelta(days=7)
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            schedules = [probe] + list(executor.map(self._schedule_json, weeks))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        games = {}
+        for schedule in schedules:
+            for game_day in schedule.get('gameWeek', []):
+                for game in game_day.get('games', []):
+                    if game.get('season', season) == season:
+                        games[game['id']] = game
+        games = [games[game_id] for game_id in sorted(games)]
+        self.store.put_schedule(season, games, season_end(probe, season))
+        return games, len(schedules)
+
+    def _fetch_document(self, game_id, kind):
+        '''
+        Runs on the pool: fetches and compresses one document
+
+        The response body is stored as is, it is not decoded.
+
+        :return: (game_id, kind, compressed body, uncompressed size)
+        '''
+        url = self.wrapper.game_url(game_id, kind)
+        response = self.wrapper.get(url)
+        if response.status_code != 200:
+            raise NHLAPIError(response.status_code, response.text, url)
+        return game_id, kind, self.store.compress(response.content), len(response.content)
+
+    def run(self, season, refresh_schedule=None):
+        '''
+        Fetches the documents of every final game of the season not stored yet
+
+        A failed document is not stored and is retried by the next run.
+
+        :param refresh_schedule: fetch the schedule again, by default only if the stored one is not complete
+        :return: dict with the games scheduled, documents stored, failed and left over because of the
+                 request budget, requests made, bytes fetched and stored, and seconds taken
+        '''
+        started = time.perf_counter()
+        requests_made = 0
+        if refresh_schedule or (refresh_schedule is None and not self.store.schedule_complete(season)):
+            requests_made = self.fetch_schedule(season)[1]
+
+        queue = self.store.missing(season, self.documents, self.game_types)
+        queue.reverse()
+        stored = 0
+        fetched_bytes = stored_bytes = 0
+        failed = []
+        batch = []
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        running = {}
+        try:
+            while queue or running:
+                # Keep the pool full while the request budget lasts
+                while queue and len(running) < self.max_workers and \
+                        (self.request_budget is None or requests_made < self.request_budget):
+                    unit = queue.pop()
+                    running[executor.submit(self._fetch_document, *unit)] = unit
+                    requests_made += 1
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    game_id, kind = running.pop(future)
+                    try:
+                        document = future.result()
+                    except Exception as e:
+                        failed.append({'game_id': game_id, 'kind': kind, 'error': str(e)})
+                        continue
+                    batch.append(document)
+                    fetched_bytes += document[3]
+                    stored_bytes += len(document[2])
+
+                if len(batch) >= self.batch_size:
+                    self.store.put_documents(batch)
+                    stored += len(batch)
+                    batch = []
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            # What arrived before an interruption is kept for the next run
+            if batch:
+                self.store.put_documents(batch)
+                stored += len(batch)
+
+        return {'games': len(self.store.games(season, self.game_types)), 'stored': stored, 'failed': failed,
+                'remaining': len(queue), 'requests': requests_made, 'bytes': fetched_bytes,
+                'stored_bytes': stored_bytes, 'seconds': time.perf_counter() - started}
+
+
+def main():
+    from nhl_api import NHLAPIWrapper
+
+    parser = argparse.ArgumentParser(description='Ingest the boxscores and play-by-play of a season')
+    parser.add_argument('--season', type=int, required=True, help='seasonId, e.g. 20232024')
+    parser.add_argument('--db', default='games.sqlite', help='SQLite file of the store')
+    parser.add_argument('--documents', nargs='*', default=DOCUMENTS)
+    parser.add_argument('--game-types', type=int, nargs='*', default=list(GAME_TYPES),
+                        help='1 preseason, 2 regular season, 3 playoffs')
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--rate', type=float, default=20.0, help='requests per second')
+    parser.add_argument('--budget', type=int, default=None, help='maximum number of requests for this run')
+    parser.add_argument('--refresh-schedule', action='store_true', help='fetch the schedule even if complete')
+    args = parser.parse_args()
+
+    with NHLAPIWrapper(pool_size=args.workers, id_cache_path=None, rate_limit=args.rate) as wrapper, \
+            GameStore(args.db) as store:
+        ingest = GameIngest(wrapper, store, documents=args.documents, game_types=args.game_types,
+                            max_workers=args.workers, request_budget=args.budget)
+        result = ingest.run(args.season, refresh_schedule=args.refresh_schedule or None)
+
+    ratio = result['stored_bytes'] / result['bytes'] if result['bytes'] else 0
+    print(f"{result['games']} games scheduled, {result['stored']} documents stored in {result['seconds']:.1f}s "
+          f"({result['bytes'] / 1e6:.1f} MB, {ratio:.0%} after compression), {len(result['failed'])} failed, "
+          f"{result['remaining']} left for the next run")
+    for failure in result['failed']:
+        print(f"  {failure['game_id']} {failure['kind']}: {failure['error']}")
+
+
+if __name__ == '__main__':
+    main()
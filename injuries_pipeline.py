@@ -0,0 +1,295 @@
+'''
+Injury database ETL: games missed per player and season, upserted into SQL
+
+The UTF-16, tab separated export of the NHL injury database is read in chunks. Names
+and seasons are normalized with vectorized string operations on the distinct values
+only, and every chunk is reduced to games missed per (Player, Season) before the next
+one is read. The result is compared with the table and only new or changed rows are
+written, with batched multi-row upserts.
+
+build_injury_dataset joins the games missed onto the per-season skater reports by playerId.
+
+usage: python injuries_pipeline.py 'NHL Injury Database_data.csv' --db sqlite:///injuries.sqlite
+'''
+import argparse
+import time
+
+import pandas as pd
+import sqlalchemy as sa
+
+from nhl_api import NameIndex, sort_by
+
+# columns of the export the pipeline reads
+CSV_COLUMNS = ['Player', 'Season', 'Games Missed']
+
+# key of the injuries table
+KEY = ['Player', 'Season']
+
+
+def normalize_players(names):
+    '''
+    Folds accents to ASCII and turns "Last, First" around to "First Last"
+
+    Only the distinct names are normalized, a chunk repeats the same players many times.
+
+    :param names: Series of player names as in the export
+    :return: Series of normalized names, aligned with names
+    '''
+    codes, uniques = pd.factorize(names)
+    folded = pd.Series(uniques, dtype='object').str.normalize('NFKD').str.encode('ascii', 'ignore') \
+        .str.decode('utf-8')
+    parts = folded.str.split(', ', n=1, expand=True)
+    if parts.shape[1] == 2:
+        folded = (parts[1] + ' ' + parts[0]).fillna(folded)
+    normalized = folded.to_numpy()[codes]
+    # factorize marks missing names with -1
+    normalized[codes == -1] = None
+    return pd.Series(normalized, index=names.index, dtype='object')
+
+
+def season_years(seasons):
+    '''
+    :param seasons: Series of seasons as in the export, e.g. '2019-20' or '2019-20 (playoffs)'
+    :return: Series of the starting year, missing for playoff seasons and unparseable values
+    '''
+    codes, uniques = pd.factorize(seasons)
+    uniques = pd.Series(uniques, dtype='object')
+    # float64 so that missing years can be NaN, a chunk of regular seasons alone would parse to int64
+    years = pd.to_numeric(uniques.str.extract(r'(\d{4})', expand=False), errors='coerce').astype('float64')
+    years[uniques.str.contains(r'\(playoffs\+?\)', na=False)] = float('nan')
+    years = years.to_numpy()[codes]
+    years[codes == -1] = float('nan')
+    return pd.Series(years, index=seasons.index)
+
+
+def season_ids(years):
+    '''
+    :param years: Series or array of starting years, e.g. 2019 or '2019'
+    :return: stats REST seasonIds, e.g. 20192020
+    '''
+    years = pd.to_numeric(years).astype('int64')
+    return years * 10000 + years + 1
+
+
+def attach_player_ids(injuries, name_index, max_distance=1):
+    '''
+    Maps the Player column to NHL playerIds in one batched pass over the distinct names
+
+    Names matching several players, or none within max_distance, get a missing playerId.
+
+    :param injuries: DataFrame with a Player column, e.g. the frame returned by InjuryPipeline.transform
+    :param name_index: NameIndex of the players, e.g. NHLAPIWrapper.name_index
+    :param max_distance: largest edit distance of a misspelled name, 0 for exact matches only
+    :return: copy of injuries with an Int64 playerId column
+    '''
+    codes, uniques = pd.factorize(injuries['Player'])
+    resolved = name_index.resolve_many(uniques, max_distance=max_distance)
+    ids = pd.array([ids[0] if len(ids) == 1 else None for ids in resolved] + [None], dtype='Int64')
+    # factorize marks missing names with -1, which picks the trailing None
+    injuries = injuries.copy()
+    injuries['playerId'] = ids[codes]
+    return injuries
+
+
+def build_injury_dataset(wrapper, injuries, report='summary', stats=None, max_distance=1):
+    '''
+    Joins games missed per season onto the per-season rows of a skater report
+
+    The report rows of every season the injuries cover are fetched with a single paginated
+    seasonId range query, unless given as stats. Names are resolved against the players of
+    those rows, so players no longer active are found too. Players without injuries in a
+    season missed 0 games, injury rows of unresolved names or of player seasons missing from
+    the report are left out.
+
+    :param wrapper: NHLAPIWrapper the report is fetched with, its name index resolves the names when stats
+                    has no skaterFullName column
+    :param injuries: DataFrame with Player, Season and Games Missed columns, e.g. from InjuryPipeline.transform
+    :param report: stats REST skater report the games missed are joined onto
+    :param stats: DataFrame of report rows with playerId and seasonId columns, fetched if None
+    :param max_distance: see attach_player_ids
+    :return: DataFrame of the report rows with a Games Missed column
+    '''
+    empty = pd.DataFrame(columns=['playerId', 'seasonId', 'Games Missed'])
+    if stats is None:
+        if injuries.empty:
+            return empty
+        seasons = season_ids(injuries['Season'])
+        # seasonId breaks the ties of a player's seasons, so that pages fetched concurrently neither skip nor
+        # repeat rows
+        stats = pd.DataFrame.from_records(wrapper.fetch_report(
+            report, sort_by('playerId', 'seasonId'), f"seasonId>={seasons.min()} and seasonId<={seasons.max()}"))
+        if stats.empty:
+            return empty
+    stats = stats.astype({'playerId': 'int64', 'seasonId': 'int64'})
+
+    if 'skaterFullName' in stats.columns:
+        name_index = NameIndex(zip(stats['skaterFullName'], stats['playerId']))
+    else:
+        name_index = wrapper.name_index
+    injuries = attach_player_ids(injuries, name_index, max_distance=max_distance)
+    injuries = injuries[injuries['playerId'].notna()]
+    injuries = pd.DataFrame({'playerId': injuries['playerId'].astype('int64'),
+                             'seasonId': season_ids(injuries['Season']),
+                             'Games Missed': injuries['Games Missed']})
+    games_missed = injuries.groupby(['playerId', 'seasonId'], as_index=False)['Games Missed'].sum()
+
+    dataset = stats.merge(games_missed, on=['playerId', 'seasonId'], how='left')
+    dataset['Games Missed'] = dataset['Games Missed'].fillna(0).astype('int64')
+    return dataset
+
+
+class InjuryPipeline:
+    def __init__(self, engine, table='injuries', chunksize=100_000, seasons=5, batch_size=1000):
+        '''
+        :param engine: SQLAlchemy engine or database url, e.g. 'sqlite:///injuries.sqlite'
+        :param table: table the games missed are upserted into
+        :param chunksize: rows of the export read at a time
+        :param seasons: number of past seasons kept, None to keep every season
+        :param batch_size: rows per multi-row insert
+        '''
+        self.engine = sa.create_engine(engine) if isinstance(engine, str) else engine
+        self.table_name = table
+        self.chunksize = chunksize
+        self.seasons = seasons
+        self.batch_size = batch_size
+
+    def first_season(self):
+        '''
+        :return: starting year of the oldest season kept, None if every season is kept
+        '''
+        if self.seasons is None:
+            return None
+        return pd.Timestamp.today().year - self.seasons
+
+    def transform(self, path):
+        '''
+        Reads the export chunk by chunk and sums the games missed of every player and season
+
+        :param path: injury database export, tab separated and UTF-16 encoded
+        :return: (DataFrame with Player, Season and Games Missed columns, number of rows read)
+        '''
+        first_season = self.first_season()
+        totals = []
+        rows_read = 0
+        for chunk in pd.read_csv(path, delimiter='\t', encoding='utf-16', usecols=CSV_COLUMNS,
+                                 chunksize=self.chunksize):
+            rows_read += len(chunk)
+            years = season_years(chunk['Season'])
+            keep = years.notna()
+            if first_season is not None:
+                keep &= years >= first_season
+            chunk = pd.DataFrame({'Player': normalize_players(chunk['Player'][keep]),
+                                  'Season': years[keep].astype('int64').astype(str),
+                                  'Games Missed': chunk['Games Missed'][keep]})
+            totals.append(chunk.groupby(KEY, sort=False)['Games Missed'].sum())
+
+        if not totals:
+            return pd.DataFrame(columns=KEY + ['Games Missed']), rows_read
+        # Players injured across chunk boundaries are summed once more
+        frame = pd.concat(totals).groupby(level=[0, 1]).sum().reset_index()
+        frame['Games Missed'] = frame['Games Missed'].astype('int64')
+        return frame, rows_read
+
+    def _table(self):
+        '''
+        Creates the table keyed by (Player, Season) if it does not exist
+
+        A table written by the old to_sql(if_exists='replace') has no key to upsert on and
+        is rebuilt, its rows are reloaded by the same run.
+        '''
+        metadata = sa.MetaData()
+        table = sa.Table(self.table_name, metadata,
+                         sa.Column('Player', sa.String(255), primary_key=True),
+                         sa.Column('Season', sa.String(4), primary_key=True),
+                         sa.Column('Games Missed', sa.Integer, nullable=False))
+        inspector = sa.inspect(self.engine)
+        if inspector.has_table(self.table_name) and \
+                not inspector.get_pk_constraint(self.table_name).get('constrained_columns'):
+            table.drop(self.engine)
+        metadata.create_all(self.engine)
+        return table
+
+    def _upsert(self, connection, table, rows):
+        dialect = self.engine.dialect.name
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            if dialect in ('sqlite', 'postgresql'):
+                if dialect == 'sqlite':
+                    from sqlalchemy.dialects.sqlite import insert
+                else:
+                    from sqlalchemy.dialects.postgresql import insert
+                statement = insert(table).values(batch)
+                statement = statement.on_conflict_do_update(
+                    index_elements=KEY, set_={'Games Missed': statement.excluded['Games Missed']})
+            elif dialect in ('mysql', 'mariadb'):
+                from sqlalchemy.dialects.mysql import insert
+                statement = insert(table).values(batch)
+                statement = statement.on_duplicate_key_update({'Games Missed': statement.inserted['Games Missed']})
+            else:
+                # No native upsert, replace the batch's keys inside the same transaction
+                connection.execute(table.delete().where(sa.tuple_(table.c.Player, table.c.Season).in_(
+                    [(row['Player'], row['Season']) for row in batch])))
+                statement = table.insert().values(batch)
+            connection.execute(statement)
+
+    def load(self, frame, prune=True):
+        '''
+        Writes the rows of frame that are new or differ from the table
+
+        :param frame: DataFrame returned by transform
+        :param prune: delete rows of the table that are no longer in frame, as the full replace did
+        :return: dict with the number of rows upserted and deleted
+        '''
+        table = self._table()
+        with self.engine.begin() as connection:
+            existing = pd.read_sql(sa.select(table.c.Player, table.c.Season, table.c['Games Missed']), connection)
+            merged = frame.merge(existing, on=KEY, how='outer', suffixes=('', '__old'), indicator=True)
+
+            changed = merged[(merged['_merge'] == 'left_only') | ((merged['_merge'] == 'both') &
+                                                                  (merged['Games Missed'] != merged['Games Missed__old']))]
+            rows = [{'Player': player, 'Season': season, 'Games Missed': int(games)}
+                    for player, season, games in zip(changed['Player'], changed['Season'], changed['Games Missed'])]
+            self._upsert(connection, table, rows)
+
+            deleted = 0
+            if prune:
+                stale = merged.loc[merged['_merge'] == 'right_only', KEY]
+                keys = list(zip(stale['Player'], stale['Season']))
+                for start in range(0, len(keys), self.batch_size):
+                    connection.execute(table.delete().where(sa.tuple_(table.c.Player, table.c.Season).in_(
+                        keys[start:start + self.batch_size])))
+                deleted = len(keys)
+
+        return {'upserted': len(rows), 'deleted': deleted}
+
+    def run(self, path, prune=True):
+        '''
+        Transforms the export and loads the changes
+
+        :return: dict with the aggregated frame, rows read and kept, rows upserted and deleted,
+                 seconds taken and rows read per second
+        '''
+        started = time.perf_counter()
+        frame, rows_read = self.transform(path)
+        result = self.load(frame, prune=prune)
+        seconds = time.perf_counter() - started
+        return {'frame': frame, 'rows_read': rows_read, 'rows': len(frame), **result, 'seconds': seconds,
+                'rows_per_second': rows_read / seconds if seconds else float('inf')}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load the injury database export into SQL')
+    parser.add_argument('csv', help='tab separated, UTF-16 export of the injury database')
+    parser.add_argument('--db', default='sqlite:///injuries.sqlite', help='SQLAlchemy database url')
+    parser.add_argument('--table', default='injuries')
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--seasons', type=int, default=5, help='number of past seasons kept')
+    args = parser.parse_args()
+
+    result = InjuryPipeline(args.db, table=args.table, chunksize=args.chunksize, seasons=args.seasons).run(args.csv)
+    print(f"{result['rows_read']} rows read in {result['seconds']:.2f}s ({result['rows_per_second']:,.0f} rows/s), "
+          f"{result['rows']} player seasons, {result['upserted']} upserted, {result['deleted']} deleted")
+
+
+if __name__ == '__main__':
+    main()
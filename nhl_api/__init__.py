@@ -0,0 +1,36 @@
+'''
+Wrapper for the new NHL API
+
+Importing the package makes no request and loads neither pandas nor requests, they are
+imported on first use. AsyncNHLAPIWrapper, and with it aiohttp, StatsDaemon, LeagueIndex,
+SnapshotFile and write_snapshot, and with them NumPy, are loaded on first access.
+'''
+from .client import StatsClient, DEFAULT_DAEMON_URL
+from .errors import NHLAPIError, CircuitOpenError
+from .instrumentation import Instrumentation, LATENCY_BUCKETS
+from .names import NameIndex, normalize_name
+from .schema import (decode_json, sort_by, ReportSchema, LEAGUE_REPORTS, FULL_REPORT_ORDER, SKATER_REPORTS,
+                     SKATER_SUMMARY_COLUMNS, SKATER_BIO_COLUMNS, SKATER_SEASON_SCHEMA, SKATER_SUMMARY_SCHEMA,
+                     SKATER_BIO_SCHEMA)
+from .transport import (TokenBucket, CircuitBreaker, HTTPTransport, CachedResponse, ResponseCache,
+                        CachingTransport, DEFAULT_RESPONSE_CACHE, DEFAULT_CACHE_TTL)
+from .wrapper import NHLAPIWrapper, DEFAULT_ID_CACHE, RETRY_STATUSES, PARTIAL_PAGE_TTL, MAX_PAGE_SIZE
+
+__all__ = ['NHLAPIError', 'CircuitOpenError', 'Instrumentation', 'LATENCY_BUCKETS', 'NameIndex', 'normalize_name',
+           'decode_json', 'sort_by', 'ReportSchema', 'LEAGUE_REPORTS', 'FULL_REPORT_ORDER', 'SKATER_REPORTS',
+           'SKATER_SUMMARY_COLUMNS', 'SKATER_BIO_COLUMNS', 'SKATER_SEASON_SCHEMA', 'SKATER_SUMMARY_SCHEMA',
+           'SKATER_BIO_SCHEMA', 'TokenBucket', 'CircuitBreaker', 'HTTPTransport', 'CachedResponse', 'ResponseCache',
+           'CachingTransport', 'DEFAULT_RESPONSE_CACHE', 'DEFAULT_CACHE_TTL', 'NHLAPIWrapper', 'DEFAULT_ID_CACHE',
+           'RETRY_STATUSES', 'PARTIAL_PAGE_TTL', 'MAX_PAGE_SIZE', 'StatsClient', 'DEFAULT_DAEMON_URL']
+# The lazily loaded names are left out of __all__ so that a star import does not load aiohttp, http.server or NumPy
+
+# name -> module it is loaded from on first access
+_LAZY = {'AsyncNHLAPIWrapper': 'async_wrapper', 'StatsDaemon': 'daemon', 'SingleFlight': 'daemon',
+         'LeagueIndex': 'ranking', 'SnapshotFile': 'snapshot_file', 'write_snapshot': 'snapshot_file'}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+        return getattr(importlib.import_module(f".{_LAZY[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,256 @@
+'''
+asyncio client of the NHL stats REST and api-web APIs
+'''
+import asyncio
+
+from .errors import NHLAPIError
+from .schema import (decode_json, LEAGUE_REPORTS, FULL_REPORT_ORDER, SKATER_SEASON_SCHEMA,
+                     SKATER_SUMMARY_SCHEMA)
+from .wrapper import NHLAPIWrapper, MAX_PAGE_SIZE
+
+try:
+    import aiohttp
+except ImportError:  # only needed by AsyncNHLAPIWrapper
+    aiohttp = None
+
+
+class AsyncNHLAPIWrapper:
+    '''
+    asyncio counterpart of NHLAPIWrapper
+
+    Exposes the same league and per-skater reports as coroutines, sharing the
+    post-processing of NHLAPIWrapper. A semaphore caps the number of requests in flight.
+    Requires aiohttp.
+    '''
+
+    def __init__(self, base_url='https://api-web.nhle.com/', stats_url='https://api.nhle.com/stats/rest',
+                 max_in_flight=16, timeout=30, session=None, pagination='adaptive', max_page_size=MAX_PAGE_SIZE,
+                 season=None):
+        '''
+        :param base_url: root of the api-web.nhle.com API
+        :param stats_url: root of the stats REST API
+        :param max_in_flight: maximum number of requests awaiting a response at the same time
+        :param timeout: total timeout in seconds for a single request
+        :param session: aiohttp.ClientSession to use, one is created on first request otherwise
+        :param pagination: 'adaptive' or 'fixed', see NHLAPIWrapper
+        :param max_page_size: largest page size asked for in adaptive mode
+        :param season: seasonId the league reports cover, defaults to the current season
+        '''
+        if aiohttp is None:
+            raise ImportError("AsyncNHLAPIWrapper requires aiohttp, install it with 'pip install aiohttp'")
+
+        self.base_url = base_url
+        self.stats_url = stats_url
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.session = session
+        self._owns_session = session is None
+        self.pagination = pagination
+        self.page_size = max_page_size
+        self.season = season
+        self._semaphore = None
+
+    async def close(self):
+        if self.session is not None and self._owns_session:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _request_json(self, url):
+        '''
+        Makes a GET request, waiting for a free slot if max_in_flight requests are outstanding
+
+        :raises NHLAPIError: if the request was not successful
+        '''
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.max_in_flight),
+                headers={'Accept': 'application/json', 'Accept-Encoding': 'gzip, deflate'})
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        async with self._semaphore:
+            async with self.session.get(url) as response:
+                if response.status != 200:
+                    raise NHLAPIError(response.status, await response.text(), url)
+                return decode_json(await response.read())
+
+    @staticmethod
+    async def _gather(*aws):
+        '''
+        Like asyncio.gather, but cancels everything still pending as soon as one awaitable fails
+        '''
+        tasks = [asyncio.ensure_future(aw) for aw in aws]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    def _page_url(self, report, sort, start, limit, cayenne):
+        return self.stats_url + f"/en/skater/{report}?limit={limit}&start={start}&sort={sort}&cayenneExp={cayenne}"
+
+    async def _season_id(self):
+        if self.season is None:
+            self.season = int((await self._request_json(self.base_url + 'v1/season'))[-1])
+        return self.season
+
+    async def _fetch_pages(self, report, sort, cayenne=None):
+        '''
+        Fetches every page of a league report, see NHLAPIWrapper._fetch_pages
+        '''
+        if cayenne is None:
+            cayenne = f"seasonId={await self._season_id()}"
+        if self.pagination == 'fixed':
+            return await self._fetch_page_range(report, sort, cayenne, range(0, 800, 100), 100)
+
+        limit = self.page_size
+        first = await self._request_json(self._page_url(report, sort, 0, limit, cayenne))
+        stats = first['data']
+        total = first.get('total')
+
+        # Stop as soon as the data is exhausted
+        if not stats or (total is not None and len(stats) >= total):
+            return stats
+        if len(stats) < limit:
+            if total is None:
+                return stats
+            # The server capped the page size
+            limit = self.page_size = len(stats)
+
+        if total is None:
+            start = len(stats)
+            while True:
+                page = (await self._request_json(self._page_url(report, sort, start, limit, cayenne)))['data']
+                stats += page
+                if len(page) < limit:
+                    return stats
+                start += limit
+
+        return stats + await self._fetch_page_range(report, sort, cayenne, range(len(stats), total, limit), limit)
+
+    async def _fetch_page_range(self, report, sort, cayenne, starts, limit):
+        urls = [self._page_url(report, sort, start, limit, cayenne) for start in starts]
+        stats = []
+        for data in await self._gather(*(self._request_json(url) for url in urls)):
+            stats += data['data']
+        return stats
+
+    async def _league_report(self, name):
+        report, sort, schema = LEAGUE_REPORTS[name]
+        try:
+            stats = await self._fetch_pages(report, sort)
+        except NHLAPIError as e:
+            # Fail the whole report if any page was not successful
+            return [e.status_code, e.text]
+
+        return NHLAPIWrapper._player_dict(stats, schema)
+
+    async def create_ID_dict(self):
+        '''
+        Returns dict mapping player names to their unique identifier
+        '''
+        try:
+            stats = await self._fetch_pages('summary', 'playerId')
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+        return {player_data.get('skaterFullName'): player_data.get('playerId') for player_data in stats}
+
+    async def summaryreport(self):
+        return await self._league_report('summaryreport')
+
+    async def bioreport(self):
+        return await self._league_report('bioreport')
+
+    async def faceoffpercentages(self):
+        return await self._league_report('faceoffpercentages')
+
+    async def faceoffwins(self):
+        return await self._league_report('faceoffwins')
+
+    async def miscreport(self):
+        return await self._league_report('miscreport')
+
+    async def timeonice(self):
+        return await self._league_report('timeonice')
+
+    async def full_report(self):
+        '''
+        Gathers all six league reports, every page of every report in one shot
+        '''
+        try:
+            # Resolve the season once rather than racing six lookups
+            await self._season_id()
+            pages = await self._gather(*(self._fetch_pages(*LEAGUE_REPORTS[name][:2]) for name in FULL_REPORT_ORDER))
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+        reports = [NHLAPIWrapper._player_dict(stats, LEAGUE_REPORTS[name][2])
+                   for name, stats in zip(FULL_REPORT_ORDER, pages)]
+        return NHLAPIWrapper._merge_full_report(*reports)
+
+    async def _skater_stats(self, report, sort, skaterID):
+        url = self.stats_url + f"/en/skater/{report}?sort={sort}&cayenneExp=playerId={skaterID}"
+        return (await self._request_json(url))['data']
+
+    async def _skater_seasons(self, report, skaterID, schema=SKATER_SEASON_SCHEMA):
+        try:
+            stats = await self._skater_stats(report, 'seasonId', skaterID)
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+        return NHLAPIWrapper._season_list(stats, schema)
+
+    async def skater_summary(self, skaterID):
+        return await self._skater_seasons('summary', skaterID, SKATER_SUMMARY_SCHEMA)
+
+    async def skater_bio(self, skaterID):
+        try:
+            stats = await self._skater_stats('bios', 'height', skaterID)
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+        return NHLAPIWrapper._bio_dict(stats[0])
+
+    async def skater_FO_percent(self, skaterID):
+        return await self._skater_seasons('faceoffpercentages', skaterID)
+
+    async def skater_FO_wins(self, skaterID):
+        return await self._skater_seasons('faceoffwins', skaterID)
+
+    async def skater_misc(self, skaterID):
+        return await self._skater_seasons('realtime', skaterID)
+
+    async def skater_TOI(self, skaterID):
+        return await self._skater_seasons('timeonice', skaterID)
+
+    async def skater_full_report(self, skaterID):
+        '''
+        Gathers the six per-skater reports concurrently and merges them by season
+        '''
+        try:
+            stats = await self._gather(
+                self._skater_stats('summary', 'seasonId', skaterID),
+                self._skater_stats('bios', 'height', skaterID),
+                self._skater_stats('faceoffpercentages', 'seasonId', skaterID),
+                self._skater_stats('faceoffwins', 'seasonId', skaterID),
+                self._skater_stats('realtime', 'seasonId', skaterID),
+                self._skater_stats('timeonice', 'seasonId', skaterID))
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+        summary, bio, FO_P, FO_W, misc, TOI = stats
+        return NHLAPIWrapper._merge_skater_report(
+            NHLAPIWrapper._season_list(summary, SKATER_SUMMARY_SCHEMA),
+            NHLAPIWrapper._bio_dict(bio[0]),
+            NHLAPIWrapper._season_list(FO_P),
+            NHLAPIWrapper._season_list(FO_W),
+            NHLAPIWrapper._season_list(misc),
+            NHLAPIWrapper._season_list(TOI))
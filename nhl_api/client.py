@@ -0,0 +1,143 @@
+'''
+Drop-in NHLAPIWrapper that reads its reports from a StatsDaemon
+'''
+from .errors import NHLAPIError
+from .transport import HTTPTransport
+from .wrapper import NHLAPIWrapper
+
+DEFAULT_DAEMON_URL = 'http://127.0.0.1:8765'
+
+
+class StatsClient(NHLAPIWrapper):
+    '''
+    NHLAPIWrapper whose reports come from a StatsDaemon instead of the NHL API
+
+    The league reports, full_report, the per-skater reports, skaters_full_report, the ID
+    dictionary and the current season are asked of the daemon and returned exactly as
+    NHLAPIWrapper returns them, including [status_code, text] when the daemon's upstream
+    request failed. Every other method is inherited and goes to the NHL API directly.
+    The league reports cover the daemon's season.
+    '''
+
+    def __init__(self, daemon_url=DEFAULT_DAEMON_URL, daemon_timeout=(5, 120), **kwargs):
+        '''
+        :param daemon_url: root url of the StatsDaemon
+        :param daemon_timeout: (connect, read) timeout of requests to the daemon, a cold daemon
+                               fetches from the NHL API before it answers
+        :param kwargs: see NHLAPIWrapper, used for the requests that do not go through the daemon
+        '''
+        super().__init__(**kwargs)
+        self.daemon_url = daemon_url.rstrip('/')
+        self.daemon_transport = HTTPTransport(timeout=daemon_timeout)
+
+    def close(self):
+        super().close()
+        self.daemon_transport.close()
+
+    def _daemon_json(self, path):
+        '''
+        :param path: route of the daemon, e.g. '/full_report'
+        :return: decoded JSON body
+        :raises NHLAPIError: with the upstream status code and text if the daemon's request failed
+        '''
+        response = self.daemon_transport.get(self.daemon_url + path)
+        if response.status_code == 502:
+            error = response.json()
+            raise NHLAPIError(error['status_code'], error['text'], self.daemon_url + path)
+        if response.status_code != 200:
+            raise NHLAPIError(response.status_code, response.text, self.daemon_url + path)
+        return response.json()
+
+    @staticmethod
+    def _int_keys(report):
+        # JSON object keys are strings, the wrapper keys players and seasons by int
+        return {int(key): value for key, value in report.items()}
+
+    def get_current_season(self):
+        try:
+            return int(str(self._daemon_json('/season'))[:4])
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+    def get_current_season_id(self):
+        return int(self._daemon_json('/season'))
+
+    def create_ID_dict(self):
+        try:
+            ID_dict = self._daemon_json('/ID_dict')
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+        if self._ID_dict is None:
+            self._ID_dict = {}
+        self._ID_dict.update(ID_dict)
+        self._add_player_names(ID_dict.items())
+        self._save_ID_dict()
+
+    def _league_report(self, name):
+        try:
+            return self._int_keys(self._daemon_json(f"/report/{name}"))
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+    def full_report(self, concurrency=None, output='dict'):
+        if output not in ('dict', 'dataframe', 'arrow'):
+            raise ValueError(f"output must be 'dict', 'dataframe' or 'arrow', not {output!r}")
+
+        try:
+            if output == 'dict':
+                return self._int_keys(self._daemon_json('/full_report'))
+            pages = self._daemon_json('/full_report/pages')
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+        return self._full_report_output(pages, output)
+
+    def _skater_method(self, method, skaterID):
+        try:
+            return self._daemon_json(f"/skater/{int(skaterID)}/{method}")
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+    def _skater_seasons(self, method, skaterID):
+        seasons = self._skater_method(method, skaterID)
+        if isinstance(seasons, list) and seasons and isinstance(seasons[0], dict):
+            return [self._int_keys(season) for season in seasons]
+        return seasons
+
+    def skater_summary(self, skaterID):
+        return self._skater_seasons('skater_summary', skaterID)
+
+    def skater_bio(self, skaterID):
+        return self._skater_method('skater_bio', skaterID)
+
+    def skater_FO_percent(self, skaterID):
+        return self._skater_seasons('skater_FO_percent', skaterID)
+
+    def skater_FO_wins(self, skaterID):
+        return self._skater_seasons('skater_FO_wins', skaterID)
+
+    def skater_misc(self, skaterID):
+        return self._skater_seasons('skater_misc', skaterID)
+
+    def skater_TOI(self, skaterID):
+        return self._skater_seasons('skater_TOI', skaterID)
+
+    def skater_full_report(self, skaterID, concurrency=None):
+        return self._skater_method('skater_full_report', skaterID)
+
+    def skaters_full_report(self, skaterIDs, batch_size=50, concurrency=None):
+        skaterIDs = list(dict.fromkeys(int(skaterID) for skaterID in skaterIDs))
+        if not skaterIDs:
+            return {}
+        try:
+            return self._int_keys(self._daemon_json(
+                f"/skaters_full_report?ids={','.join(map(str, skaterIDs))}&batch_size={batch_size}"))
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+    def daemon_stats(self):
+        '''
+        :return: cache and coalescing counters of the daemon, see StatsDaemon.stats
+        '''
+        return self._daemon_json('/stats')
+
@@ -0,0 +1,415 @@
+'''
+Long-running stats daemon: one NHLAPIWrapper shared by every local service over HTTP/JSON
+
+The league reports of the season are kept warm in memory and refreshed in the background,
+and every response body is serialized once per refresh, so a request the daemon can answer
+from memory costs no upstream request and no JSON encoding. Per-skater reports are cached
+on first request and kept warm while they are asked for. Identical requests arriving while
+their upstream fetch is in flight wait for that fetch instead of starting their own.
+
+StatsClient is the drop-in NHLAPIWrapper that talks to it.
+
+usage: python -m nhl_api.daemon --port 8765 --refresh 300
+'''
+import argparse
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+from .errors import NHLAPIError
+from .schema import LEAGUE_REPORTS, FULL_REPORT_ORDER
+from .wrapper import NHLAPIWrapper
+
+DEFAULT_PORT = 8765
+
+# per-skater methods the daemon serves, each cached per playerId
+SKATER_METHODS = ('skater_full_report', 'skater_summary', 'skater_bio', 'skater_FO_percent', 'skater_FO_wins',
+                  'skater_misc', 'skater_TOI')
+
+
+def encode(value):
+    return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+
+def failed(result):
+    '''
+    :return: True if result is the [status_code, text] a wrapper method returns when a request failed
+    '''
+    return isinstance(result, list) and len(result) == 2 and isinstance(result[0], int) \
+        and isinstance(result[1], str)
+
+
+class SingleFlight:
+    '''
+    Coalesces concurrent calls with the same key into one call
+
+    The first caller of a key runs the function, callers arriving before it returns wait
+    and get the same result or exception.
+    '''
+
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key, function, *args):
+        '''
+        :param key: hashable identifying the call, e.g. ('skater_full_report', 8478402)
+        :return: result of function(*args), run once for every caller of key while it is in flight
+        '''
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function(*args)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class StatsDaemon:
+    '''
+    Serves the reports of an NHLAPIWrapper from memory over HTTP/JSON
+
+    GET routes, every body is JSON:
+        /season                          current seasonId
+        /full_report                     full_report() as playerID : {stats}
+        /full_report/pages               records of each league report in FULL_REPORT_ORDER
+        /report/{name}                   a league report, name is a key of LEAGUE_REPORTS
+        /ID_dict                         player name : playerId
+        /skater/{playerId}/{method}      one of SKATER_METHODS
+        /skaters_full_report?ids=1,2,3   skaters_full_report, batch_size optional
+        /stats                           cache and coalescing counters
+
+    A failed upstream request is answered with a 502 whose body holds its status_code and text.
+    '''
+
+    def __init__(self, wrapper=None, host='127.0.0.1', port=DEFAULT_PORT, refresh_interval=300.0,
+                 idle_timeout=3600.0, max_skaters=5000):
+        '''
+        :param wrapper: NHLAPIWrapper the reports are fetched with, a default one if None
+        :param host: interface the server listens on
+        :param port: port the server listens on, 0 for any free port
+        :param refresh_interval: seconds between background refreshes of the cached reports
+        :param idle_timeout: seconds a skater's reports are kept warm after they were last asked for
+        :param max_skaters: most per-skater reports kept, the least recently asked for are dropped first
+        '''
+        self.wrapper = wrapper if wrapper is not None else NHLAPIWrapper()
+        self.refresh_interval = refresh_interval
+        self.idle_timeout = idle_timeout
+        self.max_skaters = max_skaters
+        self.flight = SingleFlight()
+
+        self._lock = threading.Lock()
+        # route -> serialized body of the league data, replaced as a whole by each refresh
+        self._league = None
+        self._league_refreshed = None
+        # (method, playerId) -> [body, last asked for], least recently asked for first
+        self._skaters = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.last_error = None
+
+        self._stop = threading.Event()
+        self._threads = []
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.stats_daemon = self
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _fetch_league(self):
+        '''
+        Fetches the league reports once and serializes every route derived from them
+
+        :raises NHLAPIError: if any report failed
+        '''
+        season = self.wrapper.season
+        pages = self.wrapper.fetch_reports([LEAGUE_REPORTS[name][:2] for name in FULL_REPORT_ORDER])
+        pages_body = encode(pages)
+
+        # _player_dict projects the records in place, so the reports are built from a decoded copy
+        bodies = {'season': encode(season), 'full_report/pages': pages_body}
+        reports = [NHLAPIWrapper._player_dict(stats, LEAGUE_REPORTS[name][2])
+                   for name, stats in zip(FULL_REPORT_ORDER, json.loads(pages_body))]
+        for name, report in zip(FULL_REPORT_ORDER, reports):
+            bodies[f"report/{name}"] = encode(report)
+        bodies['full_report'] = encode(NHLAPIWrapper._merge_full_report(*reports))
+        summary = pages[FULL_REPORT_ORDER.index('summaryreport')]
+        bodies['ID_dict'] = encode({row.get('skaterFullName'): row.get('playerId') for row in summary})
+
+        with self._lock:
+            self._league = bodies
+            self._league_refreshed = time.time()
+        return bodies
+
+    def league(self, route):
+        '''
+        :return: serialized body of a route derived from the league reports, fetched if not cached yet
+        :raises NHLAPIError: if the league reports could not be fetched
+        '''
+        # Handler threads share the counters
+        with self._lock:
+            bodies = self._league
+            if bodies is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if bodies is None:
+            bodies = self.flight.do('league', self._fetch_league)
+        return bodies[route]
+
+    def _fetch_skater(self, method, skaterID):
+        result = getattr(self.wrapper, method)(skaterID)
+        if failed(result):
+            raise NHLAPIError(*result)
+        body = encode(result)
+        self._store_skater((method, skaterID), body)
+        return body
+
+    def _store_skater(self, key, body):
+        with self._lock:
+            self._skaters[key] = [body, time.monotonic()]
+            self._skaters.move_to_end(key)
+            while len(self._skaters) > self.max_skaters:
+                self._skaters.popitem(last=False)
+
+    def skater(self, method, skaterID):
+        '''
+        :param method: one of SKATER_METHODS
+        :return: serialized body of the method's result for the skater, fetched if not cached yet
+        :raises NHLAPIError: if the request was not successful
+        '''
+        key = (method, skaterID)
+        with self._lock:
+            entry = self._skaters.get(key)
+            if entry is not None:
+                entry[1] = time.monotonic()
+                self._skaters.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry is not None:
+            return entry[0]
+        return self.flight.do(key, self._fetch_skater, method, skaterID)
+
+    def _fetch_skaters(self, skaterIDs, batch_size):
+        reports = self.wrapper.skaters_full_report(skaterIDs, batch_size=batch_size)
+        if failed(reports):
+            raise NHLAPIError(*reports)
+        for skaterID, report in reports.items():
+            self._store_skater(('skater_full_report', skaterID), encode(report))
+        return {skaterID: encode(report) for skaterID, report in reports.items()}
+
+    def skaters(self, skaterIDs, batch_size=50):
+        '''
+        Full reports of many skaters, the ones not cached are fetched with one batched skaters_full_report
+
+        :return: serialized playerID : full report, in the order of skaterIDs
+        :raises NHLAPIError: if any request was not successful
+        '''
+        skaterIDs = list(dict.fromkeys(skaterIDs))
+        bodies = {}
+        now = time.monotonic()
+        with self._lock:
+            for skaterID in skaterIDs:
+                entry = self._skaters.get(('skater_full_report', skaterID))
+                if entry is not None:
+                    entry[1] = now
+                    self._skaters.move_to_end(('skater_full_report', skaterID))
+                    bodies[skaterID] = entry[0]
+            missing = [skaterID for skaterID in skaterIDs if skaterID not in bodies]
+            self.hits += len(bodies)
+            self.misses += len(missing)
+        if missing:
+            bodies.update(self.flight.do(('skaters_full_report', tuple(missing), batch_size),
+                                         self._fetch_skaters, missing, batch_size))
+        return b'{' + b','.join(b'"%d":%s' % (skaterID, bodies[skaterID]) for skaterID in skaterIDs) + b'}'
+
+    def refresh(self):
+        '''
+        Refetches the league reports and every skater report asked for within idle_timeout
+
+        Skaters not asked for within idle_timeout are dropped. Anything that fails keeps its
+        previous body and is retried on the next refresh.
+
+        :return: dict with the number of skater reports refreshed and dropped
+        '''
+        try:
+            self.flight.do('league', self._fetch_league)
+        except Exception as e:
+            self.last_error = repr(e)
+
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            idle = [key for key, (body, used) in self._skaters.items() if used < cutoff]
+            for key in idle:
+                del self._skaters[key]
+            warm = list(self._skaters)
+
+        # Full reports are refreshed together with the batched call, the other methods one by one
+        full = [skaterID for method, skaterID in warm if method == 'skater_full_report']
+        refreshed = 0
+        for i in range(0, len(full), 50):
+            try:
+                refreshed += len(self.flight.do(('skaters_full_report', tuple(full[i:i + 50]), 50),
+                                                self._fetch_skaters, full[i:i + 50], 50))
+            except Exception as e:
+                self.last_error = repr(e)
+        for method, skaterID in warm:
+            if method == 'skater_full_report':
+                continue
+            try:
+                self.flight.do((method, skaterID), self._fetch_skater, method, skaterID)
+                refreshed += 1
+            except Exception as e:
+                self.last_error = repr(e)
+
+        self.refreshes += 1
+        return {'refreshed': refreshed, 'dropped': len(idle)}
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def stats(self):
+        '''
+        :return: dict of cache hits and misses, upstream fetches, requests that joined an in-flight
+                 fetch, refreshes and the wrapper's request metrics
+        '''
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        return {'hits': hits, 'misses': misses, 'fetches': self.flight.calls,
+                'coalesced': self.flight.shared, 'refreshes': self.refreshes,
+                'league_refreshed': self._league_refreshed, 'skaters_cached': len(self._skaters),
+                'last_error': self.last_error, 'metrics': self.wrapper.metrics()}
+
+    def start(self, warm=True):
+        '''
+        Serves requests and refreshes the cache on background threads
+
+        :param warm: fetch the league reports before returning, failures are retried by the refresh
+        :return: self
+        '''
+        if warm:
+            try:
+                self.league('full_report')
+            except Exception as e:
+                self.last_error = repr(e)
+        for target in (self.server.serve_forever, self._refresh_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def close(self):
+        self._stop.set()
+        self.server.shutdown()
+        self.server.server_close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.wrapper.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        daemon = self.server.stats_daemon
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        route = '/'.join(parts)
+        try:
+            if route in ('season', 'full_report', 'full_report/pages', 'ID_dict') or \
+                    (len(parts) == 2 and parts[0] == 'report' and parts[1] in LEAGUE_REPORTS):
+                body = daemon.league(route)
+            elif len(parts) == 3 and parts[0] == 'skater' and parts[1].isdigit() and parts[2] in SKATER_METHODS:
+                body = daemon.skater(parts[2], int(parts[1]))
+            elif route == 'skaters_full_report':
+                query = parse_qs(url.query)
+                skaterIDs = [int(skaterID) for skaterID in query.get('ids', [''])[0].split(',') if skaterID]
+                body = daemon.skaters(skaterIDs, int(query.get('batch_size', ['50'])[0]))
+            elif route == 'stats':
+                body = encode(daemon.stats())
+            else:
+                return self._send(404, encode({'error': f"unknown route /{route}"}))
+        except NHLAPIError as e:
+            return self._send(502, encode({'status_code': e.status_code, 'text': e.text}))
+        except ValueError as e:
+            return self._send(400, encode({'error': str(e)}))
+        except Exception as e:
+            return self._send(502, encode({'status_code': 503, 'text': repr(e)}))
+        self._send(200, body)
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the NHL stats reports from a warm in-memory cache')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--refresh', type=float, default=300.0, help='seconds between background refreshes')
+    parser.add_argument('--idle-timeout', type=float, default=3600.0,
+                        help='seconds a skater stays cached after it was last asked for')
+    parser.add_argument('--rate-limit', type=float, default=None, help='upstream requests per second')
+    args = parser.parse_args()
+
+    wrapper = NHLAPIWrapper(rate_limit=args.rate_limit, instrumentation=True)
+    with StatsDaemon(wrapper, host=args.host, port=args.port, refresh_interval=args.refresh,
+                     idle_timeout=args.idle_timeout) as daemon:
+        daemon.start()
+        print(f"serving on {daemon.url}, refreshing every {args.refresh:.0f}s")
+        try:
+            daemon._stop.wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+'''
+Exceptions raised by the NHL API clients
+'''
+
+
+class NHLAPIError(Exception):
+    '''
+    Raised when the NHL API answers with anything other than a 200
+    '''
+
+    def __init__(self, status_code, text, url=None):
+        super().__init__(f"{status_code} from {url}: {text[:200]}")
+        self.status_code = status_code
+        self.text = text
+        self.url = url
+
+
+class CircuitOpenError(NHLAPIError):
+    '''
+    Raised instead of making a request while the circuit breaker of its host is open
+    '''
+
+    def __init__(self, host, retry_in):
+        super().__init__(503, f"circuit breaker open for {host}, retry in {retry_in:.1f}s", host)
+        self.host = host
+        self.retry_in = retry_in
@@ -0,0 +1,157 @@
+'''
+Per-endpoint request metrics of NHLAPIWrapper
+'''
+import threading
+
+# upper bounds in seconds of the request latency histogram buckets kept by Instrumentation
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Instrumentation:
+    '''
+    Per-endpoint request metrics of an NHLAPIWrapper
+
+    Records request latency histograms, status codes, response sizes, JSON decode time and
+    cache hits per endpoint, and post-processing time per report. Every event is also passed
+    to the hooks added with add_hook. An NHLAPIWrapper without instrumentation skips all of this.
+    '''
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        '''
+        :param buckets: upper bounds in seconds of the latency histogram buckets
+        '''
+        self.buckets = tuple(sorted(buckets))
+        self.hooks = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+            self._postprocess = {}
+
+    def add_hook(self, callback):
+        '''
+        :param callback: called with an event dict after every request, retry and post-processing step
+        '''
+        self.hooks.append(callback)
+
+    def remove_hook(self, callback):
+        self.hooks.remove(callback)
+
+    def _endpoint(self, endpoint):
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints[endpoint] = {
+                'requests': 0, 'status_codes': {}, 'latency_buckets': [0] * len(self.buckets),
+                'latency_sum': 0.0, 'bytes': 0, 'decode_seconds': 0.0, 'cache_hits': 0, 'retries': 0,
+            }
+        return metrics
+
+    def _emit(self, event):
+        for hook in self.hooks:
+            hook(event)
+
+    def record_request(self, endpoint, url, status_code, seconds, size, decode_seconds=0.0, from_cache=False):
+        with self._lock:
+            metrics = self._endpoint(endpoint)
+            metrics['requests'] += 1
+            metrics['status_codes'][status_code] = metrics['status_codes'].get(status_code, 0) + 1
+            metrics['latency_sum'] += seconds
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    metrics['latency_buckets'][i] += 1
+                    break
+            metrics['bytes'] += size
+            metrics['decode_seconds'] += decode_seconds
+            if from_cache:
+                metrics['cache_hits'] += 1
+        if self.hooks:
+            self._emit({'event': 'request', 'endpoint': endpoint, 'url': url, 'status_code': status_code,
+                        'seconds': seconds, 'bytes': size, 'decode_seconds': decode_seconds,
+                        'from_cache': from_cache})
+
+    def record_retry(self, endpoint, url, status_code, delay):
+        with self._lock:
+            self._endpoint(endpoint)['retries'] += 1
+        if self.hooks:
+            self._emit({'event': 'retry', 'endpoint': endpoint, 'url': url, 'status_code': status_code,
+                        'delay': delay})
+
+    def record_postprocess(self, report, seconds):
+        with self._lock:
+            metrics = self._postprocess.setdefault(report, {'count': 0, 'seconds': 0.0})
+            metrics['count'] += 1
+            metrics['seconds'] += seconds
+        if self.hooks:
+            self._emit({'event': 'postprocess', 'report': report, 'seconds': seconds})
+
+    def snapshot(self):
+        '''
+        :return: dict with the metrics of every endpoint and the post-processing time of every report
+        '''
+        with self._lock:
+            endpoints = {}
+            for endpoint, metrics in self._endpoints.items():
+                cumulative = 0
+                histogram = {}
+                for bound, count in zip(self.buckets, metrics['latency_buckets']):
+                    cumulative += count
+                    histogram[bound] = cumulative
+                histogram[float('inf')] = metrics['requests']
+                endpoints[endpoint] = {
+                    'requests': metrics['requests'],
+                    'status_codes': dict(metrics['status_codes']),
+                    'latency_histogram': histogram,
+                    'latency_seconds': metrics['latency_sum'],
+                    'mean_latency_seconds': metrics['latency_sum'] / metrics['requests'] if metrics['requests'] else 0.0,
+                    'bytes': metrics['bytes'],
+                    'decode_seconds': metrics['decode_seconds'],
+                    'cache_hits': metrics['cache_hits'],
+                    'retries': metrics['retries'],
+                }
+            postprocess = {report: dict(metrics) for report, metrics in self._postprocess.items()}
+        return {'endpoints': endpoints, 'postprocess': postprocess}
+
+    def export_prometheus(self, prefix='nhl_api'):
+        '''
+        :return: the snapshot in the Prometheus text exposition format
+        '''
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name, kind, description):
+            lines.append(f"# HELP {prefix}_{name} {description}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        endpoints = snapshot['endpoints']
+        metric('request_duration_seconds', 'histogram', 'Latency of requests to the NHL API.')
+        for endpoint, metrics in endpoints.items():
+            for bound, count in metrics['latency_histogram'].items():
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append(f'{prefix}_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{le}"}} {count}')
+            lines.append(f'{prefix}_request_duration_seconds_sum{{endpoint="{endpoint}"}} {metrics["latency_seconds"]}')
+            lines.append(f'{prefix}_request_duration_seconds_count{{endpoint="{endpoint}"}} {metrics["requests"]}')
+
+        metric('requests_total', 'counter', 'Requests to the NHL API by status code.')
+        for endpoint, metrics in endpoints.items():
+            for code, count in metrics['status_codes'].items():
+                lines.append(f'{prefix}_requests_total{{endpoint="{endpoint}",code="{code}"}} {count}')
+
+        for name, key, description in (
+                ('response_bytes_total', 'bytes', 'Bytes of response bodies.'),
+                ('json_decode_seconds_total', 'decode_seconds', 'Time spent decoding JSON.'),
+                ('cache_hits_total', 'cache_hits', 'Responses served by the response cache.'),
+                ('retries_total', 'retries', 'Requests retried.')):
+            metric(name, 'counter', description)
+            for endpoint, metrics in endpoints.items():
+                lines.append(f'{prefix}_{name}{{endpoint="{endpoint}"}} {metrics[key]}')
+
+        metric('postprocess_seconds_total', 'counter', 'Time spent turning responses into reports.')
+        for report, metrics in snapshot['postprocess'].items():
+            lines.append(f'{prefix}_postprocess_seconds_total{{report="{report}"}} {metrics["seconds"]}')
+        metric('postprocess_total', 'counter', 'Reports built.')
+        for report, metrics in snapshot['postprocess'].items():
+            lines.append(f'{prefix}_postprocess_total{{report="{report}"}} {metrics["count"]}')
+
+        return '\n'.join(lines) + '\n'
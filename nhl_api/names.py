@@ -0,0 +1,171 @@
+'''
+Normalized and fuzzy player name lookups
+'''
+import bisect
+import unicodedata
+
+
+def normalize_name(name):
+    '''
+    Folds a player name to the form NameIndex keys it by
+
+    Accents are dropped with the same NFKD/ASCII folding as injuries-wrapper.py, case and
+    punctuation are ignored and "Last, First" is turned around to "first last".
+
+    :param name: player name, e.g. 'Stützle, Tim'
+    :return: normalized name, e.g. 'tim stutzle'
+    '''
+    name = unicodedata.normalize('NFKD', name).encode('ASCII', 'ignore').decode('utf-8')
+    if ',' in name:
+        last, first = name.split(',', 1)
+        name = f"{first} {last}"
+    return ' '.join(''.join(char if char.isalnum() else ' ' for char in name.casefold()).split())
+
+
+def _trigrams(name):
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _edit_distance(a, b, max_distance):
+    '''
+    Levenshtein distance of a and b, or max_distance + 1 as soon as it is known to be larger
+    '''
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+class NameIndex:
+    '''
+    Player name -> playerId lookups that tolerate accents, casing, "Last, First" and typos
+
+    Names are normalized with normalize_name. Exact lookups are a dict access, prefix
+    queries a binary search over the sorted names and every word suffix of them, fuzzy
+    queries only compare against names sharing trigrams with the query. Players sharing
+    a name are all returned.
+    '''
+
+    def __init__(self, names):
+        '''
+        :param names: dict of playerId : player name, or iterable of (player name, playerId)
+        '''
+        pairs = [(name, playerID) for playerID, name in names.items()] if isinstance(names, dict) else names
+
+        self._ids = {}
+        self._display = {}
+        for name, playerID in pairs:
+            if not name:
+                continue
+            key = normalize_name(name)
+            ids = self._ids.setdefault(key, [])
+            if int(playerID) not in ids:
+                ids.append(int(playerID))
+            self._display.setdefault(key, name)
+
+        # Every word suffix of every name, so 'mcda' finds 'connor mcdavid'
+        self._prefixes = sorted((' '.join(words[i:]), key) for key in self._ids
+                                for words in [key.split(' ')] for i in range(len(words)))
+        self._prefix_keys = [suffix for suffix, _ in self._prefixes]
+
+        self._trigram_index = {}
+        for key in self._ids:
+            for trigram in _trigrams(key):
+                self._trigram_index.setdefault(trigram, []).append(key)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, name):
+        return normalize_name(name) in self._ids
+
+    def lookup(self, name):
+        '''
+        :param name: player name in any casing, with or without accents, "First Last" or "Last, First"
+        :return: sorted playerIds of every player with that name, empty if there is none
+        '''
+        return sorted(self._ids.get(normalize_name(name), []))
+
+    def prefix(self, text, limit=10):
+        '''
+        :param text: beginning of a player's full name or of any of its words
+        :param limit: maximum number of names returned
+        :return: list of (player name, [playerIds]) in alphabetical order
+        '''
+        text = normalize_name(text)
+        if not text:
+            return []
+        matches = []
+        start = bisect.bisect_left(self._prefix_keys, text)
+        for suffix, key in self._prefixes[start:]:
+            if not suffix.startswith(text) or len(matches) >= limit:
+                break
+            if key not in matches:
+                matches.append(key)
+        return [(self._display[key], sorted(self._ids[key])) for key in sorted(matches)]
+
+    def fuzzy(self, name, max_distance=2, limit=5):
+        '''
+        :param name: possibly misspelled player name
+        :param max_distance: largest edit distance between the normalized names still returned
+        :param limit: maximum number of names returned
+        :return: list of (player name, [playerIds], edit distance), closest first
+        '''
+        query = normalize_name(name)
+        if query in self._ids:
+            return [(self._display[query], sorted(self._ids[query]), 0)]
+
+        shared = {}
+        for trigram in _trigrams(query):
+            for key in self._trigram_index.get(trigram, ()):
+                shared[key] = shared.get(key, 0) + 1
+
+        # Each edit destroys at most 3 trigrams, candidates sharing fewer cannot be close enough
+        required = len(_trigrams(query)) - 3 * max_distance
+        matches = []
+        for key, count in sorted(shared.items(), key=lambda item: -item[1]):
+            if count < required:
+                break
+            distance = _edit_distance(query, key, max_distance)
+            if distance <= max_distance:
+                matches.append((distance, key))
+        matches.sort()
+        return [(self._display[key], sorted(self._ids[key]), distance) for distance, key in matches[:limit]]
+
+    def resolve(self, name, max_distance=2):
+        '''
+        :return: playerIds of the exact match of name, or of its single closest fuzzy match, empty if there is none
+        '''
+        ids = self.lookup(name)
+        if ids or max_distance <= 0:
+            return ids
+        matches = self.fuzzy(name, max_distance=max_distance, limit=2)
+        # Two names just as close are ambiguous
+        if not matches or (len(matches) > 1 and matches[0][2] == matches[1][2]):
+            return []
+        return matches[0][1]
+
+    def resolve_many(self, names, max_distance=2):
+        '''
+        Resolves a batch of names, each distinct normalized name is only resolved once
+
+        :param names: iterable of player names
+        :param max_distance: see resolve, 0 for exact matches only
+        :return: list of the playerIds of each name, in the order of names
+        '''
+        resolved = {}
+        results = []
+        for name in names:
+            key = normalize_name(name) if isinstance(name, str) else ''
+            if key not in resolved:
+                resolved[key] = self.resolve(key, max_distance=max_distance) if key else []
+            results.append(resolved[key])
+        return results
@@ -0,0 +1,306 @@
+'''
+Ranking and percentile index over full_report, held in NumPy arrays
+'''
+from numbers import Integral, Number
+
+import numpy as np
+
+
+def _is_number(kind):
+    return issubclass(kind, Number) and not issubclass(kind, (bool, np.bool_))
+
+
+def _missing(value):
+    # None in full_report dicts, NaN in DataFrame records
+    return value is None or value != value
+
+
+class LeagueIndex:
+    '''
+    Column store of a league report answering top-N, percentile and filter queries
+
+    Every numeric stat is a float64 array with NaN where a player has no value, every other
+    stat is an int32 array of codes into its list of distinct strings. The order of a stat
+    is sorted on first use and kept until that stat changes, so repeated queries only
+    gather and mask arrays.
+
+    Filters are dicts of stat : condition, all of which must hold:
+        {'positionCode': 'C'}                 equal to a value
+        {'positionCode': ['L', 'R']}          one of several values
+        {'gamesPlayed': (40, None)}           numeric range, bounds inclusive, None for open
+    '''
+
+    def __init__(self, report=None, key='playerId'):
+        '''
+        :param report: full_report() output, playerID : {stats}, a DataFrame or list of records with a key
+                       column, or None for an empty index
+        :param key: column of the player identifier in a DataFrame or list of records
+        '''
+        self.key = key
+        self.ids = np.empty(0, dtype=np.int64)
+        self._row_of = {}
+        self._numeric = {}
+        # stat -> [codes, distinct strings, string -> code]
+        self._categorical = {}
+        self._integer = set()
+        self._orders = {}
+        if report is not None:
+            self.update(report)
+
+    @classmethod
+    def from_columns(cls, ids, numeric, categorical=None, integer=(), key='playerId'):
+        '''
+        Builds an index over existing arrays without copying them, e.g. the columns of a SnapshotFile
+
+        :param ids: int64 array of the playerIDs
+        :param numeric: stat : float64 array aligned with ids, NaN for missing values
+        :param categorical: stat : [int32 codes aligned with ids, distinct strings, string -> code], -1 for
+                            missing values
+        :param integer: numeric stats whose values are all integral
+        :param key: name of the player identifier
+        :return: LeagueIndex
+        '''
+        index = cls(key=key)
+        index.ids = ids
+        index._row_of = {playerID: i for i, playerID in enumerate(ids.tolist())}
+        index._numeric = dict(numeric)
+        index._categorical = dict(categorical or {})
+        index._integer = set(integer)
+        return index
+
+    @staticmethod
+    def _records(report, key):
+        '''
+        :return: dict of playerID : {stats} of any of the report shapes the index accepts
+        '''
+        if isinstance(report, dict):
+            return report
+        if hasattr(report, 'to_dict'):
+            report = report.to_dict('records')
+        return {record[key]: record for record in report}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, playerID):
+        return int(playerID) in self._row_of
+
+    @property
+    def stats(self):
+        '''
+        names of the numeric stats, the ones top and percentile rank by
+        '''
+        return list(self._numeric)
+
+    def values(self, stat):
+        '''
+        :return: array of a numeric stat, aligned with ids
+        '''
+        return self._numeric[stat]
+
+    def row(self, playerID):
+        '''
+        :return: dict of every stat of a player, None for stats the player has no value of
+        '''
+        i = self._row_of[int(playerID)]
+        row = {self.key: int(self.ids[i])}
+        for stat, values in self._numeric.items():
+            row[stat] = self._value(stat, values[i])
+        for stat, (codes, categories, lookup) in self._categorical.items():
+            row[stat] = categories[codes[i]] if codes[i] >= 0 else None
+        return row
+
+    def _value(self, stat, value):
+        if np.isnan(value):
+            return None
+        return int(value) if stat in self._integer else float(value)
+
+    def update(self, report, removed=()):
+        '''
+        Applies the players of a refreshed report
+
+        Players already in the index get their stats replaced, new players are added. Only the
+        sorted orders of stats whose values changed are dropped.
+
+        :param report: playerID : {stats} of the added or changed players, or any shape __init__ accepts
+        :param removed: playerIDs to drop from the index
+        :return: dict with the number of players added, updated and removed
+        '''
+        records = self._records(report, self.key)
+        new = [int(playerID) for playerID in records if int(playerID) not in self._row_of]
+        updated = len(records) - len(new)
+
+        if new:
+            start = len(self.ids)
+            self.ids = np.concatenate([self.ids, np.array(new, dtype=np.int64)])
+            for offset, playerID in enumerate(new):
+                self._row_of[playerID] = start + offset
+            for stat in self._numeric:
+                self._numeric[stat] = np.concatenate([self._numeric[stat], np.full(len(new), np.nan)])
+            for entry in self._categorical.values():
+                entry[0] = np.concatenate([entry[0], np.full(len(new), -1, dtype=np.int32)])
+
+        # One column at a time, every column is filled with a single fancy-indexed assignment
+        rows = np.array([self._row_of[int(playerID)] for playerID in records], dtype=np.int64)
+        columns = {}
+        for stats in records.values():
+            for stat in stats:
+                if stat != self.key:
+                    columns.setdefault(stat, None)
+        for stat in columns:
+            column = [stats.get(stat) for stats in records.values()]
+            present = [value for value in column if not _missing(value)]
+            # A column holds a handful of types, checking those is much cheaper than every value
+            kinds = {type(value) for value in present}
+            integral = all(issubclass(kind, Integral) for kind in kinds)
+            if stat not in self._numeric and stat not in self._categorical:
+                if all(_is_number(kind) for kind in kinds):
+                    self._numeric[stat] = np.full(len(self.ids), np.nan)
+                    if integral:
+                        self._integer.add(stat)
+                else:
+                    self._categorical[stat] = [np.full(len(self.ids), -1, dtype=np.int32), [], {}]
+
+            if stat in self._numeric:
+                if stat in self._integer and not integral:
+                    self._integer.discard(stat)
+                values = np.array(column, dtype=np.float64)
+                if not np.array_equal(self._numeric[stat][rows], values, equal_nan=True):
+                    self._numeric[stat][rows] = values
+                    self._drop_orders(stat)
+            else:
+                codes, categories, lookup = self._categorical[stat]
+                for value in present:
+                    if value not in lookup:
+                        lookup[value] = len(categories)
+                        categories.append(value)
+                codes[rows] = [-1 if _missing(value) else lookup[value] for value in column]
+
+        if new:
+            self._orders.clear()
+        removed = [int(playerID) for playerID in removed if int(playerID) in self._row_of]
+        if removed:
+            keep = np.ones(len(self.ids), dtype=bool)
+            keep[[self._row_of[playerID] for playerID in removed]] = False
+            self.ids = self.ids[keep]
+            self._row_of = {int(playerID): i for i, playerID in enumerate(self.ids)}
+            for stat in self._numeric:
+                self._numeric[stat] = self._numeric[stat][keep]
+            for entry in self._categorical.values():
+                entry[0] = entry[0][keep]
+            self._orders.clear()
+        return {'added': len(new), 'updated': updated, 'removed': len(removed)}
+
+    def refresh(self, report):
+        '''
+        Brings the index in line with a complete new report, players missing from it are removed
+
+        :param report: full_report() output or any shape __init__ accepts
+        :return: see update
+        '''
+        records = self._records(report, self.key)
+        present = {int(playerID) for playerID in records}
+        return self.update(records, removed=[playerID for playerID in self._row_of if playerID not in present])
+
+    def _drop_orders(self, stat):
+        self._orders.pop((stat, False), None)
+        self._orders.pop((stat, True), None)
+
+    def _order(self, stat, descending):
+        '''
+        :return: (rows sorted by stat with missing values last and ties by playerId, number of rows with a value)
+        '''
+        order = self._orders.get((stat, descending))
+        if order is None:
+            values = self._numeric[stat]
+            order = np.lexsort((self.ids, -values if descending else values))
+            order = self._orders[(stat, descending)] = (order, int(np.count_nonzero(~np.isnan(values))))
+        return order
+
+    def mask(self, where=None):
+        '''
+        :param where: filter dict, see the class docstring
+        :return: boolean array aligned with ids, True for the players matching every condition
+        '''
+        mask = np.ones(len(self.ids), dtype=bool)
+        for stat, condition in (where or {}).items():
+            if stat == self.key:
+                values = [condition] if np.isscalar(condition) else list(condition)
+                mask &= np.isin(self.ids, values)
+            elif stat in self._numeric:
+                values = self._numeric[stat]
+                if isinstance(condition, tuple):
+                    low, high = condition
+                    if low is not None:
+                        mask &= values >= low
+                    if high is not None:
+                        mask &= values <= high
+                else:
+                    mask &= values == condition
+            elif stat in self._categorical:
+                codes, categories, lookup = self._categorical[stat]
+                if isinstance(condition, (list, tuple, set, frozenset)):
+                    mask &= np.isin(codes, [lookup[value] for value in condition if value in lookup])
+                else:
+                    mask &= codes == lookup.get(condition, -2)
+            else:
+                raise KeyError(f"no stat {stat!r} in the index")
+        return mask
+
+    def filter(self, where=None):
+        '''
+        :return: array of the playerIDs matching every condition of where
+        '''
+        return self.ids[self.mask(where)]
+
+    def top(self, stat, n=10, where=None, ascending=False):
+        '''
+        :param stat: numeric stat to rank by, e.g. 'pointsPerGame'
+        :param n: number of players returned
+        :param where: filter dict restricting the players ranked
+        :param ascending: rank the lowest values first
+        :return: list of (playerID, value) of the n best ranked players with a value, ties by playerId
+        '''
+        order, valid = self._order(stat, not ascending)
+        order = order[:valid]
+        if where:
+            order = order[self.mask(where)[order]]
+        order = order[:n]
+        values = self._numeric[stat][order]
+        if stat in self._integer:
+            values = values.astype(np.int64)
+        return list(zip(self.ids[order].tolist(), values.tolist()))
+
+    def _sorted_values(self, stat, where):
+        order, valid = self._order(stat, False)
+        order = order[:valid]
+        if where:
+            order = order[self.mask(where)[order]]
+        return self._numeric[stat][order]
+
+    def percentile(self, playerID, stat, where=None):
+        '''
+        :param where: filter dict of the players the player is compared with
+        :return: percent of the compared players with a value of stat at most the player's, None if the
+                 player has no value
+        '''
+        value = self._numeric[stat][self._row_of[int(playerID)]]
+        if np.isnan(value):
+            return None
+        values = self._sorted_values(stat, where)
+        if not len(values):
+            return None
+        return float(np.searchsorted(values, value, side='right') * 100.0 / len(values))
+
+    def percentiles(self, stat, where=None):
+        '''
+        :return: array aligned with ids of every player's percentile in stat, see percentile, NaN for players
+                 without a value
+        '''
+        values = self._sorted_values(stat, where)
+        column = self._numeric[stat]
+        if not len(values):
+            return np.full(len(self.ids), np.nan)
+        ranks = np.searchsorted(values, column, side='right') * 100.0 / len(values)
+        ranks[np.isnan(column)] = np.nan
+        return ranks
@@ -0,0 +1,144 @@
+'''
+Report schemas and JSON decoding shared by the sync and async clients
+'''
+import json
+
+try:
+    import orjson
+except ImportError:  # optional, JSON is decoded with the json module without it
+    orjson = None
+
+
+def decode_json(content, fast=True):
+    '''
+    :param content: raw JSON body
+    :param fast: decode with orjson when it is installed
+    :return: decoded JSON
+    '''
+    if fast and orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def sort_by(*fields):
+    '''
+    :param fields: fields the rows of a stats REST report are sorted by, ascending, each breaking the ties of the
+                   ones before
+    :return: sort parameter of the report, e.g. [{"property":"playerId","direction":"ASC"}, ...]
+    '''
+    return json.dumps([{'property': field, 'direction': 'ASC'} for field in fields], separators=(',', ':'))
+
+
+class ReportSchema:
+    '''
+    Declarative projection of the records of a report
+
+    Every record is projected in a single pass: the key field is taken out, dropped fields
+    are left out, fields are renamed and, when columns is given, only those output fields
+    are kept, in that order.
+    '''
+
+    def __init__(self, key=None, drop=(), rename=None, columns=None):
+        '''
+        :param key: field the records are keyed by, removed from the projected record
+        :param drop: fields left out of the projected record
+        :param rename: dict of field : output name
+        :param columns: output names kept, in order, None to keep every field not dropped in API order
+        '''
+        self.key = key
+        self.drop = list(drop)
+        self.rename = dict(rename or {})
+        self.columns = list(columns) if columns is not None else None
+
+        self._skipped = frozenset(self.drop + ([key] if key is not None else []))
+        self._fields = None
+        if self.columns is not None:
+            sources = {target: source for source, target in self.rename.items()}
+            self._fields = [(sources.get(column, column), column) for column in self.columns
+                            if sources.get(column, column) not in self._skipped]
+
+    def project(self, record):
+        '''
+        :param record: record as decoded from the API, left unchanged
+        :return: new dict of the record's kept fields under their output names
+        '''
+        if self._fields is not None:
+            return {target: record[source] for source, target in self._fields if source in record}
+        if self.rename:
+            rename = self.rename
+            return {rename.get(field, field): value for field, value in record.items() if field not in self._skipped}
+        skipped = self._skipped
+        return {field: value for field, value in record.items() if field not in skipped}
+
+    def keyed(self, records):
+        '''
+        :param records: records as decoded from the API, reused for the projection so not to be used afterwards
+        :return: list of (key value, projected record) of every record
+        '''
+        key = self.key
+        if self._fields is not None or self.rename:
+            return [(record[key], self.project(record)) for record in records]
+
+        # Dropping a few fields in place is cheaper than copying the many kept ones
+        keyed = []
+        drop = self.drop
+        for record in records:
+            value = record.pop(key)
+            for field in drop:
+                record.pop(field, None)
+            keyed.append((value, record))
+        return keyed
+
+
+# report method -> (stats REST report, sort field, schema), fields duplicated in other reports are dropped
+LEAGUE_REPORTS = {
+    'summaryreport': ('summary', 'points', ReportSchema(key='playerId', drop=['faceoffWinPct', 'timeOnIcePerGame'])),
+    'bioreport': ('bios', 'points', ReportSchema(key='playerId', drop=['goals', 'assists', 'points', 'gamesPlayed',
+                                                                       'lastName', 'currentTeamAbbrev',
+                                                                       'isInHallOfFameYn'])),
+    'faceoffpercentages': ('faceoffpercentages', 'totalFaceoffs',
+                           ReportSchema(key='playerId', drop=['gamesPlayed', 'seasonId', 'shootsCatches', 'lastName',
+                                                              'teamAbbrevs', 'timeOnIcePerGame', 'positionCode'])),
+    'faceoffwins': ('faceoffwins', 'totalFaceoffs',
+                    ReportSchema(key='playerId', drop=['gamesPlayed', 'lastName', 'positionCode', 'seasonId',
+                                                       'skaterFullName', 'teamAbbrevs'])),
+    'miscreport': ('realtime', 'hits',
+                   ReportSchema(key='playerId', drop=['gamesPlayed', 'lastName', 'otGoals', 'positionCode', 'seasonId',
+                                                      'shootsCatches', 'skaterFullName', 'teamAbbrevs',
+                                                      'timeOnIcePerGame'])),
+    'timeonice': ('timeonice', 'timeOnIce',
+                  ReportSchema(key='playerId', drop=['gamesPlayed', 'lastName', 'positionCode', 'seasonId',
+                                                     'shootsCatches', 'skaterFullName', 'teamAbbrevs'])),
+}
+
+# order the league reports are merged in by full_report, later reports win on duplicated keys
+FULL_REPORT_ORDER = ['summaryreport', 'miscreport', 'bioreport', 'timeonice', 'faceoffpercentages', 'faceoffwins']
+
+# per-skater stats REST reports and the field their rows are sorted by
+SKATER_REPORTS = [('summary', 'seasonId'), ('bios', 'height'), ('faceoffpercentages', 'seasonId'),
+                  ('faceoffwins', 'seasonId'), ('realtime', 'seasonId'), ('timeonice', 'seasonId')]
+
+# columns kept, in order, by skater_summary
+SKATER_SUMMARY_COLUMNS = ["teamAbbrevs", "shootsCatches", "positionCode", "gamesPlayed",
+                          "goals", "assists", "points", "plusMinus", "penaltyMinutes",
+                          "pointsPerGame", "evGoals", "evPoints", "ppGoals", "ppPoints",
+                          "shGoals", "shPoints", "otGoals", "gameWinningGoals", "shots",
+                          "shootingPct", "timeOnIcePerGame", "faceoffWinPct"]
+
+# columns kept, in order, by skater_bio
+SKATER_BIO_COLUMNS = ["playerId", "birthDate", "birth country", "birth city", "birth state/province",
+                      "nationality", "height", "weight", "draftYear", "draftRound",
+                      "draftOverall", "first season", "Hall of Fame", "career games played",
+                      "career goals", "career assists", "career points", "otGoals", "gameWinningGoals",
+                      "shots", "shootingPct", "timeOnIcePerGame", "faceoffWinPct"]
+
+# schemas of the per-skater reports, season rows are keyed by seasonId
+SKATER_SEASON_SCHEMA = ReportSchema(key='seasonId')
+SKATER_SUMMARY_SCHEMA = ReportSchema(key='seasonId', columns=SKATER_SUMMARY_COLUMNS)
+SKATER_BIO_SCHEMA = ReportSchema(rename={"gamesPlayed": "career games played", "assists": "career assists",
+                                         "points": "career points", "goals": "career goals",
+                                         "firstSeasonForGameType": "first season",
+                                         "birthCountryCode": "birth country", "birthCity": "birth city",
+                                         "birthStateProvinceCode": "birth state/province",
+                                         "nationalityCode": "nationality", "isInHallOfFameYn": "Hall of Fame"},
+                                 columns=SKATER_BIO_COLUMNS)
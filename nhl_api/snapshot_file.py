@@ -0,0 +1,305 @@
+'''
+Memory-mapped snapshot file of full_report and the per-skater seasons
+
+A snapshot is one file: a JSON header followed by one 64-byte aligned buffer per column.
+Numeric stats are float64, or int64 when a column has no missing values, and every other
+stat is int32 codes into a string table kept once in the header, so player names, teams
+and positions are stored once. Opening a snapshot parses the header and maps the file,
+columns are NumPy views of the mapping that read nothing until touched. Processes opening
+the same file share its pages through the OS page cache. The mapping is copy-on-write, so
+an index built on it can be updated without touching the file.
+
+Layout:
+    b'NHLSNAP1'   8-byte little-endian header length   header JSON   padding   column buffers
+
+usage: python -m nhl_api.snapshot_file league.snap [--skaters]
+'''
+import argparse
+import json
+import os
+
+import numpy as np
+
+from .ranking import LeagueIndex, _is_number, _missing
+
+MAGIC = b'NHLSNAP1'
+VERSION = 1
+ALIGNMENT = 64
+
+
+def _pad(size):
+    return -size % ALIGNMENT
+
+
+def _encode_table(records, key, strings, lookup):
+    '''
+    :param records: list of dicts
+    :param strings: string table, extended with the table's new values
+    :param lookup: string -> position in strings
+    :return: list of (column header, array)
+    '''
+    names = {}
+    for record in records:
+        for name in record:
+            names.setdefault(name, None)
+    names = [key] + [name for name in names if name != key]
+
+    columns = []
+    for name in names:
+        values = [record.get(name) for record in records]
+        present = [value for value in values if not _missing(value)]
+        kinds = {type(value) for value in present}
+        if all(_is_number(kind) for kind in kinds):
+            integer = all(issubclass(kind, (int, np.integer)) for kind in kinds)
+            if integer and len(present) == len(values):
+                array = np.array(values, dtype='<i8')
+            else:
+                array = np.array([None if _missing(value) else value for value in values], dtype='<f8')
+            columns.append(({'name': name, 'dtype': array.dtype.str, 'integer': integer, 'strings': False}, array))
+        else:
+            codes = []
+            for value in values:
+                if _missing(value):
+                    codes.append(-1)
+                    continue
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[value] = len(strings)
+                    strings.append(value)
+                codes.append(code)
+            array = np.array(codes, dtype='<i4')
+            columns.append(({'name': name, 'dtype': array.dtype.str, 'integer': False, 'strings': True}, array))
+    return columns
+
+
+def write_snapshot(path, report, seasons=None, key='playerId'):
+    '''
+    Writes a snapshot file, replacing path atomically
+
+    :param path: file written
+    :param report: full_report() output, playerID : {stats}
+    :param seasons: skaters_full_report() output, playerID : [{stats of a season}], stored sorted by playerId
+    :param key: name of the player identifier column
+    :return: dict with the rows of each table and the bytes written
+    '''
+    strings, lookup = [], {}
+    tables = {'full_report': [{key: int(playerID), **stats} for playerID, stats in report.items()]}
+    if seasons is not None:
+        tables['seasons'] = [{key: int(playerID), **season} for playerID in sorted(seasons, key=int)
+                             for season in seasons[playerID]]
+    encoded = {name: _encode_table(records, key, strings, lookup) for name, records in tables.items()}
+
+    header = {'version': VERSION, 'key': key, 'tables': {}, 'strings': strings}
+    offset = 0
+    for name, columns in encoded.items():
+        header['tables'][name] = {'rows': len(tables[name]), 'columns': []}
+        for column, array in columns:
+            header['tables'][name]['columns'].append({**column, 'offset': offset})
+            offset += array.nbytes + _pad(array.nbytes)
+    header = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    start = len(MAGIC) + 8 + len(header)
+    start += _pad(start)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(header).to_bytes(8, 'little'))
+        f.write(header)
+        f.write(b'\0' * (start - f.tell()))
+        for columns in encoded.values():
+            for column, array in columns:
+                f.write(array.tobytes())
+                f.write(b'\0' * _pad(array.nbytes))
+        size = f.tell()
+    os.replace(tmp_path, path)
+    return {**{name: len(records) for name, records in tables.items()}, 'bytes': size}
+
+
+class SnapshotFile:
+    '''
+    Read side of a snapshot written by write_snapshot, every column is a view of the mapped file
+    '''
+
+    def __init__(self, path):
+        '''
+        :param path: snapshot file
+        :raises ValueError: if path is not a snapshot file of a version this reader knows
+        '''
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a snapshot file")
+            length = int.from_bytes(f.read(8), 'little')
+            header = json.loads(f.read(length))
+        if header['version'] != VERSION:
+            raise ValueError(f"{path} is a version {header['version']} snapshot, expected {VERSION}")
+
+        self.path = path
+        self.key = header['key']
+        self.strings = header['strings']
+        self._tables = header['tables']
+        start = len(MAGIC) + 8 + length
+        self._start = start + _pad(start)
+        self._map = np.memmap(path, dtype=np.uint8, mode='c')
+        self._columns = {}
+
+    def close(self):
+        # Arrays handed out keep the mapping alive until they are gone
+        self._columns = {}
+        self._map = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def tables(self):
+        return list(self._tables)
+
+    def rows(self, table='full_report'):
+        return self._tables[table]['rows']
+
+    def columns(self, table='full_report'):
+        '''
+        :return: names of the columns of a table, the key first
+        '''
+        return [column['name'] for column in self._tables[table]['columns']]
+
+    def _column_header(self, table, name):
+        for column in self._tables[table]['columns']:
+            if column['name'] == name:
+                return column
+        raise KeyError(f"no column {name!r} in {table}")
+
+    def _view(self, mapping, table, name):
+        column = self._column_header(table, name)
+        dtype = np.dtype(column['dtype'])
+        start = self._start + column['offset']
+        return np.asarray(mapping[start:start + self.rows(table) * dtype.itemsize].view(dtype))
+
+    def column(self, name, table='full_report'):
+        '''
+        :return: array view of a column, int32 codes into strings for a string column
+        '''
+        array = self._columns.get((table, name))
+        if array is None:
+            array = self._columns[(table, name)] = self._view(self._map, table, name)
+        return array
+
+    def _records(self, table, rows=slice(None)):
+        '''
+        :return: list of dicts of the rows of a table, missing values as None
+        '''
+        decoded = []
+        strings = self.strings
+        for column in self._tables[table]['columns']:
+            values = self.column(column['name'], table)[rows].tolist()
+            if column['strings']:
+                values = [strings[code] if code >= 0 else None for code in values]
+            elif column['dtype'] == '<f8':
+                integer = column['integer']
+                values = [None if value != value else int(value) if integer else value for value in values]
+            decoded.append((column['name'], values))
+        names = [name for name, values in decoded]
+        return [dict(zip(names, row)) for row in zip(*[values for name, values in decoded])]
+
+    def full_report(self):
+        '''
+        :return: the report as full_report() returns it, stats a player has no value of are None
+        '''
+        key = self.key
+        report = {}
+        for record in self._records('full_report'):
+            report[record.pop(key)] = record
+        return report
+
+    def _season_rows(self, playerID):
+        ids = self.column(self.key, 'seasons')
+        return slice(int(np.searchsorted(ids, playerID, side='left')),
+                     int(np.searchsorted(ids, playerID, side='right')))
+
+    def skater_seasons(self, playerID):
+        '''
+        :return: a player's seasons as skater_full_report() returns them, empty if the player is not in the snapshot
+        '''
+        if 'seasons' not in self._tables:
+            return []
+        return self._records('seasons', self._season_rows(int(playerID)))
+
+    def skaters_full_report(self):
+        '''
+        :return: every player's seasons as skaters_full_report() returns them
+        '''
+        reports = {}
+        if 'seasons' in self._tables:
+            for record in self._records('seasons'):
+                reports.setdefault(record[self.key], []).append(record)
+        return reports
+
+    def league_index(self):
+        '''
+        :return: LeagueIndex of full_report over the mapped columns, updating it copies only the pages written
+        '''
+        # A mapping of its own, so that updates of the index are not seen through column()
+        mapping = np.memmap(self.path, dtype=np.uint8, mode='c')
+        strings = list(self.strings)
+        lookup = {value: code for code, value in enumerate(strings)}
+        numeric, categorical, integer = {}, {}, set()
+        for column in self._tables['full_report']['columns']:
+            name = column['name']
+            if name == self.key:
+                continue
+            if column['strings']:
+                # Every string column shares the snapshot's string table
+                categorical[name] = [self._view(mapping, 'full_report', name), strings, lookup]
+                continue
+            values = self._view(mapping, 'full_report', name)
+            numeric[name] = values if values.dtype == np.float64 else values.astype(np.float64)
+            if column['integer']:
+                integer.add(name)
+        return LeagueIndex.from_columns(self._view(mapping, 'full_report', self.key), numeric, categorical, integer,
+                                        key=self.key)
+
+    def to_pandas(self, table='full_report'):
+        '''
+        :return: DataFrame of a table, string columns as Categoricals over the string table
+        '''
+        import pandas as pd
+
+        data = {}
+        for column in self._tables[table]['columns']:
+            values = self.column(column['name'], table)
+            if column['strings']:
+                values = pd.Categorical.from_codes(values, categories=pd.Index(self.strings, dtype='object'))
+            data[column['name']] = values
+        return pd.DataFrame(data, copy=False)
+
+
+def main():
+    from .wrapper import NHLAPIWrapper
+
+    parser = argparse.ArgumentParser(description='Write full_report, and optionally every skater\'s seasons, '
+                                                 'to a memory-mapped snapshot file')
+    parser.add_argument('path')
+    parser.add_argument('--skaters', action='store_true', help='also store the seasons of every player')
+    parser.add_argument('--season', type=int, default=None, help='seasonId of the league report')
+    args = parser.parse_args()
+
+    with NHLAPIWrapper(id_cache_path=None, season=args.season) as wrapper:
+        report = wrapper.full_report()
+        if isinstance(report, list):
+            print(f"full_report failed with {report[0]}: {report[1][:200]}")
+            return
+        seasons = None
+        if args.skaters:
+            seasons = wrapper.skaters_full_report(report)
+            if isinstance(seasons, list):
+                print(f"skaters_full_report failed with {seasons[0]}: {seasons[1][:200]}")
+                return
+    result = write_snapshot(args.path, report, seasons)
+    print(f"{result['full_report']} players written to {args.path} ({result['bytes'] / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
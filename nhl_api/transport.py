@@ -0,0 +1,363 @@
+'''
+HTTP transports of NHLAPIWrapper: pooled keep-alive connections, an on-disk response
+cache, and the client-side rate limiter and circuit breaker
+'''
+import os
+import sqlite3
+import threading
+import time
+
+from .schema import decode_json
+
+# where the response cache lives by default, and seconds a cached response stays fresh per url fragment
+DEFAULT_RESPONSE_CACHE = os.path.join(os.path.expanduser('~'), '.nhl_api', 'responses.sqlite')
+DEFAULT_CACHE_TTL = {
+    'v1/season': 24 * 3600,
+    '/en/skater/bios': 24 * 3600,
+}
+
+
+class TokenBucket:
+    '''
+    Thread-safe token bucket rate limiter
+
+    Allows bursts of up to burst requests and a sustained rate of rate requests per second.
+    One bucket can be shared by several NHLAPIWrapper instances to limit them together.
+    '''
+
+    def __init__(self, rate, burst=None):
+        '''
+        :param rate: requests per second
+        :param burst: maximum number of requests made back to back, defaults to rate
+        '''
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        '''
+        Blocks until a request may be made
+
+        :return: seconds spent waiting
+        '''
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    '''
+    Circuit breaker of a single host
+
+    After failure_threshold consecutive failures the circuit opens and requests fail fast
+    for reset_timeout seconds. Then one trial request is let through (half-open): success
+    closes the circuit, failure opens it again.
+    '''
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        '''
+        :return: 0 if a request may be made, otherwise the seconds until the circuit half-opens
+        '''
+        with self._lock:
+            if self.state == 'closed':
+                return 0
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if self.state == 'open' and remaining <= 0:
+                # Let a single trial request through
+                self.state = 'half-open'
+                return 0
+            return max(remaining, 0.001) if self.state == 'open' else self.reset_timeout
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == 'half-open' or self._failures >= self.failure_threshold:
+                self.state = 'open'
+                self._opened_at = time.monotonic()
+
+
+class HTTPTransport:
+    '''
+    Pooled, keep-alive HTTP transport shared by every NHLAPIWrapper request
+
+    Connections to api.nhle.com and api-web.nhle.com are reused across calls instead of
+    paying a new TCP + TLS handshake for every page. Any object with a get(url) method
+    returning a requests-style response can be passed to NHLAPIWrapper in its place.
+    '''
+
+    def __init__(self, pool_size=10, timeout=(5, 30), keep_alive=True, gzip=True, headers=None):
+        '''
+        :param pool_size: number of connections kept open per host
+        :param timeout: (connect, read) timeout in seconds applied to every request
+        :param keep_alive: reuse connections between requests
+        :param gzip: ask the server for compressed responses
+        :param headers: extra headers sent with every request
+        '''
+        # requests is only imported by the default transport
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.timeout = timeout
+        self.session = requests.Session()
+
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate' if gzip else 'identity',
+            'Connection': 'keep-alive' if keep_alive else 'close',
+        })
+        if headers:
+            self.session.headers.update(headers)
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CachedResponse:
+    '''
+    Response replayed from a ResponseCache, quacks like a requests.Response
+    '''
+    from_cache = True
+
+    def __init__(self, status_code, content, headers):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    def json(self):
+        return decode_json(self.content, fast=False)
+
+
+class ResponseCache:
+    '''
+    SQLite backed store of successful responses keyed by full url
+
+    Least recently used entries are evicted to keep the stored bodies under max_bytes.
+    hits, misses and revalidated count how each lookup through a CachingTransport ended.
+    '''
+
+    def __init__(self, path=DEFAULT_RESPONSE_CACHE, max_bytes=256 * 1024 * 1024):
+        '''
+        :param path: SQLite file the responses are stored in
+        :param max_bytes: budget for the total size of the stored bodies
+        '''
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS responses (
+                                  url TEXT PRIMARY KEY,
+                                  body BLOB NOT NULL,
+                                  content_type TEXT,
+                                  etag TEXT,
+                                  last_modified TEXT,
+                                  stored_at REAL NOT NULL,
+                                  accessed_at REAL NOT NULL,
+                                  size INTEGER NOT NULL)''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+        self._conn.commit()
+
+    def get(self, url):
+        '''
+        :return: (body, headers, stored_at) for url, or None if it is not cached
+        '''
+        with self._lock:
+            row = self._conn.execute('SELECT body, content_type, etag, last_modified, stored_at FROM responses '
+                                     'WHERE url = ?', (url,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE responses SET accessed_at = ? WHERE url = ?', (time.time(), url))
+            self._conn.commit()
+
+        body, content_type, etag, last_modified, stored_at = row
+        headers = {key: value for key, value in (('Content-Type', content_type), ('ETag', etag),
+                                                  ('Last-Modified', last_modified)) if value}
+        return body, headers, stored_at
+
+    def put(self, url, body, headers):
+        now = time.time()
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                               (url, body, headers.get('Content-Type'), headers.get('ETag'),
+                                headers.get('Last-Modified'), now, now, len(body)))
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, url):
+        '''
+        Marks url as fresh again after the server confirmed it has not changed
+        '''
+        now = time.time()
+        with self._lock:
+            self._conn.execute('UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?', (now, now, url))
+            self._conn.commit()
+
+    def _evict(self):
+        # Drop least recently used entries until the bodies fit in the byte budget
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._conn.execute('SELECT url, size FROM responses ORDER BY accessed_at').fetchall():
+            self._conn.execute('DELETE FROM responses WHERE url = ?', (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def record(self, outcome):
+        '''
+        Counts a lookup, CachingTransports of several threads share one cache
+
+        :param outcome: 'hits', 'misses' or 'revalidated'
+        '''
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def size(self):
+        '''
+        :return: total bytes of the stored bodies
+        '''
+        with self._lock:
+            return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+
+    def stats(self):
+        '''
+        :return: dict of hit / miss / revalidation counters and the bytes stored
+        '''
+        with self._lock:
+            hits, misses, revalidated = self.hits, self.misses, self.revalidated
+        lookups = hits + misses + revalidated
+        return {
+            'hits': hits,
+            'misses': misses,
+            'revalidated': revalidated,
+            'hit_ratio': (hits + revalidated) / lookups if lookups else 0.0,
+            'bytes': self.size(),
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachingTransport:
+    '''
+    Transport that answers from a ResponseCache while an entry is younger than its TTL
+
+    Stale entries are revalidated with If-None-Match / If-Modified-Since when the server
+    sent an ETag or Last-Modified, so an unchanged report costs a 304 instead of a full body.
+    '''
+
+    def __init__(self, transport, cache, ttl=None, default_ttl=3600):
+        '''
+        :param transport: transport the requests that miss the cache are made with
+        :param cache: ResponseCache the responses are stored in
+        :param ttl: dict of url fragment -> seconds, the first fragment found in a url sets its TTL
+        :param default_ttl: seconds a response stays fresh when no fragment of ttl matches
+        '''
+        self.transport = transport
+        self.cache = cache
+        self.ttl = DEFAULT_CACHE_TTL if ttl is None else ttl
+        self.default_ttl = default_ttl
+
+    def ttl_for(self, url):
+        for fragment, seconds in self.ttl.items():
+            if fragment in url:
+                return seconds
+        return self.default_ttl
+
+    def get(self, url, **kwargs):
+        cached = self.cache.get(url)
+        if cached is None:
+            return self._fetch(url, **kwargs)
+
+        body, headers, stored_at = cached
+        if time.time() - stored_at < self.ttl_for(url):
+            self.cache.record('hits')
+            return CachedResponse(200, body, headers)
+
+        # Stale, ask the server whether it changed
+        conditional = {}
+        if 'ETag' in headers:
+            conditional['If-None-Match'] = headers['ETag']
+        if 'Last-Modified' in headers:
+            conditional['If-Modified-Since'] = headers['Last-Modified']
+        if not conditional:
+            return self._fetch(url, **kwargs)
+
+        response = self.transport.get(url, headers={**kwargs.pop('headers', {}), **conditional}, **kwargs)
+        if response.status_code == 304:
+            self.cache.record('revalidated')
+            self.cache.touch(url)
+            return CachedResponse(200, body, headers)
+        self.cache.record('misses')
+        self._store(url, response)
+        return response
+
+    def _fetch(self, url, **kwargs):
+        self.cache.record('misses')
+        response = self.transport.get(url, **kwargs)
+        self._store(url, response)
+        return response
+
+    def _store(self, url, response):
+        # Only successful responses are worth replaying
+        if response.status_code == 200:
+            self.cache.put(url, response.content, response.headers)
+
+    def close(self):
+        self.cache.close()
+        if hasattr(self.transport, 'close'):
+            self.transport.close()
@@ -0,0 +1,1241 @@
+'''
+Synchronous client of the NHL stats REST and api-web APIs
+'''
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from .errors import NHLAPIError, CircuitOpenError
+from .instrumentation import Instrumentation
+from .names import NameIndex
+from .schema import (decode_json, sort_by, LEAGUE_REPORTS, FULL_REPORT_ORDER, SKATER_REPORTS, SKATER_SEASON_SCHEMA,
+                     SKATER_SUMMARY_SCHEMA, SKATER_BIO_SCHEMA)
+from .transport import TokenBucket, CircuitBreaker, HTTPTransport, ResponseCache, CachingTransport
+
+# where NHLAPIWrapper persists the player name -> ID index
+DEFAULT_ID_CACHE = os.path.join(os.path.expanduser('~'), '.nhl_api', 'id_dict.json')
+
+# status codes worth retrying, and seconds a page of a failed report is kept for its rerun
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+PARTIAL_PAGE_TTL = 600
+
+# largest page size adaptive pagination asks the stats REST API for
+MAX_PAGE_SIZE = 1000
+
+
+class NHLAPIWrapper:
+    def __init__(self, base_url='https://api-web.nhle.com/', stats_url='https://api.nhle.com/stats/rest',
+                 transport=None, pool_size=10, timeout=(5, 30), page_workers=8, id_cache_path=DEFAULT_ID_CACHE,
+                 pagination='adaptive', max_page_size=MAX_PAGE_SIZE, cache_path=None, cache_ttl=None,
+                 cache_max_bytes=256 * 1024 * 1024, report_workers=6, season=None,
+                 instrumentation=None, max_retries=3, max_throttled_retries=20, backoff=0.5, max_backoff=30.0,
+                 rate_limit=None, circuit_breaker=True, failure_threshold=5, reset_timeout=30.0, fast_json=True):
+        '''
+        :param base_url: root of the api-web.nhle.com API
+        :param stats_url: root of the stats REST API
+        :param transport: object used for every HTTP request, defaults to a pooled HTTPTransport
+        :param pool_size: connections kept open per host by the default transport
+        :param timeout: (connect, read) timeout in seconds used by the default transport
+        :param page_workers: maximum number of pages of a report fetched at the same time
+        :param id_cache_path: file the player name -> ID index is persisted to, None to keep it in memory only
+        :param pagination: 'adaptive' to size league reports from the total the API returns,
+                           'fixed' for the original 8 pages of 100
+        :param max_page_size: largest page size asked for in adaptive mode, lowered if the server caps it
+        :param cache_path: SQLite file to cache responses in, None to disable the response cache
+        :param cache_ttl: dict of url fragment -> seconds a cached response stays fresh, see CachingTransport
+        :param cache_max_bytes: size budget of the response cache
+        :param report_workers: number of sub-reports full_report and skater_full_report fetch at the same time,
+                               1 fetches them one after another
+        :param season: seasonId the league reports cover, e.g. 20232024, defaults to the current season
+        :param instrumentation: Instrumentation to record request metrics in, True for a new one,
+                                None to record nothing
+        :param max_retries: times a request failing with a RETRY_STATUSES status or a connection error is retried,
+                            429s are retried after their Retry-After without counting towards it
+        :param max_throttled_retries: times a request answered with 429 is retried before the 429 is returned
+        :param backoff: base delay in seconds of the jittered exponential backoff, Retry-After takes precedence
+        :param max_backoff: longest delay between two attempts
+        :param rate_limit: requests per second across every call of the wrapper, or a TokenBucket to share
+                           between wrappers, None for no limit
+        :param circuit_breaker: fail fast on a host after failure_threshold consecutive failures
+        :param failure_threshold: consecutive failures that open a host's circuit
+        :param reset_timeout: seconds an open circuit waits before letting a trial request through
+        :param fast_json: decode response bodies with orjson when it is installed
+        '''
+        if pagination not in ('adaptive', 'fixed'):
+            raise ValueError(f"pagination must be 'adaptive' or 'fixed', not {pagination!r}")
+
+        self.base_url = base_url
+        self.stats_url = stats_url
+        self.transport = transport if transport is not None else HTTPTransport(pool_size=pool_size, timeout=timeout)
+        self.cache = None
+        if cache_path:
+            self.cache = ResponseCache(cache_path, max_bytes=cache_max_bytes)
+            self.transport = CachingTransport(self.transport, self.cache, ttl=cache_ttl)
+        self.page_workers = page_workers
+        self.report_workers = report_workers
+        self.pagination = pagination
+        self.page_size = max_page_size
+        self.id_cache_path = id_cache_path
+        self._ID_dict = None
+        self._player_names = {}
+        self._name_index = None
+        self._season = season
+        self.instrumentation = Instrumentation() if instrumentation is True else instrumentation or None
+        self.max_retries = max_retries
+        self.max_throttled_retries = max_throttled_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.rate_limiter = TokenBucket(rate_limit) if isinstance(rate_limit, (int, float)) else rate_limit
+        self.circuit_breaker = circuit_breaker
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers = {}
+        self._breakers_lock = threading.Lock()
+        self._partial_pages = {}
+        self._partial_pages_lock = threading.Lock()
+        self.fast_json = fast_json
+
+    @property
+    def season(self):
+        '''
+        seasonId the league reports cover, looked up with get_current_season_id on first use if not given
+        '''
+        if self._season is None:
+            self._season = self.get_current_season_id()
+        return self._season
+
+    @season.setter
+    def season(self, value):
+        self._season = value
+
+    @property
+    def ID_dict(self):
+        '''
+        Maps player names to their unique identifier
+
+        Built on first access: loaded from id_cache_path when it was built for season, otherwise
+        fetched from the summary report and written to id_cache_path.
+        '''
+        if self._ID_dict is None:
+            if not self._load_ID_dict():
+                self._ID_dict = {}
+                self.create_ID_dict()
+        return self._ID_dict
+
+    @ID_dict.setter
+    def ID_dict(self, value):
+        self._ID_dict = value
+        self._player_names = {int(playerID): name for name, playerID in value.items()}
+        self._name_index = None
+
+    @property
+    def name_index(self):
+        '''
+        NameIndex over every player of the ID dictionary, including players sharing a name
+
+        Rebuilt on first access after the ID dictionary changes.
+        '''
+        if self._name_index is None:
+            # Loads or builds the ID dictionary, which fills in the player names
+            self.ID_dict
+            self._name_index = NameIndex(self._player_names)
+        return self._name_index
+
+    def find_player_ids(self, name, max_distance=2):
+        '''
+        :param name: player name in any casing, with or without accents, "First Last" or "Last, First"
+        :param max_distance: largest edit distance of a misspelled name, 0 for exact matches only
+        :return: playerIds of every player with that name, empty if there is none
+        '''
+        return self.name_index.resolve(name, max_distance=max_distance)
+
+    def cache_stats(self):
+        '''
+        :return: hit / miss counters of the response cache, None if it is disabled
+        '''
+        return self.cache.stats() if self.cache is not None else None
+
+    def close(self):
+        '''
+        Closes the pooled connections held by the transport
+        '''
+        if hasattr(self.transport, 'close'):
+            self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get_current_season(self):
+        try:
+            season = self._request_json(self.base_url + 'v1/season')
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+        curr_season = int(str(season[-1])[:4])
+        return curr_season
+
+    def get_current_season_id(self):
+        '''
+        :return: full seasonId of the current season, e.g. 20232024
+        :raises NHLAPIError: if the request was not successful
+        '''
+        return int(self._request_json(self.base_url + 'v1/season')[-1])
+
+    def game_url(self, gameID, document):
+        '''
+        :param gameID: unique identifier of a game, e.g. 2023020001
+        :param document: 'boxscore', 'play-by-play' or 'landing'
+        :return: api-web url of the game document
+        '''
+        return self.base_url + f"v1/gamecenter/{gameID}/{document}"
+
+    def schedule(self, date='now'):
+        '''
+        Retrieves the games of the week starting on date
+
+        :param date: first day of the week as 'YYYY-MM-DD', 'now' for the current week
+        :return: schedule with a gameWeek list of days and their games, or [status_code, text]
+        '''
+        try:
+            return self._request_json(self.base_url + f"v1/schedule/{date}")
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+    def game_boxscore(self, gameID):
+        '''
+        :param gameID: unique identifier of a game, e.g. 2023020001
+        :return: boxscore of the game with every player's stats, or [status_code, text]
+        '''
+        try:
+            return self._request_json(self.game_url(gameID, 'boxscore'))
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+    def game_play_by_play(self, gameID):
+        '''
+        :param gameID: unique identifier of a game, e.g. 2023020001
+        :return: every event of the game in order, or [status_code, text]
+        '''
+        try:
+            return self._request_json(self.game_url(gameID, 'play-by-play'))
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+    def create_ID_dict(self):
+        '''
+        Populates the ID dictionary
+        Maps player names to their unique identifier
+        '''
+        try:
+            stats = self._fetch_pages('summary', 'playerId')
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+        if self._ID_dict is None:
+            self._ID_dict = {}
+
+        # Use a list comprehension to create a list of (skater_full_name, player_id) tuples
+        skater_id_pairs = [(player_data.get('skaterFullName'), player_data.get('playerId')) for player_data in stats]
+        self._ID_dict.update(skater_id_pairs)
+        self._add_player_names(skater_id_pairs)
+        self._save_ID_dict()
+
+    def refresh_ID_dict(self):
+        '''
+        Incrementally refreshes the ID dictionary
+
+        Every player of the season's summary report whose playerId is not in the index yet is
+        added. Prospects get their playerId years before they debut, so a new player can have
+        a lower playerId than players already in the index.
+
+        :return: number of players added
+        '''
+        known = self.ID_dict
+
+        try:
+            stats = self._fetch_pages('summary', 'playerId')
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+        known_ids = self._player_names
+        new_pairs = [(player_data.get('skaterFullName'), player_data.get('playerId')) for player_data in stats
+                     if player_data.get('playerId') is not None and int(player_data['playerId']) not in known_ids]
+        if new_pairs:
+            known.update(new_pairs)
+            self._add_player_names(new_pairs)
+            self._save_ID_dict()
+        return len(new_pairs)
+
+    def _add_player_names(self, pairs):
+        '''
+        Records the name of every playerId, ID_dict only keeps one player per name
+        '''
+        self._player_names.update((int(playerID), name) for name, playerID in pairs if playerID is not None)
+        self._name_index = None
+
+    def _load_ID_dict(self):
+        '''
+        Loads the ID dictionary from id_cache_path
+
+        :return: True if a usable index was loaded
+        '''
+        if not self.id_cache_path or not os.path.exists(self.id_cache_path):
+            return False
+        try:
+            with open(self.id_cache_path, encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        import requests
+
+        # An index built for another season is rebuilt, the current season is looked up if none was given
+        try:
+            season = self.season
+        except (NHLAPIError, requests.RequestException):
+            # Offline, the cached index is better than none
+            season = cached.get('season')
+        if cached.get('season') != season:
+            return False
+        self._ID_dict = cached['players']
+        # Indexes written before player names were kept only have the players of ID_dict
+        names = cached.get('names') or {playerID: name for name, playerID in self._ID_dict.items()}
+        self._player_names = {int(playerID): name for playerID, name in names.items()}
+        self._name_index = None
+        return True
+
+    def _save_ID_dict(self):
+        '''
+        Atomically writes the ID dictionary to id_cache_path
+        '''
+        if not self.id_cache_path:
+            return
+        directory = os.path.dirname(self.id_cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = self.id_cache_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'season': self._season, 'players': self._ID_dict, 'names': self._player_names}, f)
+        os.replace(tmp_path, self.id_cache_path)
+
+    def _request_json(self, url):
+        '''
+        Makes a GET request through the transport and decodes the JSON body
+
+        :param url: full url to request
+        :return: decoded JSON
+        :raises NHLAPIError: if the request was not successful
+        '''
+        response, elapsed = self._get(url)
+
+        if self.instrumentation is None:
+            # Check if the request was successful (status code 200)
+            if response.status_code != 200:
+                raise NHLAPIError(response.status_code, response.text, url)
+            return decode_json(response.content, self.fast_json)
+
+        endpoint = urlsplit(url).path
+        from_cache = getattr(response, 'from_cache', False)
+        if response.status_code != 200:
+            self.instrumentation.record_request(endpoint, url, response.status_code, elapsed,
+                                                len(response.content), from_cache=from_cache)
+            raise NHLAPIError(response.status_code, response.text, url)
+
+        started = time.perf_counter()
+        data = decode_json(response.content, self.fast_json)
+        decode_seconds = time.perf_counter() - started
+        self.instrumentation.record_request(endpoint, url, response.status_code, elapsed, len(response.content),
+                                            decode_seconds, from_cache)
+        return data
+
+    def _breaker(self, host):
+        with self._breakers_lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def _get(self, url):
+        '''
+        Makes a GET request under the rate limiter and circuit breaker, retrying throttled and failed attempts
+
+        Attempts failing with a RETRY_STATUSES status or a connection error are retried after the
+        server's Retry-After, or else a jittered exponential backoff. A 429 means the host is up
+        but throttling, so it neither counts against the circuit breaker nor uses up max_retries,
+        it is retried up to max_throttled_retries times instead.
+
+        :return: (response of the last attempt, seconds the last attempt took)
+        :raises CircuitOpenError: if the circuit of the url's host is open
+        :raises requests.RequestException: if the last attempt could not connect
+        '''
+        import requests
+
+        breaker = self._breaker(urlsplit(url).netloc) if self.circuit_breaker else None
+        attempt = throttled = 0
+        while True:
+            if breaker is not None:
+                retry_in = breaker.allow()
+                if retry_in:
+                    raise CircuitOpenError(urlsplit(url).netloc, retry_in)
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+            started = time.perf_counter()
+            try:
+                response = self.transport.get(url)
+                error = None
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response, error = None, e
+            elapsed = time.perf_counter() - started
+
+            if response is not None and response.status_code not in RETRY_STATUSES:
+                if breaker is not None:
+                    breaker.record_success()
+                return response, elapsed
+
+            if response is not None and response.status_code == 429:
+                if breaker is not None:
+                    breaker.record_success()
+                if throttled >= self.max_throttled_retries:
+                    return response, elapsed
+                delay = self._retry_delay(throttled, response)
+                throttled += 1
+            else:
+                if breaker is not None:
+                    breaker.record_failure()
+                if attempt >= self.max_retries:
+                    if error is not None:
+                        raise error
+                    return response, elapsed
+                delay = self._retry_delay(attempt, response)
+                attempt += 1
+
+            if self.instrumentation is not None:
+                status_code = response.status_code if response is not None else None
+                if response is not None:
+                    self.instrumentation.record_request(urlsplit(url).path, url, status_code, elapsed,
+                                                        len(response.content))
+                self.instrumentation.record_retry(urlsplit(url).path, url, status_code, delay)
+            time.sleep(delay)
+
+    def _retry_delay(self, attempt, response):
+        '''
+        :return: seconds to wait before the next attempt, the server's Retry-After if it sent one
+        '''
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(self.max_backoff, max(0.0, float(retry_after)))
+            except ValueError:
+                # An HTTP date rather than seconds, rare enough to import the parser here
+                from email.utils import parsedate_to_datetime
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    return min(self.max_backoff, max(0.0, retry_at.timestamp() - time.time()))
+                except (TypeError, ValueError):
+                    pass
+        # Full jitter keeps concurrent pages from retrying in lockstep
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _request_page(self, url):
+        '''
+        _request_json for a page of a report
+
+        Successful pages are kept until the whole report succeeds, so rerunning a report after
+        one of its pages failed only refetches the pages it is missing. Every caller gets its
+        own copy of the page's records, the schemas project them in place.
+        '''
+        now = time.monotonic()
+        with self._partial_pages_lock:
+            kept = self._partial_pages.get(url)
+            if kept is not None and now - kept[0] < PARTIAL_PAGE_TTL:
+                return self._copy_page(kept[1])
+        data = self._request_json(url)
+        with self._partial_pages_lock:
+            # Pages of reports that were never rerun are dropped once they expire
+            for expired in [key for key, (kept_at, _) in self._partial_pages.items()
+                            if now - kept_at >= PARTIAL_PAGE_TTL]:
+                del self._partial_pages[expired]
+            self._partial_pages[url] = (now, data)
+        return self._copy_page(data)
+
+    @staticmethod
+    def _copy_page(data):
+        return {**data, 'data': [dict(record) for record in data['data']]}
+
+    def _release_pages(self, urls):
+        with self._partial_pages_lock:
+            for url in urls:
+                self._partial_pages.pop(url, None)
+
+    def metrics(self):
+        '''
+        :return: Instrumentation snapshot, None if instrumentation is disabled
+        '''
+        return self.instrumentation.snapshot() if self.instrumentation is not None else None
+
+    def _page_url(self, report, sort, start, limit, cayenne):
+        return self.stats_url + f"/en/skater/{report}?limit={limit}&start={start}&sort={sort}&cayenneExp={cayenne}"
+
+    def fetch_page(self, report, sort, start=0, limit=100, season=None):
+        '''
+        Fetches a single raw page of a league report
+
+        :param report: stats REST report name, e.g. summary or timeonice
+        :param sort: field the report is sorted by
+        :param start: index of the first player of the page
+        :param limit: number of players per page
+        :param season: seasonId of the report, defaults to season
+        :return: decoded JSON, player records under 'data' and the number of players under 'total'
+        :raises NHLAPIError: if the request was not successful
+        '''
+        season = self.season if season is None else season
+        return self._request_json(self._page_url(report, sort, start, limit, f"seasonId={season}"))
+
+    def fetch_report(self, report, sort, cayenne=None):
+        '''
+        Fetches every raw player record of a league report
+
+        :param report: stats REST report name, e.g. summary or timeonice
+        :param sort: sort parameter of the report, a field or sort_by(*fields) to break ties
+        :param cayenne: cayenneExp filter of the report, e.g. 'seasonId>=20192020 and seasonId<=20232024',
+                        defaults to the players of season
+        :return: list of player records, in the order of sort
+        :raises NHLAPIError: if any page was not successful
+        '''
+        return self._fetch_pages(report, sort, cayenne)
+
+    def fetch_reports(self, reports, cayenne=None, concurrency=None):
+        '''
+        Fetches several league reports concurrently, see fetch_report
+
+        :param reports: list of (report, sort)
+        :param concurrency: number of reports fetched at the same time, defaults to report_workers
+        :return: list of the player records of each report, in the order of reports
+        :raises NHLAPIError: if any page of any report was not successful
+        '''
+        return self._run_concurrently([(self._fetch_pages, report, sort, cayenne) for report, sort in reports],
+                                      concurrency or self.report_workers)
+
+    def get(self, url):
+        '''
+        Makes a GET request with the wrapper's transport, rate limiter, circuit breaker and retries
+
+        :param url: full url to request
+        :return: response of the last attempt, whatever its status code
+        :raises CircuitOpenError: if the circuit of the url's host is open
+        :raises requests.RequestException: if the last attempt could not connect
+        '''
+        return self._get(url)[0]
+
+    def get_json(self, url):
+        '''
+        Same as get, but decodes the JSON body
+
+        :return: decoded JSON
+        :raises NHLAPIError: if the request was not successful
+        '''
+        return self._request_json(url)
+
+    def _fetch_pages(self, report, sort, cayenne=None):
+        '''
+        Fetches every page of a league report and reassembles them in order
+
+        In 'adaptive' pagination mode the number of pages is sized from the total returned
+        with the first page, in 'fixed' mode 8 pages of 100 are fetched.
+
+        :param report: stats REST report name, e.g. summary or timeonice
+        :param sort: field the report is sorted by
+        :param cayenne: cayenneExp filter of the report, defaults to the players of season
+        :return: list of player records across all pages, in page order
+        :raises NHLAPIError: if any page was not successful
+        '''
+        if cayenne is None:
+            cayenne = f"seasonId={self.season}"
+        if self.pagination == 'fixed':
+            return self._fetch_page_range(report, sort, cayenne, range(0, 800, 100), 100)
+        return self._fetch_adaptive(report, sort, cayenne)
+
+    def _fetch_adaptive(self, report, sort, cayenne):
+        '''
+        Fetches the first page at the largest page size, then only as many pages as the total requires
+
+        If the server returns fewer rows than asked for while more remain, that is the largest
+        page size it accepts and it is remembered for every later report.
+        '''
+        limit = self.page_size
+        first_url = self._page_url(report, sort, 0, limit, cayenne)
+        first = self._request_page(first_url)
+        stats = list(first['data'])
+        total = first.get('total')
+
+        # Stop as soon as the data is exhausted
+        if not stats or (total is not None and len(stats) >= total):
+            self._release_pages([first_url])
+            return stats
+        if len(stats) < limit:
+            if total is None:
+                self._release_pages([first_url])
+                return stats
+            # The server capped the page size
+            limit = self.page_size = len(stats)
+
+        if total is None:
+            # No total to size the fetch with, walk pages until one comes back short
+            start = len(stats)
+            while True:
+                page = self._request_json(self._page_url(report, sort, start, limit, cayenne))['data']
+                stats += page
+                if len(page) < limit:
+                    self._release_pages([first_url])
+                    return stats
+                start += limit
+
+        stats += self._fetch_page_range(report, sort, cayenne, range(len(stats), total, limit), limit)
+        self._release_pages([first_url])
+        return stats
+
+    def _fetch_page_range(self, report, sort, cayenne, starts, limit):
+        '''
+        Fetches the pages beginning at each of starts concurrently and reassembles them in order
+
+        :raises NHLAPIError: if any page was not successful, pages still queued are cancelled and
+                             the pages already fetched are kept for the next attempt
+        '''
+        urls = [self._page_url(report, sort, start, limit, cayenne) for start in starts]
+
+        stats = []
+        for data in self._run_concurrently([(self._request_page, url) for url in urls], self.page_workers):
+            stats += data['data']
+        self._release_pages(urls)
+        return stats
+
+    @staticmethod
+    def _run_concurrently(calls, max_workers):
+        '''
+        Runs independent calls on a bounded thread pool
+
+        :param calls: list of (function, *args) tuples
+        :param max_workers: maximum number of calls running at the same time
+        :return: list of the results, in the order of calls
+        :raises: the exception of the first failed call, calls still queued are cancelled
+        '''
+        if not calls:
+            return []
+        if max_workers <= 1 or len(calls) == 1:
+            return [call[0](*call[1:]) for call in calls]
+
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(calls)))
+        try:
+            futures = [executor.submit(*call) for call in calls]
+            return [future.result() for future in futures]
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def summaryreport(self):
+        '''
+        Returns dict of every NHL Player's summary report
+
+        PlayerID : {}
+
+        A, EVG, EVP, FOW%, GWG, GP, G, lastname, OTG, PIM, playerID, plusMinus,
+        P, P/GP, Pos, PPG, PPP, SeasonID, SHG, SHP, S/C, Shots, full name, team, TOI
+
+        Faceoff winPCT is dropped as it is part of the faceoff report
+        '''
+
+        return self._league_report('summaryreport')
+
+    def bioreport(self):
+        '''
+        Returns dict of every NHL Player's Bio report
+
+        PlayerID : {}
+
+        Where dict has the following stats:
+        A, birth city, birth country, birthdate, birth state/province code,
+        current team, draft overall, draft round, draft year, first season, games played,
+        G, height, in hall of fame, last name, nationality code, playerid, points
+
+        Following keys are popped as they are duplicated in the summary report:
+        Assists, goals, points, games played, lastname, playerid, team, in hall of fame
+
+        '''
+        return self._league_report('bioreport')
+
+
+    def faceoffpercentages(self):
+        '''
+        Returns dict of every NHL Player's faceoff percentages
+
+        PlayerID : {}
+
+        Where dict has the following stats:
+        D Zone FO%, D Zone FO total, evFO%, evFO total, FO%, GP, lastname, N Zone FO%, N Zone total,
+        O Zone FO%, O Zone FO Totals, playerID, position, PPFO%, PPFO total, SeasonID, Shoots/catches,
+        full name, team name, TOI, FO totals
+
+        Following keys are popped as they are duplicated in the summary report:
+        GP, lastname, playerID, position, seasonID, shoots/catches, name, team name, TOI
+
+        '''
+
+        return self._league_report('faceoffpercentages')
+
+    def faceoffwins(self):
+        '''
+        Returns dict of every NHL Player's faceoff totals
+
+        PlayerID : {}
+
+        Where dict has the following stats:
+        D zone faceoff losses, D zone faceoff wins, D zone faceoffs, evFaceoffs, evFaceoffs lost, evFaceoffs won,
+        faceoff win pct, N zone faceoffs, N zone faceoff wins, N zone faceoff losses, O zone faceoff wins, O zone faceoffs,
+        O Zine faceoff losses, ppFaceoffs, ppFaceoffsLost, ppFaceoffs won, shFaceoffs, shfaceoffs lost, shFaceoffs won,
+        total faceoffs, total faceoff wins, total faceoff losses
+
+        '''
+
+        return self._league_report('faceoffwins')
+
+    def miscreport(self):
+        '''
+        Returns dict of every NHL Player's miscellaneous stats
+
+        PlayerID : {}
+
+        Where dict has the following stats:
+        blocked shots, blocked shots per 60, empty net assists, empty net goals,
+        empty net points, first goals, giveaways, giveaways per 60, hits,
+        hits per 60, missed shot crossbar, missed shot goalpost, missed shot over net,
+        missed shot wide of not, missed shots, takeaways, takeaways per 60
+
+        '''
+
+        return self._league_report('miscreport')
+
+    def timeonice(self):
+        '''
+        Returns dict of every NHL Player's time on ice stats
+
+        PlayerID : {}
+
+        Where dict has the following stats:
+        evTOI, evTOI/G, otTOI, otTOI/G, ppTOI, ppTOI/G, shTOI, shTOI/G, shifts, shifts/G,
+        TOI, TOI/G, TOI/shift
+
+        '''
+
+        return self._league_report('timeonice')
+
+    def full_report(self, concurrency=None, output='dict'):
+        '''
+        Merges the six league reports into one record per player
+
+        The reports are fetched concurrently, so latency is bounded by the slowest one.
+
+        :param concurrency: number of reports fetched at the same time, defaults to report_workers
+        :param output: 'dict' for playerID : {stats}, 'dataframe' for a pandas DataFrame or 'arrow' for a
+                       pyarrow Table, the columnar outputs have one row per player and a playerId column
+        :return: the merged report, or [status_code, text] if any report failed
+        '''
+        if output not in ('dict', 'dataframe', 'arrow'):
+            raise ValueError(f"output must be 'dict', 'dataframe' or 'arrow', not {output!r}")
+
+        try:
+            pages = self.fetch_reports([LEAGUE_REPORTS[name][:2] for name in FULL_REPORT_ORDER],
+                                       concurrency=concurrency)
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+        return self._full_report_output(pages, output)
+
+    def _full_report_output(self, pages, output):
+        '''
+        Builds full_report in the requested output from the records of each report, in FULL_REPORT_ORDER
+        '''
+        started = time.perf_counter()
+        if output == 'dict':
+            reports = [self._player_dict(stats, LEAGUE_REPORTS[name][2])
+                       for name, stats in zip(FULL_REPORT_ORDER, pages)]
+            merged = self._merge_full_report(*reports)
+        else:
+            merged = self._full_report_frame(pages)
+        if self.instrumentation is not None:
+            self.instrumentation.record_postprocess('full_report', time.perf_counter() - started)
+
+        if output != 'arrow':
+            return merged
+        frame = merged
+
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("output='arrow' requires pyarrow, install it with 'pip install pyarrow'")
+        return pa.Table.from_pandas(frame, preserve_index=False)
+
+    @staticmethod
+    def _full_report_frame(pages):
+        '''
+        Columnar counterpart of _merge_full_report
+
+        Builds one DataFrame per report straight from the page payloads and left joins them
+        onto the summary on playerId. As with the dict output, a column present in several
+        reports takes the value of the later report wherever that report has one.
+
+        :param pages: player records of each report, in FULL_REPORT_ORDER
+        :return: DataFrame with one row per player of the summary report
+        '''
+        import pandas as pd
+
+        frames = []
+        for name, stats in zip(FULL_REPORT_ORDER, pages):
+            # A report without players still needs the playerId column the reports are joined on
+            frame = pd.DataFrame.from_records(stats) if stats else pd.DataFrame({'playerId': pd.Series(dtype='int64')})
+            frame = frame.drop(columns=LEAGUE_REPORTS[name][2].drop, errors='ignore')
+            frame['playerId'] = frame['playerId'].astype('int64')
+            frames.append(frame.drop_duplicates('playerId', keep='last'))
+
+        merged = frames[0]
+        for frame in frames[1:]:
+            overlap = [column for column in frame.columns if column in merged.columns and column != 'playerId']
+            merged = merged.merge(frame, on='playerId', how='left', suffixes=('', '__right'))
+            for column in overlap:
+                merged[column] = merged[column + '__right'].combine_first(merged[column])
+            merged = merged.drop(columns=[column + '__right' for column in overlap])
+
+        return merged.reset_index(drop=True)
+
+    def _iter_pages(self, report, sort, cayenne=None, limit=100):
+        '''
+        Yields a league report one page at a time, requesting the next page while the current one is consumed
+
+        Stops once the total the API reports is reached or a page comes back empty. Without a
+        total, a short page is the last one. Each page starts after the rows actually received,
+        so a server capping the page size below limit still yields every row.
+
+        :raises NHLAPIError: if a page was not successful
+        '''
+        if cayenne is None:
+            cayenne = f"seasonId={self.season}"
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            start = 0
+            future = executor.submit(self._request_json, self._page_url(report, sort, start, limit, cayenne))
+            while future is not None:
+                data = future.result()
+                page = data['data']
+                total = data.get('total')
+                start += len(page)
+
+                # Prefetch the next page before handing this one out
+                if total is not None:
+                    exhausted = not page or start >= total
+                else:
+                    exhausted = len(page) < limit
+                future = None if exhausted else executor.submit(
+                    self._request_json, self._page_url(report, sort, start, limit, cayenne))
+
+                yield page
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _iter_league_report(self, name, sort=None, page_size=100):
+        '''
+        Yields (playerID, {stats}) pairs of one of the LEAGUE_REPORTS, page by page
+
+        :param name: report method name, key of LEAGUE_REPORTS
+        :param sort: field to sort by instead of the report's own
+        :param page_size: players per page, at most two pages are held at a time
+        '''
+        report, default_sort, schema = LEAGUE_REPORTS[name]
+        for page in self._iter_pages(report, sort or default_sort, limit=page_size):
+            yield from self._player_dict(page, schema).items()
+
+    def iter_summaryreport(self, page_size=100):
+        '''
+        Streaming variant of summaryreport, yields (playerID, {stats}) pairs page by page
+
+        :raises NHLAPIError: if a page was not successful
+        '''
+        return self._iter_league_report('summaryreport', page_size=page_size)
+
+    def iter_bioreport(self, page_size=100):
+        '''
+        Streaming variant of bioreport, yields (playerID, {stats}) pairs page by page
+
+        :raises NHLAPIError: if a page was not successful
+        '''
+        return self._iter_league_report('bioreport', page_size=page_size)
+
+    def iter_faceoffpercentages(self, page_size=100):
+        '''
+        Streaming variant of faceoffpercentages, yields (playerID, {stats}) pairs page by page
+
+        :raises NHLAPIError: if a page was not successful
+        '''
+        return self._iter_league_report('faceoffpercentages', page_size=page_size)
+
+    def iter_faceoffwins(self, page_size=100):
+        '''
+        Streaming variant of faceoffwins, yields (playerID, {stats}) pairs page by page
+
+        :raises NHLAPIError: if a page was not successful
+        '''
+        return self._iter_league_report('faceoffwins', page_size=page_size)
+
+    def iter_miscreport(self, page_size=100):
+        '''
+        Streaming variant of miscreport, yields (playerID, {stats}) pairs page by page
+
+        :raises NHLAPIError: if a page was not successful
+        '''
+        return self._iter_league_report('miscreport', page_size=page_size)
+
+    def iter_timeonice(self, page_size=100):
+        '''
+        Streaming variant of timeonice, yields (playerID, {stats}) pairs page by page
+
+        :raises NHLAPIError: if a page was not successful
+        '''
+        return self._iter_league_report('timeonice', page_size=page_size)
+
+    def iter_full_report(self, page_size=100):
+        '''
+        Streaming variant of full_report, yields (playerID, {stats}) pairs in playerId order
+
+        All six reports are streamed sorted by playerId and merge joined, so only the current
+        and prefetched page of each report are held in memory whatever the number of players.
+
+        :param page_size: players per page of each report
+        :raises NHLAPIError: if a page was not successful
+        '''
+        streams = [self._iter_league_report(name, sort='playerId', page_size=page_size)
+                   for name in FULL_REPORT_ORDER]
+        summary_stream, other_streams = streams[0], streams[1:]
+        try:
+            heads = [next(stream, None) for stream in other_streams]
+            for playerID, player in summary_stream:
+                for i, stream in enumerate(other_streams):
+                    # Skip players the summary report does not have
+                    while heads[i] is not None and heads[i][0] < playerID:
+                        heads[i] = next(stream, None)
+                    if heads[i] is not None and heads[i][0] == playerID:
+                        player.update(heads[i][1])
+                        heads[i] = next(stream, None)
+                yield playerID, player
+        finally:
+            for stream in streams:
+                stream.close()
+
+    def _league_report(self, name):
+        '''
+        Fetches every page of one of the LEAGUE_REPORTS and keys it by playerId
+
+        :param name: report method name, key of LEAGUE_REPORTS
+        :return: dict of playerID : {stats}, or [status_code, text] if any page failed
+        '''
+        report, sort, schema = LEAGUE_REPORTS[name]
+        try:
+            stats = self._fetch_pages(report, sort)
+        except NHLAPIError as e:
+            # Fail the whole report if any page was not successful
+            return [e.status_code, e.text]
+
+        started = time.perf_counter()
+        player_dict = self._player_dict(stats, schema)
+        if self.instrumentation is not None:
+            self.instrumentation.record_postprocess(name, time.perf_counter() - started)
+        return player_dict
+
+    @staticmethod
+    def _player_dict(stats, schema):
+        '''
+        Keys a list of player records by playerId, projected through the report's schema
+
+        :param stats: list of player records from a league report
+        :param schema: ReportSchema of the report, keyed by playerId
+        :return: dict of playerID : {stats}
+        '''
+        return {int(playerID): player for playerID, player in schema.keyed(stats)}
+
+    @staticmethod
+    def _merge_full_report(summary, misc, bio, TOI, FO_percent, FO_wins):
+        player_dict = {}
+        for key in summary.keys():
+            # Combine values under the same key from all dictionaries
+            player_dict[key] = {
+                **summary.get(key, {}),
+                **misc.get(key, {}),
+                **bio.get(key, {}),
+                **TOI.get(key, {}),
+                **FO_percent.get(key, {}),
+                **FO_wins.get(key, {})
+            }
+        return player_dict
+
+    def _skater_stats(self, report, sort, skaterID):
+        '''
+        Retrieves every row of a per-skater report
+
+        :return: list of rows
+        :raises NHLAPIError: if the request was not successful
+        '''
+        url = self.stats_url + f"/en/skater/{report}?sort={sort}&cayenneExp=playerId={skaterID}"
+        return self._request_json(url)['data']
+
+    def skater_summary(self, skaterID):
+        '''
+
+        Retrieve summary report for a player for each season he played
+
+        :param skaterID: playerID of the player to get reports from
+        :return: list of dict where each dict is a season's summary report for the player
+        '''
+        try:
+            stats = self._skater_stats('summary', 'seasonId', skaterID)
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+        return self._season_list(stats, SKATER_SUMMARY_SCHEMA)
+
+    def skater_bio(self, skaterID):
+        '''
+
+        Retrieve bio report for a player for each season he played
+
+        :param skaterID: playerID of the player to get report from
+        :return: dict of the player's bio information
+        '''
+        try:
+            stats = self._skater_stats('bios', 'height', skaterID)
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+        return self._bio_dict(stats[0])
+
+    def skater_FO_percent(self, skaterID):
+        '''
+
+        Retrieve Faceoff percent report for a player for each season he played
+
+        :param skaterID: playerID of the player to get reports from
+        :return: list of dict where each dict is a season's faceoff percent report for the player
+        '''
+        try:
+            stats = self._skater_stats('faceoffpercentages', 'seasonId', skaterID)
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+        return self._season_list(stats)
+
+    def skater_FO_wins(self, skaterID):
+        '''
+
+        Retrieve Faceoff win report for a player for each season he played
+
+        :param skaterID: playerID of the player to get reports from
+        :return: list of dict where each dict is a season's faceoff win report for the player
+        '''
+        try:
+            stats = self._skater_stats('faceoffwins', 'seasonId', skaterID)
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+        return self._season_list(stats)
+
+    def skater_misc(self, skaterID):
+        '''
+
+        Retrieve miscellaneous percent report for a player for each season he played
+
+        :param skaterID: playerID of the player to get reports from
+        :return: list of dict where each dict is a season's miscellaneous report for the player
+        '''
+        try:
+            stats = self._skater_stats('realtime', 'seasonId', skaterID)
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+        return self._season_list(stats)
+
+    def skater_TOI(self, skaterID):
+        '''
+
+        Retrieve time on ice percent report for a player for each season he played
+
+        :param skaterID: playerID of the player to get reports from
+        :return: list of dict where each dict is a season's time on ice report for the player
+        '''
+        try:
+            stats = self._skater_stats('timeonice', 'seasonId', skaterID)
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+        return self._season_list(stats)
+
+    @staticmethod
+    def _season_list(stats, schema=SKATER_SEASON_SCHEMA):
+        '''
+        Splits a per-skater report into one {seasonId: {stats}} dict per season
+
+        :param stats: rows of a per-skater report
+        :param schema: ReportSchema keyed by seasonId the rows are projected through
+        '''
+        return [{seasonId: season} for seasonId, season in schema.keyed(stats)]
+
+    @staticmethod
+    def _bio_dict(stats):
+        '''
+        Renames and reorders a skater's bio row, see SKATER_BIO_SCHEMA
+        '''
+        return SKATER_BIO_SCHEMA.project(stats)
+
+    def skater_full_report(self, skaterID, concurrency=None):
+        '''
+        performs a full report on the skater from the following NHL.com reports: summary, bio,
+        faceoff wins and percentages, miscellaneous and time on ice
+        :param skaterID: unique identifier for a specific skater
+        :param concurrency: number of reports fetched at the same time, defaults to report_workers
+        :return: full report separated by season in a JSON
+        '''
+        try:
+            summary, bio, FO_P, FO_W, misc, TOI = self._run_concurrently(
+                [(self._skater_stats, report, sort, skaterID) for report, sort in SKATER_REPORTS],
+                concurrency or self.report_workers)
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+        started = time.perf_counter()
+        merged = self._merge_skater_report(
+            self._season_list(summary, SKATER_SUMMARY_SCHEMA),
+            self._bio_dict(bio[0]),
+            self._season_list(FO_P),
+            self._season_list(FO_W),
+            self._season_list(misc),
+            self._season_list(TOI))
+        if self.instrumentation is not None:
+            self.instrumentation.record_postprocess('skater_full_report', time.perf_counter() - started)
+        return merged
+
+    @staticmethod
+    def _merge_skater_report(summary, bio, FO_P, FO_W, misc, TOI):
+        # Combine reports into a list
+        reports = [summary, FO_P, FO_W, misc, TOI]
+
+        # Create a dictionary to store merged data based on season
+        merged_data_dict = {}
+
+        # Iterate through each report
+        for report in reports:
+            for season_data in report:
+                season_key, season_stats = next(iter(season_data.items()))
+
+                # If the season is already in the merged_data_dict, update it; otherwise, add a new entry
+                if season_key in merged_data_dict:
+                    merged_data_dict[season_key].update(season_stats)
+                else:
+                    merged_data_dict[season_key] = season_stats
+
+        # Convert the merged_data_dict into a list of dictionaries
+        merged_data = [{"Season": season, **stats} for season, stats in merged_data_dict.items()]
+
+        for season in merged_data:
+            season.update(bio)
+
+        return merged_data
+
+    def skaters_full_report(self, skaterIDs, batch_size=50, concurrency=None):
+        '''
+        Full report for many skaters, see skater_full_report
+
+        Puts batch_size player IDs into a single cayenneExp filter per endpoint and splits the
+        combined rows back out per player and season, so the number of requests grows with the
+        number of endpoints instead of the number of players.
+
+        :param skaterIDs: iterable of unique identifiers of skaters
+        :param batch_size: number of player IDs per request
+        :param concurrency: number of endpoints fetched at the same time, defaults to report_workers
+        :return: dict of playerID : full report separated by season,
+                 or [status_code, text] if any request was not successful
+        '''
+        skaterIDs = list(dict.fromkeys(int(skaterID) for skaterID in skaterIDs))
+
+        try:
+            results = self._run_concurrently(
+                [(self._batched_rows, report, sort, skaterIDs, batch_size) for report, sort in SKATER_REPORTS],
+                concurrency or self.report_workers)
+        except NHLAPIError as e:
+            return [e.status_code, e.text]
+
+        rows = {report: result for (report, sort), result in zip(SKATER_REPORTS, results)}
+
+        started = time.perf_counter()
+        final = self._split_skater_rows(skaterIDs, rows)
+        if self.instrumentation is not None:
+            self.instrumentation.record_postprocess('skaters_full_report', time.perf_counter() - started)
+        return final
+
+    def _batched_rows(self, report, sort, skaterIDs, batch_size):
+        '''
+        Fetches a per-skater report for many players, batch_size players per cayenneExp filter
+
+        :return: dict of playerID : list of rows in the order the API returned them
+        :raises NHLAPIError: if any request was not successful
+        '''
+        by_player = {}
+        # The sort field repeats across the players of a batch, playerId makes the order unique so that
+        # pages fetched concurrently neither skip nor repeat rows
+        sort = sort_by(sort, 'playerId')
+        for i in range(0, len(skaterIDs), batch_size):
+            batch = ','.join(str(skaterID) for skaterID in skaterIDs[i:i + batch_size])
+            for row in self._fetch_adaptive(report, sort, f"playerId in ({batch})"):
+                by_player.setdefault(int(row['playerId']), []).append(row)
+        return by_player
+
+    @classmethod
+    def _split_skater_rows(cls, skaterIDs, rows):
+        '''
+        Builds each player's full report from the rows of the SKATER_REPORTS keyed by playerId
+        '''
+        final = {}
+        for skaterID in skaterIDs:
+            bio_rows = rows['bios'].get(skaterID)
+            if not bio_rows:
+                final[skaterID] = []
+                continue
+
+            final[skaterID] = cls._merge_skater_report(
+                cls._season_list(rows['summary'].get(skaterID, []), SKATER_SUMMARY_SCHEMA),
+                cls._bio_dict(bio_rows[0]),
+                cls._season_list(rows['faceoffpercentages'].get(skaterID, [])),
+                cls._season_list(rows['faceoffwins'].get(skaterID, [])),
+                cls._season_list(rows['realtime'].get(skaterID, [])),
+                cls._season_list(rows['timeonice'].get(skaterID, [])))
+        return final
+
+    def skater_report_csv(self, skater_report):
+        '''
+        Takes the report written by self.skater_full_report and writes it to csv
+
+        :param skater_report: report written by skater_full_report
+        :return: True if success
+        '''
+
+        import pandas as pd
+
+        top_season = skater_report[0]
+        name = top_season['skaterFullName']
+
+        df = pd.DataFrame(skater_report)
+
+        # Writing to Excel (xlsx)
+        xlsx_file_path = f"{name} full report.xlsx"
+        df.to_excel(xlsx_file_path, index=False)
+        print(f"Excel file '{xlsx_file_path}' has been created.")
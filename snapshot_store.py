@@ -0,0 +1,356 @@
+'''
+Persistent snapshot of the league-wide skater reports, refreshed in place
+
+Every report of a season is split into a fixed number of buckets by playerId and each
+bucket is stored as its own Parquet file together with a hash of every row. A refresh
+downloads the reports, hashes the new rows and rewrites only the buckets in which at
+least one player was added, removed or had a stat change. Every change is appended to
+a changelog, so downstream consumers can read the diffs since the last version they
+processed instead of the whole snapshot.
+
+A refresh is written ahead: the new buckets are staged next to the old ones, the changes
+are appended to the changelog, and the manifest records the pending version before any
+bucket is replaced. A refresh interrupted after that point is finished when the store is
+next opened, one interrupted before it is discarded along with its changelog lines.
+
+Layout of root:
+    manifest.json                                  version, digest of every bucket and any pending refresh
+    changelog.jsonl                                one line per changed player and report
+    {season}/{report}/bucket-{bucket:03d}.parquet  player records of one bucket, sorted by playerId
+
+usage: python snapshot_store.py --root snapshots/ [--season 20232024]
+'''
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import threading
+
+# stats REST skater reports kept in the snapshot and the field their pages are sorted by
+REPORTS = [('summary', 'playerId'), ('bios', 'playerId'), ('faceoffpercentages', 'playerId'),
+           ('faceoffwins', 'playerId'), ('realtime', 'playerId'), ('timeonice', 'playerId')]
+
+# column holding the hash of each row in the bucket files
+HASH_COLUMN = '_row_hash'
+
+
+def row_hash(row):
+    '''
+    :param row: player record as decoded from the API
+    :return: hex digest of the record, independent of key order
+    '''
+    encoded = json.dumps(row, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+def bucket_digest(hashes):
+    '''
+    :param hashes: dict of playerId : row hash of one bucket
+    :return: hex digest of the whole bucket, equal for two buckets with the same rows
+    '''
+    digest = hashlib.blake2b(digest_size=16)
+    for playerID in sorted(hashes):
+        digest.update(f"{playerID}:{hashes[playerID]};".encode('ascii'))
+    return digest.hexdigest()
+
+
+class SnapshotStore:
+    def __init__(self, root, buckets=16, reports=None):
+        '''
+        :param root: directory the snapshot, its manifest and its changelog are kept in
+        :param buckets: number of files each report of a season is split into, a refresh rewrites
+                        only the buckets with a changed player. Fixed once the store is created
+        :param reports: list of (stats REST report, sort field), defaults to REPORTS
+        '''
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError("SnapshotStore requires pyarrow, install it with 'pip install pyarrow'")
+
+        self.root = root
+        self.reports = list(reports or REPORTS)
+        self.manifest_path = os.path.join(root, 'manifest.json')
+        self.changelog_path = os.path.join(root, 'changelog.jsonl')
+        self._lock = threading.Lock()
+
+        os.makedirs(root, exist_ok=True)
+        self.manifest = self._load_manifest()
+        self.buckets = self.manifest.setdefault('buckets', buckets)
+        self._recover()
+
+    @property
+    def version(self):
+        '''
+        Version of the snapshot, increased by every refresh that changed anything
+        '''
+        return self.manifest.get('version', 0)
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _recover(self):
+        '''
+        Finishes a refresh that was interrupted after it was committed, or drops the changelog lines of one
+        that was interrupted before
+        '''
+        if 'pending' in self.manifest:
+            self._finish(self.manifest['pending'])
+            return
+        size = self.manifest.get('changelog_bytes')
+        if size is None and not self.version:
+            # Before the first refresh is committed none of the changelog belongs to a version
+            size = 0
+        if size is not None and os.path.exists(self.changelog_path) and os.path.getsize(self.changelog_path) > size:
+            with open(self.changelog_path, 'r+b') as f:
+                f.truncate(size)
+
+    def _finish(self, pending):
+        '''
+        Replaces the buckets of a committed refresh with their staged files and publishes its version
+
+        Safe to repeat, a bucket already replaced has no staged file left.
+        '''
+        seasons = self.manifest.setdefault('seasons', {})
+        for season, report, bucket, digest in pending['buckets']:
+            path = self.bucket_path(season, report, bucket)
+            digests = seasons.setdefault(str(season), {}).setdefault(report, {})
+            if digest is None:
+                for stale in (path, path + '.tmp'):
+                    if os.path.exists(stale):
+                        os.remove(stale)
+                digests.pop(str(bucket), None)
+            else:
+                if os.path.exists(path + '.tmp'):
+                    os.replace(path + '.tmp', path)
+                digests[str(bucket)] = digest
+        self.manifest['version'] = pending['version']
+        self.manifest.setdefault('refreshed_at', {})[str(pending['season'])] = pending['refreshed_at']
+        self.manifest['changelog_bytes'] = pending['changelog_bytes']
+        del self.manifest['pending']
+        self._save_manifest()
+
+    def bucket_path(self, season, report, bucket):
+        return os.path.join(self.root, str(season), report, f"bucket-{bucket:03d}.parquet")
+
+    def bucket_of(self, playerID):
+        return int(playerID) % self.buckets
+
+    def refresh(self, wrapper, season=None):
+        '''
+        Downloads every report of a season and applies the differences to the snapshot
+
+        :param wrapper: NHLAPIWrapper the reports are fetched with
+        :param season: seasonId to refresh, defaults to the wrapper's season
+        :return: dict with the new version and the number of players added, changed and removed
+                 and of buckets rewritten
+        :raises NHLAPIError: if any page of any report was not successful, the snapshot is left unchanged
+        '''
+        season = wrapper.season if season is None else season
+        pages = wrapper.fetch_reports(self.reports, cayenne=f"seasonId={season}")
+        return self.apply(season, {report: rows for (report, _), rows in zip(self.reports, pages)})
+
+    def apply(self, season, reports):
+        '''
+        Applies freshly downloaded reports of a season to the snapshot
+
+        :param season: seasonId the reports cover
+        :param reports: dict of report : list of player records
+        :return: same as refresh
+        '''
+        with self._lock:
+            version = self.version + 1
+            refreshed_at = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+            result = {'version': self.version, 'added': 0, 'changed': 0, 'removed': 0, 'buckets_written': 0}
+            changes = []
+            # (season, report, bucket, digest) of every bucket staged, digest None for a bucket left empty
+            staged = []
+
+            seasons = self.manifest.get('seasons', {})
+            for report, rows in reports.items():
+                digests = seasons.get(str(season), {}).get(report, {})
+
+                new_buckets = [{} for _ in range(self.buckets)]
+                for row in rows:
+                    playerID = int(row['playerId'])
+                    new_buckets[self.bucket_of(playerID)][playerID] = row
+
+                for bucket, new_rows in enumerate(new_buckets):
+                    hashes = {playerID: row_hash(row) for playerID, row in new_rows.items()}
+                    digest = bucket_digest(hashes) if hashes else None
+                    # Unchanged buckets are skipped without being read
+                    if digest == digests.get(str(bucket)):
+                        continue
+
+                    old_rows, old_hashes = self._read_bucket(season, report, bucket)
+                    for playerID in sorted(set(new_rows) | set(old_rows)):
+                        if playerID not in old_rows:
+                            kind, fields = 'added', {key: [None, value] for key, value in new_rows[playerID].items()}
+                        elif playerID not in new_rows:
+                            kind, fields = 'removed', {}
+                        elif hashes[playerID] != old_hashes.get(playerID):
+                            kind, fields = 'changed', self._changed_fields(old_rows[playerID], new_rows[playerID])
+                            if not fields:
+                                continue
+                        else:
+                            continue
+                        result[kind] += 1
+                        changes.append({'version': version, 'refreshed_at': refreshed_at, 'season': season,
+                                        'report': report, 'playerId': playerID, 'change': kind, 'fields': fields})
+
+                    self._stage_bucket(season, report, bucket, new_rows, hashes)
+                    staged.append([season, report, bucket, digest])
+
+            if not staged:
+                return result
+            if changes:
+                with open(self.changelog_path, 'a', encoding='utf-8') as f:
+                    for change in changes:
+                        f.write(json.dumps(change, default=str) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+                result['version'] = version
+            changelog_bytes = os.path.getsize(self.changelog_path) if os.path.exists(self.changelog_path) else 0
+
+            # The commit point: from here on the refresh is finished by _recover if interrupted
+            self.manifest['pending'] = {'version': result['version'], 'season': season, 'refreshed_at': refreshed_at,
+                                        'changelog_bytes': changelog_bytes, 'buckets': staged}
+            self._save_manifest()
+            self._finish(self.manifest['pending'])
+            result['buckets_written'] = len(staged)
+        return result
+
+    @staticmethod
+    def _changed_fields(old, new):
+        '''
+        :return: dict of field : [old value, new value] of every field that differs
+        '''
+        fields = {}
+        for key in set(old) | set(new):
+            if key == HASH_COLUMN:
+                continue
+            old_value, new_value = old.get(key), new.get(key)
+            if old_value != new_value:
+                fields[key] = [old_value, new_value]
+        return fields
+
+    def _read_bucket(self, season, report, bucket):
+        '''
+        :return: dict of playerId : record and dict of playerId : row hash of a stored bucket
+        '''
+        import pyarrow.parquet as pq
+
+        path = self.bucket_path(season, report, bucket)
+        if not os.path.exists(path):
+            return {}, {}
+        rows, hashes = {}, {}
+        for row in pq.read_table(path).to_pylist():
+            playerID = int(row['playerId'])
+            hashes[playerID] = row.pop(HASH_COLUMN)
+            rows[playerID] = row
+        return rows, hashes
+
+    def _stage_bucket(self, season, report, bucket, rows, hashes):
+        '''
+        Writes the new rows of a bucket next to its file, _finish replaces the file with it
+        '''
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not rows:
+            return
+        path = self.bucket_path(season, report, bucket)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        records = [{**rows[playerID], HASH_COLUMN: hashes[playerID]} for playerID in sorted(rows)]
+        # Every column of any record, from_pylist would only keep the ones of the first
+        columns = dict.fromkeys(name for record in records for name in record)
+        pq.write_table(pa.Table.from_pydict({name: [record.get(name) for record in records] for name in columns}),
+                       path + '.tmp')
+
+    def read(self, season, report, columns=None):
+        '''
+        :param season: seasonId of the report
+        :param report: stats REST report name, e.g. summary
+        :param columns: columns to read, None for all of them
+        :return: pyarrow Table of the report, one row per player sorted by bucket then playerId
+        '''
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        tables = []
+        for bucket in range(self.buckets):
+            path = self.bucket_path(season, report, bucket)
+            if os.path.exists(path):
+                table = pq.read_table(path, columns=columns)
+                if columns is None:
+                    table = table.drop_columns([HASH_COLUMN])
+                tables.append(table)
+        if not tables:
+            return pa.table({})
+        return pa.concat_tables(tables, promote_options='permissive')
+
+    def players(self, season, report):
+        '''
+        :return: dict of playerID : {stats} of a stored report, in the shape of the league report methods
+        '''
+        return {int(row['playerId']): row for row in self.read(season, report).to_pylist()}
+
+    def changes(self, since_version=0, season=None, report=None):
+        '''
+        Yields the changelog entries newer than since_version, oldest first
+
+        Every entry holds the version, season, report and playerId it applies to, the kind of
+        change ('added', 'changed' or 'removed') and under 'fields' the [old, new] value of
+        every field that differs.
+
+        :param since_version: last version the caller has processed, 0 for the whole history
+        :param season: only yield changes of this seasonId
+        :param report: only yield changes of this report
+        '''
+        if not os.path.exists(self.changelog_path):
+            return
+        with open(self.changelog_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    change = json.loads(line)
+                except ValueError:
+                    # A line cut short by an interrupted refresh, its version was never published
+                    continue
+                if change['version'] <= since_version or change['version'] > self.version:
+                    continue
+                if season is not None and change['season'] != season:
+                    continue
+                if report is not None and change['report'] != report:
+                    continue
+                yield change
+
+
+def main():
+    from nhl_api import NHLAPIWrapper
+
+    parser = argparse.ArgumentParser(description='Refresh the snapshot of the league-wide skater reports')
+    parser.add_argument('--root', required=True, help='directory of the snapshot')
+    parser.add_argument('--season', type=int, default=None, help='seasonId to refresh, defaults to the current one')
+    parser.add_argument('--buckets', type=int, default=16, help='files per report, only used by a new snapshot')
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.root, buckets=args.buckets)
+    with NHLAPIWrapper(id_cache_path=None) as wrapper:
+        result = store.refresh(wrapper, season=args.season)
+
+    print(f"version {result['version']}: {result['added']} added, {result['changed']} changed, "
+          f"{result['removed']} removed, {result['buckets_written']} of "
+          f"{store.buckets * len(store.reports)} buckets rewritten")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+from backfill import Backfill
+
+
+class CappedWrapper:
+    '''
+    Serves fetch_page of players rows sorted by playerId, never more than max_limit per page
+    '''
+
+    def __init__(self, players, max_limit=100):
+        self.players = players
+        self.max_limit = max_limit
+
+    def fetch_page(self, report, sort, start=0, limit=100, season=None):
+        limit = min(limit, self.max_limit)
+        return {'data': [{'playerId': i} for i in range(start, min(start + limit, self.players))],
+                'total': self.players}
+
+
+def test_page_size_above_the_server_cap_skips_no_player(tmp_path):
+    backfill = Backfill(CappedWrapper(900), [20232024], str(tmp_path), reports=['summary'], page_size=500)
+    result = backfill.run()
+    assert result['failed'] == [] and result['completed'] == 9
+    assert [row['playerId'] for row in backfill.iter_season(20232024, 'summary')] == list(range(900))
+
+    # Resuming finds nothing missing
+    assert Backfill(CappedWrapper(900), [20232024], str(tmp_path), reports=['summary'], page_size=500).run() == \
+        {'completed': 0, 'failed': [], 'remaining': 0, 'requests': 0}
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from nhl_api import NHLAPIWrapper, FULL_REPORT_ORDER
+
+
+class Response:
+    def __init__(self, payload):
+        self.status_code = 200
+        self.content = json.dumps(payload).encode('utf-8')
+        self.text = self.content.decode('utf-8')
+        self.headers = {}
+
+
+class EmptySeasonTransport:
+    '''
+    Answers every league report page as a season without players, e.g. 19001901
+    '''
+
+    def get(self, url, **kwargs):
+        return Response({'data': [], 'total': 0})
+
+
+@pytest.fixture
+def wrapper():
+    return NHLAPIWrapper(transport=EmptySeasonTransport(), id_cache_path=None, season=19001901)
+
+
+def test_full_report_frame_of_empty_reports():
+    frame = NHLAPIWrapper._full_report_frame([[] for _ in FULL_REPORT_ORDER])
+    assert frame.empty
+    assert list(frame.columns) == ['playerId']
+    assert frame['playerId'].dtype == 'int64'
+
+
+def test_full_report_of_empty_season(wrapper):
+    assert wrapper.full_report() == {}
+    frame = wrapper.full_report(output='dataframe')
+    assert frame.empty
+    assert 'playerId' in frame.columns
@@ -0,0 +1,35 @@
+import json
+from urllib.parse import urlsplit
+
+from nhl_api import NHLAPIWrapper
+
+
+class Response:
+    def __init__(self, payload):
+        self.status_code = 200
+        self.content = json.dumps(payload).encode('utf-8')
+        self.text = self.content.decode('utf-8')
+        self.headers = {}
+
+
+class SeasonTransport:
+    '''
+    Serves /v1/season up to 20232024 and a summary report of one player of that season
+    '''
+
+    def get(self, url, **kwargs):
+        if urlsplit(url).path.endswith('/v1/season'):
+            return Response([20222023, 20232024])
+        return Response({'data': [{'playerId': 8484000, 'skaterFullName': 'New Player'}], 'total': 1})
+
+
+def test_index_cached_for_a_past_season_is_rebuilt(tmp_path):
+    path = tmp_path / 'id_dict.json'
+    path.write_text(json.dumps({'season': 20222023, 'players': {'Old Player': 8470000}}))
+
+    wrapper = NHLAPIWrapper(transport=SeasonTransport(), id_cache_path=str(path))
+    assert wrapper.ID_dict == {'New Player': 8484000}
+    assert json.loads(path.read_text())['season'] == 20232024
+
+    # Cached for the current season, loaded as is
+    assert NHLAPIWrapper(transport=SeasonTransport(), id_cache_path=str(path)).ID_dict == {'New Player': 8484000}
@@ -0,0 +1,31 @@
+import pandas as pd
+
+from injuries_pipeline import InjuryPipeline, season_years
+
+
+def test_season_years_of_regular_seasons_only():
+    # Nothing to mark missing, the years used to parse to int64 and could not take NaN
+    years = season_years(pd.Series(['2019-20', '2020-21']))
+    assert years.tolist() == [2019.0, 2020.0]
+
+
+def test_season_years_marks_playoffs_unparseable_and_missing_seasons():
+    years = season_years(pd.Series(['2019-20', '2019-20 (playoffs)', 'unknown', None]))
+    assert years.iloc[0] == 2019
+    assert years.iloc[1:].isna().all()
+
+
+def test_run_with_chunks_without_playoffs(tmp_path):
+    export = pd.DataFrame({'Player': ['McDavid, Connor', 'Matthews, Auston', 'McDavid, Connor', 'Crosby, Sidney'],
+                           'Season': ['2019-20', '2020-21', '2019-20', '2020-21 (playoffs)'],
+                           'Games Missed': [3, 5, 2, 4]})
+    path = tmp_path / 'injuries.csv'
+    export.to_csv(path, sep='\t', encoding='utf-16', index=False)
+
+    pipeline = InjuryPipeline(f"sqlite:///{tmp_path / 'injuries.sqlite'}", chunksize=2, seasons=None)
+    result = pipeline.run(path)
+
+    frame = result['frame'].sort_values('Player').reset_index(drop=True)
+    assert frame.to_dict('records') == [{'Player': 'Auston Matthews', 'Season': '2020', 'Games Missed': 5},
+                                        {'Player': 'Connor McDavid', 'Season': '2019', 'Games Missed': 5}]
+    assert result['upserted'] == 2
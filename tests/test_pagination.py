@@ -0,0 +1,36 @@
+import json
+from urllib.parse import parse_qs, urlsplit
+
+from nhl_api import NHLAPIWrapper
+
+
+class Response:
+    def __init__(self, payload):
+        self.status_code = 200
+        self.content = json.dumps(payload).encode('utf-8')
+        self.text = self.content.decode('utf-8')
+        self.headers = {}
+
+
+class CappedTransport:
+    '''
+    Serves players league report rows, never more than max_limit per page like the real API
+    '''
+
+    def __init__(self, players, max_limit=100):
+        self.players = players
+        self.max_limit = max_limit
+
+    def get(self, url, **kwargs):
+        query = parse_qs(urlsplit(url).query)
+        start = int(query['start'][0])
+        limit = min(int(query['limit'][0]), self.max_limit)
+        rows = [{'playerId': 8470000 + i, 'skaterFullName': f"Player {i}", 'goals': i}
+                for i in range(start, min(start + limit, self.players))]
+        return Response({'data': rows, 'total': self.players})
+
+
+def test_iter_summaryreport_past_the_page_size_cap():
+    wrapper = NHLAPIWrapper(transport=CappedTransport(900), id_cache_path=None, season=20232024)
+    players = [playerID for playerID, stats in wrapper.iter_summaryreport(page_size=500)]
+    assert players == [8470000 + i for i in range(900)]
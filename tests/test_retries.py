@@ -0,0 +1,31 @@
+from nhl_api import NHLAPIWrapper
+
+
+class Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.content = b'Too Many Requests'
+        self.text = self.content.decode('utf-8')
+        self.headers = headers or {}
+
+
+class ThrottlingTransport:
+    '''
+    Answers every request with 429 Retry-After: 0
+    '''
+
+    def __init__(self):
+        self.requests = 0
+
+    def get(self, url, **kwargs):
+        self.requests += 1
+        return Response(429, {'Retry-After': '0'})
+
+
+def test_always_throttled_request_gives_up():
+    transport = ThrottlingTransport()
+    wrapper = NHLAPIWrapper(transport=transport, id_cache_path=None, max_throttled_retries=4)
+    assert wrapper.get_current_season() == [429, 'Too Many Requests']
+    assert transport.requests == 5
+    # Throttling says nothing about the health of the host
+    assert wrapper._breaker('api-web.nhle.com').state == 'closed'
@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+import snapshot_store
+from snapshot_store import SnapshotStore
+
+
+def rows(goals):
+    return [{'playerId': playerID, 'goals': value} for playerID, value in goals.items()]
+
+
+def test_refresh_interrupted_while_replacing_buckets_is_finished_on_open(tmp_path, monkeypatch):
+    store = SnapshotStore(str(tmp_path), buckets=4)
+    store.apply(20232024, {'summary': rows({1: 10, 2: 20, 3: 30})})
+
+    replace = os.replace
+    replaced = []
+
+    def crash_after_one_bucket(src, dst):
+        if dst.endswith('.parquet') and replaced:
+            raise KeyboardInterrupt
+        replace(src, dst)
+        if dst.endswith('.parquet'):
+            replaced.append(dst)
+
+    monkeypatch.setattr(snapshot_store.os, 'replace', crash_after_one_bucket)
+    with pytest.raises(KeyboardInterrupt):
+        store.apply(20232024, {'summary': rows({1: 11, 2: 21, 3: 30, 4: 40})})
+    monkeypatch.setattr(snapshot_store.os, 'replace', replace)
+
+    store = SnapshotStore(str(tmp_path), buckets=4)
+    assert store.version == 2
+    assert sorted((change['playerId'], change['change']) for change in store.changes(1)) == \
+        [(1, 'changed'), (2, 'changed'), (4, 'added')]
+    assert store.read(20232024, 'summary').sort_by('playerId')['goals'].to_pylist() == [11, 21, 30, 40]
+    # Nothing left for a refresh of the same rows to write
+    assert store.apply(20232024, {'summary': rows({1: 11, 2: 21, 3: 30, 4: 40})})['buckets_written'] == 0
+
+
+def test_refresh_interrupted_before_commit_is_discarded_on_open(tmp_path, monkeypatch):
+    store = SnapshotStore(str(tmp_path), buckets=4)
+    store.apply(20232024, {'summary': rows({1: 10, 2: 20})})
+
+    def crash(*args):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(store, '_save_manifest', crash)
+    with pytest.raises(KeyboardInterrupt):
+        store.apply(20232024, {'summary': rows({1: 11, 2: 20})})
+
+    store = SnapshotStore(str(tmp_path), buckets=4)
+    assert store.version == 1
+    assert list(store.changes(1)) == []
+    assert store.read(20232024, 'summary').sort_by('playerId')['goals'].to_pylist() == [10, 20]
+    result = store.apply(20232024, {'summary': rows({1: 11, 2: 20})})
+    assert result['version'] == 2 and result['changed'] == 1
+    assert [change['version'] for change in store.changes()].count(2) == 1
+
+
+def test_first_refresh_interrupted_before_commit_is_discarded_on_open(tmp_path, monkeypatch):
+    store = SnapshotStore(str(tmp_path), buckets=4)
+
+    def crash(*args):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(store, '_save_manifest', crash)
+    with pytest.raises(KeyboardInterrupt):
+        store.apply(20232024, {'summary': rows({1: 10, 2: 20})})
+
+    store = SnapshotStore(str(tmp_path), buckets=4)
+    assert store.version == 0
+    assert list(store.changes()) == []
+    store.apply(20232024, {'summary': rows({1: 10, 2: 20})})
+    assert sorted((change['playerId'], change['change']) for change in store.changes()) == \
+        [(1, 'added'), (2, 'added')]